@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Benchmark provider classification: per-node detection vs memoized single pass.
+
+Also measures detection alone as providers are added: the compiled
+detection table against asking each provider's rules in turn.
+
+Usage: python benchmarks/bench_classify.py [--nodes N] [--refreshes R]
+           [--providers 3,25,100]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kubectl_node.providers import ProviderManager  # noqa: E402
+from kubectl_node.providers.detection import DetectionRules  # noqa: E402
+from kubectl_node.providers.manager import PROVIDER_SPECS, ProviderSpec  # noqa: E402
+from kubectl_node.record import records  # noqa: E402
+
+PROVIDER_LABELS = [
+    {"k8s.io/cloud-provider-aws": "true"},
+    {"kubernetes.azure.com/cluster": "cluster"},
+    {"cloud.google.com/gke-nodepool": "pool"},
+    {},
+]
+
+
+def make_nodes(count):
+    """Build synthetic nodes spread evenly over the providers."""
+    nodes = []
+    for i in range(count):
+        labels = {f"example.com/label-{j}": "value" for j in range(20)}
+        labels.update(PROVIDER_LABELS[i % len(PROVIDER_LABELS)])
+        nodes.append({
+            "metadata": {
+                "name": f"node-{i}",
+                "uid": f"uid-{i}",
+                "resourceVersion": "1",
+                "creationTimestamp": "2023-01-01T12:00:00Z",
+                "labels": labels,
+            },
+            "spec": {"providerID": f"aws:///us-west-2a/i-{i:017x}"},
+            "status": {"conditions": [{"type": "Ready", "status": "True"}]},
+        })
+    return nodes
+
+
+def old_path(manager, nodes):
+    """Detect for the headers, then detect again for every row."""
+    provider_headers = set()
+    for node in nodes:
+        provider_headers.update(manager.detect_provider(node).get_additional_headers())
+    headers = sorted(provider_headers)
+    return headers, [manager.get_node_fields(node, manager.detect_provider(node)) for node in nodes]
+
+
+def new_path(manager, nodes):
+    """Classify each node once, reusing memoized providers."""
+    return manager.collect_rows([nodes])
+
+
+def measure(function, nodes, refreshes):
+    """Return the mean per-node cost in microseconds over several refreshes."""
+    manager = ProviderManager()
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        function(manager, nodes)
+    elapsed = time.perf_counter() - start
+    return elapsed / (refreshes * len(nodes)) * 1e6
+
+
+def measure_detection(nodes, refreshes):
+    """Per-node classification cost alone: two detections vs a memo lookup."""
+    manager = ProviderManager()
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        for node in nodes:
+            manager.detect_provider(node)
+            manager.detect_provider(node)
+    old = time.perf_counter() - start
+
+    manager.collect_rows([nodes])
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        memo = {}
+        for node in nodes:
+            manager.classify(node, memo)
+    new = time.perf_counter() - start
+
+    scale = 1e6 / (refreshes * len(nodes))
+    return old * scale, new * scale
+
+
+def extra_specs(count):
+    """Synthetic providers, each with a marker label, annotation and scheme."""
+    return [ProviderSpec(f"cloud-{i}", ".generic", "GenericProvider",
+                         detection=DetectionRules([f"cloud-{i}.example.com/node"],
+                                                  [f"cloud-{i}.example.com/managed"],
+                                                  [f"cloud{i}://"]))
+            for i in range(count)]
+
+
+def measure_scaling(nodes, providers, refreshes):
+    """Per-node detection cost with ``providers`` specs: table vs linear scan.
+
+    The synthetic providers come first in detection order, so nodes of the
+    real clouds (and generic ones) are only found after all of them.
+    """
+    specs = extra_specs(providers - len(PROVIDER_SPECS)) + PROVIDER_SPECS
+    manager = ProviderManager(specs=specs)
+    node_records = next(records([nodes]))
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        for node in node_records:
+            manager.detect_provider(node)
+    table = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        for node in node_records:
+            for spec in specs:
+                if spec.rules.matches(node):
+                    break
+    linear = time.perf_counter() - start
+
+    scale = 1e6 / (refreshes * len(nodes))
+    return table * scale, linear * scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=3000)
+    parser.add_argument("--refreshes", type=int, default=10)
+    parser.add_argument("--providers", default="3,25,100",
+                        help="Comma-separated provider counts for detection scaling")
+    args = parser.parse_args()
+
+    nodes = make_nodes(args.nodes)
+    old_detect, new_detect = measure_detection(nodes, args.refreshes)
+    old_total = measure(old_path, nodes, args.refreshes)
+    new_total = measure(new_path, nodes, args.refreshes)
+
+    print(f"{args.nodes} nodes x {args.refreshes} refreshes (microseconds per node)")
+    print(f"  classification  old: {old_detect:8.2f}  new: {new_detect:8.2f}")
+    print(f"  full extraction old: {old_total:8.2f}  new: {new_total:8.2f}")
+    for count in [int(count) for count in args.providers.split(",") if count]:
+        table, linear = measure_scaling(nodes, max(count, len(PROVIDER_SPECS)), args.refreshes)
+        print(f"  detection, {count:3} providers  table: {table:8.2f}  linear: {linear:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Measure memory held for node lists: node objects against node records.
+
+Traced with tracemalloc, for each cluster size:
+
+- list: a node list is decoded, its rows extracted and rendered, the way a
+  one-shot run does. "objects" keeps the decoded nodes alive until the
+  table is rendered; "records" replaces each node by its NodeRecord as its
+  page is processed. Peak and retained (while rendering) memory are shown.
+- watch: the watch-mode node map of projected nodes, arriving as watch
+  events, held as pruned node objects or as records.
+
+Usage: python benchmarks/bench_memory.py [--sizes 10000] [--images 50]
+           [--output results.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kubectl_node.providers import ProviderManager  # noqa: E402
+from kubectl_node.table import format_table  # noqa: E402
+from kubectl_node.watch import NodeWatcher  # noqa: E402
+from synthetic import PROVIDERS, make_nodes, node_list_json  # noqa: E402
+
+DEFAULT_SIZES = [10000]
+
+MB = 1024 * 1024
+
+
+def traced(function, *args):
+    """Run ``function`` under tracemalloc; return (peak, retained) in MB.
+
+    ``function`` returns what it keeps alive, measured before it is freed.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = function(*args)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return peak / MB, retained / MB
+
+
+def list_nodes(text, release):
+    manager = ProviderManager()
+    data = json.loads(text)
+    pages = [data["items"]]
+    if release:
+        pages = manager.node_records(pages, release=True)
+    headers, rows = manager.collect_rows(pages)
+    table = format_table(headers, rows)
+    # The decoded list stays referenced here, as in display_nodes
+    return data, rows, table
+
+
+def watch_nodes(events, records):
+    projection = ProviderManager().projection()
+    watcher = NodeWatcher(projection=projection, records=records)
+    for event in events:
+        watcher.apply_event({"type": "ADDED", "object": json.loads(event)})
+    return watcher
+
+
+def run_size(size, providers=PROVIDERS, **shape):
+    """Measure both scenarios for one cluster size; return MB per scenario."""
+    nodes = make_nodes(size, providers, **shape)
+    text = node_list_json(nodes)
+    events = [json.dumps(node) for node in nodes]
+    del nodes
+    results = {}
+    for name, release in (("objects", False), ("records", True)):
+        peak, retained = traced(list_nodes, text, release)
+        results[f"list_{name}"] = {"peak": peak, "retained": retained}
+    for name, records in (("objects", False), ("records", True)):
+        peak, retained = traced(watch_nodes, events, records)
+        results[f"watch_{name}"] = {"peak": peak, "retained": retained}
+    return results
+
+
+def print_results(size, results):
+    print(f"{size} nodes")
+    for scenario, memory in results.items():
+        print(f"  {scenario:<16} peak {memory['peak']:9.1f} MB  "
+              f"retained {memory['retained']:9.1f} MB", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated cluster sizes (default: %(default)s)")
+    parser.add_argument("--labels", type=int, default=10, help="Extra labels per node")
+    parser.add_argument("--images", type=int, default=50, help="Container images per node")
+    parser.add_argument("--taints", type=int, default=1, help="Taints per node")
+    parser.add_argument("--output", metavar="FILE", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for size in [int(size) for size in args.sizes.split(",") if size]:
+        results[str(size)] = run_size(size, labels=args.labels, images=args.images,
+                                      taints=args.taints)
+        print_results(size, results[str(size)])
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
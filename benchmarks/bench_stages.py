@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Time each stage of listing nodes on synthetic clusters of several sizes.
+
+Stages: JSON decode, building node records, get_all_headers, get_node_info,
+calculate_node_age, table rendering, and the --summary pass that replaces
+the last three. Results are written as JSON so runs on different commits
+can be compared; with --baseline the run fails if a stage got slower than
+the threshold allows.
+
+Usage: python benchmarks/bench_stages.py [--sizes 100,1000,10000,50000]
+           [--output results.json] [--baseline old.json] [--threshold 0.2]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kubectl_node.providers import ProviderManager  # noqa: E402
+from kubectl_node.record import records  # noqa: E402
+from kubectl_node.summary import FleetSummary, parse_groups  # noqa: E402
+from kubectl_node.table import format_table  # noqa: E402
+from kubectl_node.utils import calculate_node_age  # noqa: E402
+from synthetic import PROVIDERS, SHAPES, make_nodes, node_list_json  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+
+STAGES = ["json_decode", "records", "get_all_headers", "get_node_info", "calculate_node_age",
+          "render", "summary"]
+
+# Stages faster than this are never reported as regressions; at that scale
+# the difference is timer noise
+MIN_DELTA_SECONDS = 0.001
+
+
+def best_of(repeat, function, *args):
+    """Return the fastest of ``repeat`` runs in seconds, and the last result."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def records_stage(nodes):
+    # A copy, not in place, so every run starts from the node objects
+    return next(records([nodes]))
+
+
+def headers_stage(nodes):
+    # A new manager each time, as every invocation of the tool starts cold
+    manager = ProviderManager()
+    return manager, manager.get_all_headers(nodes)
+
+
+def node_info_stage(manager, nodes, headers):
+    return [manager.get_node_info(node, headers) for node in nodes]
+
+
+def age_stage(timestamps):
+    return [calculate_node_age(timestamp) for timestamp in timestamps]
+
+
+def summary_stage(nodes):
+    # Starts cold like headers_stage, so detection is paid here as well
+    return FleetSummary(parse_groups(None)).add([nodes])
+
+
+def run_size(size, repeat, providers=PROVIDERS, **shape):
+    """Time every stage for one cluster size; return seconds per stage."""
+    text = node_list_json(make_nodes(size, providers, **shape))
+    timings = {}
+    timings["json_decode"], data = best_of(repeat, json.loads, text)
+    del text
+    timings["records"], nodes = best_of(repeat, records_stage, data["items"])
+    del data
+    timings["get_all_headers"], (manager, headers) = best_of(repeat, headers_stage, nodes)
+    timings["get_node_info"], rows = best_of(repeat, node_info_stage, manager, nodes, headers)
+    timestamps = [node.created for node in nodes]
+    timings["calculate_node_age"], _ = best_of(repeat, age_stage, timestamps)
+    timings["render"], _ = best_of(repeat, format_table, headers, rows)
+    timings["summary"], _ = best_of(repeat, summary_stage, nodes)
+    return timings
+
+
+def git_commit():
+    """Return the current commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat=3, providers=PROVIDERS, labels=10, images=10, taints=1, log=None):
+    """Run the suite and return the results document."""
+    # Import the providers first so the smallest size does not pay for it
+    headers_stage(make_nodes(len(providers), providers))
+    results = {}
+    for size in sizes:
+        timings = run_size(size, repeat, providers, labels=labels, images=images, taints=taints)
+        results[str(size)] = timings
+        if log is not None:
+            log(size, timings)
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "parameters": {"repeat": repeat, "providers": list(providers),
+                       "labels": labels, "images": images, "taints": taints},
+        "stages": STAGES,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.2, min_delta=MIN_DELTA_SECONDS):
+    """List the stages that got slower than ``threshold`` allows.
+
+    Returns (size, stage, baseline seconds, current seconds) tuples for
+    every stage more than ``threshold`` (a fraction) and ``min_delta``
+    seconds slower than in the baseline. Sizes or stages only one side has
+    are ignored.
+    """
+    regressions = []
+    for size, timings in current["results"].items():
+        before = baseline.get("results", {}).get(size, {})
+        for stage, seconds in timings.items():
+            old = before.get(stage)
+            if old is None:
+                continue
+            if seconds > old * (1 + threshold) and seconds - old > min_delta:
+                regressions.append((size, stage, old, seconds))
+    return regressions
+
+
+def print_timings(size, timings):
+    print(f"{size:>7} nodes  " + "  ".join(
+        f"{stage} {seconds * 1000:9.2f}ms" for stage, seconds in timings.items()), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated cluster sizes (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per stage; the fastest counts (default: %(default)s)")
+    parser.add_argument("--providers", default=",".join(PROVIDERS),
+                        help="Providers the nodes are spread over, any of "
+                             f"{','.join(SHAPES)} (default: %(default)s)")
+    parser.add_argument("--labels", type=int, default=10, help="Extra labels per node")
+    parser.add_argument("--images", type=int, default=10, help="Container images per node")
+    parser.add_argument("--taints", type=int, default=1, help="Taints per node")
+    parser.add_argument("--output", metavar="FILE", help="Write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="Compare against earlier results and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown allowed against the baseline, as a fraction "
+                             "(default: %(default)s)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    providers = [provider for provider in args.providers.split(",") if provider]
+    results = run(sizes, args.repeat, providers, args.labels, args.images, args.taints,
+                  log=print_timings)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(baseline, results, args.threshold)
+        for size, stage, old, new in regressions:
+            print(f"REGRESSION {size} nodes {stage}: {old * 1000:.2f}ms -> {new * 1000:.2f}ms "
+                  f"(+{(new / old - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage is more than {args.threshold:.0%} slower than "
+              f"{baseline.get('commit') or args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Synthetic node objects shaped like those real clusters return.
+
+Nodes are spread round-robin over AWS, Azure, GCP and generic clusters (or
+any of ``SHAPES``) and carry the labels, provider IDs, addresses,
+conditions, images and taints each platform sets, so every stage sees
+realistic object sizes.
+"""
+
+import json
+
+PROVIDERS = ["aws", "azure", "gcp", "generic"]
+
+# Every platform nodes can be shaped like
+SHAPES = PROVIDERS + ["openstack", "hetzner", "k3s"]
+
+ZONES = {
+    "aws": ["us-west-2a", "us-west-2b", "us-west-2c"],
+    "azure": ["eastus-1", "eastus-2", "eastus-3"],
+    "gcp": ["us-central1-a", "us-central1-b", "us-central1-f"],
+    "generic": ["rack-1", "rack-2"],
+    "openstack": ["nova-a", "nova-b"],
+    "hetzner": ["fsn1-dc14", "nbg1-dc3", "hel1-dc2"],
+    "k3s": ["edge-1", "edge-2"],
+}
+
+INSTANCE_TYPES = {
+    "aws": ["m5.large", "m5.xlarge", "c6i.2xlarge"],
+    "azure": ["Standard_D4s_v3", "Standard_E8s_v5"],
+    "gcp": ["e2-standard-4", "n2-highmem-8"],
+    "generic": ["bare-metal"],
+    "openstack": ["m1.large", "m1.xlarge"],
+    "hetzner": ["cpx31", "ccx23"],
+    "k3s": ["k3s"],
+}
+
+
+def _provider_labels(provider, index, zone):
+    if provider == "aws":
+        return {
+            "k8s.io/cloud-provider-aws": "a1b2c3d4e5f6",
+            "eks.amazonaws.com/nodegroup": f"workers-{index % 4}",
+            "eks.amazonaws.com/capacityType": "ON_DEMAND",
+        }
+    if provider == "azure":
+        return {
+            "kubernetes.azure.com/cluster": "MC_rg_prod_eastus",
+            "kubernetes.azure.com/agentpool": f"pool{index % 4}",
+            "kubernetes.azure.com/mode": "user",
+        }
+    if provider == "gcp":
+        return {
+            "cloud.google.com/gke-nodepool": f"pool-{index % 4}",
+            "cloud.google.com/gke-os-distribution": "cos",
+            "cloud.google.com/machine-family": "e2",
+        }
+    return {"node.example.com/rack": zone}
+
+
+def _provider_id(provider, index, zone):
+    if provider == "aws":
+        return f"aws:///{zone}/i-{index:017x}"
+    if provider == "azure":
+        return ("azure:///subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/"
+                f"mc_rg_prod_eastus/providers/Microsoft.Compute/virtualMachineScaleSets/"
+                f"aks-pool{index % 4}-12345678-vmss/virtualMachines/{index}")
+    if provider == "gcp":
+        return f"gce://example-project/{zone}/gke-prod-pool-{index % 4}-{index:08x}"
+    if provider == "openstack":
+        return f"openstack://RegionOne/{index:08x}-0000-4000-8000-{index:012x}"
+    if provider == "hetzner":
+        return f"hcloud://{30000000 + index}"
+    if provider == "k3s":
+        return f"k3s://{provider}-node-{index:06d}"
+    return ""
+
+
+def make_node(index, provider="aws", labels=10, images=50, taints=1):
+    """Build one node.
+
+    ``labels`` extra labels, ``images`` cached container images and
+    ``taints`` taints are added on top of what the platform sets.
+    """
+    zone = ZONES[provider][index % len(ZONES[provider])]
+    node_labels = {
+        "kubernetes.io/hostname": f"{provider}-node-{index}",
+        "kubernetes.io/os": "linux",
+        "kubernetes.io/arch": "amd64",
+        "node.kubernetes.io/instance-type":
+            INSTANCE_TYPES[provider][index % len(INSTANCE_TYPES[provider])],
+        "topology.kubernetes.io/zone": zone,
+    }
+    if index % 10 == 0:
+        node_labels["node-role.kubernetes.io/control-plane"] = ""
+    node_labels.update(_provider_labels(provider, index, zone))
+    node_labels.update({f"example.com/label-{i}": f"value-{i}" for i in range(labels)})
+
+    spec = {
+        "podCIDR": f"10.{index // 65536 % 256}.{index // 256 % 256}.0/24",
+        "taints": [{"key": f"example.com/taint-{i}", "value": "true", "effect": "NoSchedule"}
+                   for i in range(taints)],
+    }
+    provider_id = _provider_id(provider, index, zone)
+    if provider_id:
+        spec["providerID"] = provider_id
+    if index % 50 == 0:
+        spec["unschedulable"] = True
+
+    return {
+        "metadata": {
+            "name": f"{provider}-node-{index:06d}",
+            "uid": f"00000000-0000-0000-0000-{index:012d}",
+            "resourceVersion": str(1000 + index),
+            "creationTimestamp": f"2023-{index % 12 + 1:02d}-{index % 28 + 1:02d}T12:00:00Z",
+            "labels": node_labels,
+            "annotations": {
+                "node.alpha.kubernetes.io/ttl": "0",
+                "volumes.kubernetes.io/controller-managed-attach-detach": "true",
+            },
+        },
+        "spec": spec,
+        "status": {
+            "conditions": [
+                {"type": kind, "status": "True" if kind == "Ready" else "False",
+                 "reason": "KubeletReady" if kind == "Ready" else "KubeletHasSufficientResources",
+                 "message": "kubelet is posting ready status",
+                 "lastHeartbeatTime": "2024-01-01T00:00:00Z",
+                 "lastTransitionTime": "2023-06-01T00:00:00Z"}
+                for kind in ("MemoryPressure", "DiskPressure", "PIDPressure", "Ready")
+            ],
+            "addresses": [
+                {"type": "InternalIP", "address": f"10.0.{index // 256 % 256}.{index % 256}"},
+                {"type": "ExternalIP", "address": f"34.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"},
+                {"type": "Hostname", "address": f"{provider}-node-{index}"},
+            ],
+            "capacity": {"cpu": "4", "memory": "16Gi", "pods": "110", "ephemeral-storage": "100Gi"},
+            "allocatable": {"cpu": "3920m", "memory": "15Gi", "pods": "110",
+                            "ephemeral-storage": "95Gi"},
+            "nodeInfo": {
+                "kubeletVersion": "v1.29.1", "kubeProxyVersion": "v1.29.1",
+                "osImage": "Ubuntu 22.04.3 LTS", "kernelVersion": "5.15.0-1051",
+                "containerRuntimeVersion": "containerd://1.7.2",
+                "operatingSystem": "linux", "architecture": "amd64",
+                "machineID": f"{index:032x}", "bootID": f"{index:036x}",
+            },
+            "images": [
+                {"names": [f"registry.example.com/team/image-{i}@sha256:{i:064x}",
+                           f"registry.example.com/team/image-{i}:v1.{i}.0"],
+                 "sizeBytes": 10000000 + i}
+                for i in range(images)
+            ],
+        },
+    }
+
+
+def make_nodes(count, providers=PROVIDERS, **kwargs):
+    """Build ``count`` nodes spread round-robin over ``providers``."""
+    return [make_node(i, providers[i % len(providers)], **kwargs) for i in range(count)]
+
+
+def node_list_json(nodes):
+    """Serialize nodes the way the API server returns a NodeList."""
+    return json.dumps({"kind": "NodeList", "apiVersion": "v1",
+                       "metadata": {"resourceVersion": "123456"}, "items": nodes})
@@ -0,0 +1,182 @@
+"""On-disk node list cache for kubectl-node-cloud."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from .client import native_available
+from .config import DEFAULT_CACHE_TTL
+from .exceptions import KubectlNodeError, KubeconfigError
+from .kubeconfig import load_kubeconfig, context_server
+from .timings import phase
+from .utils import _run_kubectl_json, kubectl_get_nodes
+from .watch import NodeWatcher, ResourceVersionExpired, _is_gone
+
+# A stale entry is revalidated with a watch from its resourceVersion that the
+# server ends after this long; only nodes that changed are sent. Through
+# kubectl the watch would cost a process and this wait on top of what a
+# plain (projected) refetch costs, so there the list is fetched again.
+REVALIDATE_TIMEOUT_SECONDS = 1
+
+# Bumped whenever the entry layout changes
+CACHE_FORMAT = 3
+
+
+def default_cache_dir() -> str:
+    """Return the cache directory, honouring XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "kubectl-node")
+
+
+class NodeCache:
+    """Node lists stored per context, API server and selection, one JSON file each.
+
+    ``selection`` is a node selector's ``describe()`` string, empty for
+    all nodes; differently selected lists are kept side by side.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or default_cache_dir()
+
+    def path_for(self, context: str, server: str, selection: str = "") -> str:
+        """Return the entry file for a context, server URL and selection."""
+        key = f"{context}\0{server}\0{selection}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"nodes-{digest[:32]}.json")
+
+    def load(self, context: str, server: str, selection: str = "") -> Optional[Dict[str, Any]]:
+        """Read an entry, or None if it is missing, unreadable or for another cluster."""
+        try:
+            with open(self.path_for(context, server, selection), "r") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(entry, dict) or entry.get("format") != CACHE_FORMAT
+                or entry.get("context") != context or entry.get("server") != server
+                or entry.get("selection") != selection):
+            return None
+        return entry
+
+    def store(self, context: str, server: str, items, resource_version: Optional[str],
+              fields=None, selection: str = ""):
+        """Write an entry atomically.
+
+        The entry is written to a temporary file in the cache directory and
+        renamed over the old one, so concurrent readers see either the old
+        or the new entry, never a partial one.
+        """
+        entry = {
+            "format": CACHE_FORMAT,
+            "context": context,
+            "server": server,
+            "selection": selection,
+            "fetched_at": time.time(),
+            "resourceVersion": resource_version,
+            # Node fields the items were pruned to, None for whole objects
+            "fields": sorted(fields) if fields is not None else None,
+            "items": items,
+        }
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".nodes-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as handle:
+                json.dump(entry, handle, separators=(",", ":"))
+            os.replace(tmp_path, self.path_for(context, server, selection))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def _cache_key(context: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Resolve the context name and server URL the cache is keyed by.
+
+    Kubeconfigs that cannot be read natively (YAML files without PyYAML)
+    are resolved by ``kubectl config view``, which reads no credentials.
+    """
+    try:
+        return context_server(load_kubeconfig(), context)
+    except KubeconfigError:
+        pass
+    try:
+        config = _run_kubectl_json(["config", "view", "--minify", "-o", "json"], context=context)
+        return context_server(config, context)
+    except KubectlNodeError:
+        return None
+
+
+def _node_list(items, resource_version: Optional[str]) -> Dict[str, Any]:
+    return {"kind": "NodeList", "apiVersion": "v1",
+            "metadata": {"resourceVersion": resource_version or ""}, "items": items}
+
+
+def _covers(entry: Dict[str, Any], projection) -> bool:
+    """Check whether an entry holds every field a projection needs."""
+    if entry["fields"] is None:
+        return True
+    return projection is not None and set(projection.paths) <= set(entry["fields"])
+
+
+def cached_get_nodes(context: Optional[str] = None, transport: str = "kubectl",
+                     ttl: float = DEFAULT_CACHE_TTL,
+                     cache: Optional[NodeCache] = None, projection=None,
+                     selector=None) -> Dict[str, Any]:
+    """Get the node list through the on-disk cache.
+
+    Entries younger than ``ttl`` seconds are returned as they are. Older
+    entries are revalidated with a short watch from their resourceVersion,
+    which applies whatever changed since; only when the server no longer
+    has that version (410 Gone), or when the API server can only be
+    reached through kubectl, is the full list fetched again. With a
+    ``projection`` only the projected node fields are stored, and with a
+    ``selector`` only the selected nodes, under their own entry. Contexts
+    the kubeconfig cannot identify are never cached.
+    """
+    key = _cache_key(context)
+    if key is None:
+        return kubectl_get_nodes(context=context, transport=transport, projection=projection,
+                                 selector=selector)
+
+    cache = cache or NodeCache()
+    context_name, server = key
+    selection = selector.describe() if selector is not None else ""
+    with phase("cache_load"):
+        entry = cache.load(context_name, server, selection)
+    if entry is not None and not _covers(entry, projection):
+        entry = None
+    if entry is not None and time.time() - entry["fetched_at"] < ttl:
+        return _node_list(entry["items"], entry["resourceVersion"])
+
+    watcher = NodeWatcher(context=context, transport=transport,
+                          timeout_seconds=REVALIDATE_TIMEOUT_SECONDS, projection=projection,
+                          selector=selector)
+    revalidate = (entry is not None and entry["resourceVersion"]
+                  and transport == "native" and native_available(context))
+    if revalidate:
+        watcher.nodes = {node["metadata"]["uid"]: node for node in entry["items"]}
+        watcher.resource_version = entry["resourceVersion"]
+        try:
+            watcher.watch_once()
+        except ResourceVersionExpired:
+            watcher.resource_version = None
+        except KubectlNodeError as e:
+            if not _is_gone(e):
+                raise
+            watcher.resource_version = None
+    if watcher.resource_version is None:
+        watcher.relist()
+
+    items = watcher.snapshot()
+    try:
+        with phase("cache_store", nodes=len(items)):
+            cache.store(context_name, server, items, watcher.resource_version,
+                        projection.paths if projection is not None else None, selection)
+    except OSError:
+        # An unwritable cache only costs the next call a refetch
+        pass
+    return _node_list(items, watcher.resource_version)
@@ -0,0 +1,344 @@
+"""In-process Kubernetes API client for kubectl-node-cloud."""
+
+import base64
+import gzip
+import http.client
+import json
+import os
+import shutil
+import ssl
+import tempfile
+import threading
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+from .exceptions import APIError, KubeconfigError
+from .kubeconfig import load_kubeconfig, resolve_context
+from .timings import phase
+
+# Errors that mean a pooled keep-alive connection was closed by the server
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+# Clients are cached per kubeconfig and context so repeated calls (e.g. in
+# watch mode) reuse the same pooled connections
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def build_ssl_context(settings: Dict[str, Any]) -> ssl.SSLContext:
+    """Build an SSL context from resolved kubeconfig connection settings."""
+    ca_data = settings.get("ca_data")
+    try:
+        context = ssl.create_default_context(
+            cafile=settings.get("ca_file"),
+            cadata=ca_data.decode("ascii") if ca_data else None
+        )
+    except (OSError, ssl.SSLError, ValueError) as e:
+        raise KubeconfigError(f"Cannot load cluster certificate authority: {e}")
+
+    if settings.get("insecure"):
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    cert_file, key_file = settings.get("cert_file"), settings.get("key_file")
+    cert_data, key_data = settings.get("cert_data"), settings.get("key_data")
+    if not (cert_file or cert_data):
+        return context
+
+    # The ssl module only loads client certificates from files, so inline
+    # certificate data is written to a private temporary directory
+    tmp_dir = tempfile.mkdtemp(prefix="kubectl-node-")
+    try:
+        if cert_data:
+            cert_file = os.path.join(tmp_dir, "client.crt")
+            with open(os.open(cert_file, os.O_WRONLY | os.O_CREAT, 0o600), "wb") as handle:
+                handle.write(cert_data)
+        if key_data:
+            key_file = os.path.join(tmp_dir, "client.key")
+            with open(os.open(key_file, os.O_WRONLY | os.O_CREAT, 0o600), "wb") as handle:
+                handle.write(key_data)
+        context.load_cert_chain(cert_file, key_file)
+    except (OSError, ssl.SSLError) as e:
+        raise KubeconfigError(f"Cannot load client certificate: {e}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return context
+
+
+class APIClient:
+    """Minimal Kubernetes API client over pooled keep-alive connections."""
+
+    def __init__(self, server: str, ssl_context: Optional[ssl.SSLContext] = None,
+                 headers: Optional[Dict[str, str]] = None, timeout: float = 30,
+                 pool_size: int = 4):
+        parts = urlsplit(server)
+        if parts.scheme not in ("http", "https"):
+            raise KubeconfigError(f"Unsupported API server URL '{server}'")
+
+        self.server = server
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.ssl_context = ssl_context
+        self.headers = {"Accept": "application/json", "User-Agent": "kubectl-node-cloud"}
+        self.headers.update(headers or {})
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.connections_opened = 0
+        self.bytes_received = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any], **kwargs) -> "APIClient":
+        """Create a client from settings returned by ``resolve_context``."""
+        headers = {}
+        if settings.get("token"):
+            headers["Authorization"] = f"Bearer {settings['token']}"
+        elif settings.get("username"):
+            credentials = f"{settings['username']}:{settings.get('password') or ''}"
+            encoded = base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+            headers["Authorization"] = f"Basic {encoded}"
+
+        ssl_context = None
+        if settings["server"].startswith("https://"):
+            ssl_context = build_ssl_context(settings)
+
+        return cls(settings["server"], ssl_context=ssl_context, headers=headers, **kwargs)
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        """Open a new connection to the API server."""
+        self.connections_opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=self.ssl_context
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        """Take an idle connection from the pool, or open a new one."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, connection):
+        """Return a connection to the pool for reuse."""
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Close all idle pooled connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build the request target for an API path."""
+        url = self.base_path + path
+        if params:
+            query = {key: value for key, value in params.items() if value is not None}
+            if query:
+                url += "?" + urlencode(query)
+        return url
+
+    def open(self, path: str, params: Optional[Dict[str, Any]] = None,
+             timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None):
+        """Send a GET request and return ``(connection, response)``.
+
+        The caller must read the response fully and hand the connection back
+        with ``finish`` so it can be reused. ``timeout`` overrides the client
+        timeout for this request's network operations; ``headers`` are added
+        to the client headers for this request only.
+        """
+        url = self._url(path, params)
+        timeout = timeout or self.timeout
+        if headers:
+            headers = dict(self.headers, **headers)
+        else:
+            headers = self.headers
+
+        while True:
+            connection, reused = self._acquire()
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            try:
+                connection.request("GET", url, headers=headers)
+                response = connection.getresponse()
+                break
+            except _STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                if not reused:
+                    raise APIError(f"Connection to {self.server} failed: {e}")
+                # The server closed an idle keep-alive connection; retry fresh
+            except (OSError, ssl.SSLError) as e:
+                connection.close()
+                raise APIError(f"Connection to {self.server} failed: {e}")
+
+        if response.status >= 400:
+            body = _decompress(response, response.read())
+            self.finish(connection, response)
+            raise APIError(_error_message(response.status, body), status=response.status, body=body)
+
+        return connection, response
+
+    def finish(self, connection, response):
+        """Return a connection to the pool once its response is consumed."""
+        if response.will_close or not response.isclosed():
+            connection.close()
+        else:
+            self._release(connection)
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None) -> bytes:
+        """Send a GET request and return the response body.
+
+        Responses are requested gzip-compressed; large lists shrink several
+        times over the wire. The returned body is always decompressed.
+        """
+        headers = dict(headers or {}, **{"Accept-Encoding": "gzip"})
+        with phase("api_request", path=path) as span:
+            connection, response = self.open(path, params, timeout, headers)
+            try:
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise APIError(f"Reading response from {self.server} failed: {e}")
+            self.finish(connection, response)
+            self.bytes_received += len(body)
+            span.set(bytes=len(body))
+        with phase("decompress", bytes=len(body)):
+            return _decompress(response, body)
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None,
+                 headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Send a GET request and return the decoded JSON body."""
+        body = self.get(path, params, timeout, headers)
+        try:
+            with phase("json_decode", bytes=len(body)):
+                return json.loads(body)
+        except ValueError as e:
+            raise APIError(f"Invalid JSON from API server: {e}", body=body)
+
+    def stream_lines(self, path: str, params: Optional[Dict[str, Any]] = None,
+                     read_timeout: Optional[float] = None) -> Iterator[str]:
+        """Send a streaming GET request (e.g. a watch) and yield its lines.
+
+        The connection is dedicated to the stream and closed afterwards.
+        ``read_timeout`` replaces the client timeout while waiting for lines,
+        since watches can legitimately stay quiet for a long time.
+        """
+        connection, response = self.open(path, params)
+        try:
+            if connection.sock is not None:
+                connection.sock.settimeout(read_timeout)
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                if line.strip():
+                    yield line.decode("utf-8")
+        except (OSError, http.client.HTTPException) as e:
+            raise APIError(f"Stream from {self.server} failed: {e}")
+        finally:
+            connection.close()
+
+
+def _decompress(response, body: bytes) -> bytes:
+    """Undo the response's gzip content encoding, if any."""
+    if response.getheader("Content-Encoding", "").lower() != "gzip":
+        return body
+    try:
+        return gzip.decompress(body)
+    except (OSError, EOFError) as e:
+        raise APIError(f"Invalid gzip response: {e}")
+
+
+def _error_message(status: int, body: bytes) -> str:
+    """Build an error message from a Kubernetes Status response."""
+    try:
+        message = json.loads(body).get("message")
+    except (ValueError, AttributeError):
+        message = None
+    if message:
+        return f"API server returned {status}: {message}"
+    return f"API server returned {status}"
+
+
+def get_client(context: Optional[str] = None, kubeconfig: Optional[str] = None) -> APIClient:
+    """Return a cached API client for a kubeconfig context."""
+    key = (kubeconfig or os.environ.get("KUBECONFIG", ""), context)
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            settings = resolve_context(load_kubeconfig(kubeconfig), context)
+            client = APIClient.from_settings(settings)
+            _CLIENTS[key] = client
+    return client
+
+
+def native_available(context: Optional[str] = None) -> bool:
+    """Check whether a context can be reached without kubectl."""
+    try:
+        get_client(context)
+    except KubeconfigError:
+        # The kubeconfig needs kubectl, e.g. for an exec credential plugin
+        return False
+    return True
+
+
+# Asks for metadata-only list items (PartialObjectMetadataList)
+METADATA_ONLY_ACCEPT = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1"
+
+
+def list_nodes(context: Optional[str] = None, kubeconfig: Optional[str] = None,
+               timeout: Optional[float] = None, projection=None,
+               selector=None) -> Dict[str, Any]:
+    """List nodes through the API server, shaped like ``kubectl get nodes -o json``.
+
+    The API server cannot select individual spec or status fields, so with
+    a ``projection`` the compressed list is pruned as soon as it is decoded;
+    projections that only read metadata ask for metadata-only items. A
+    ``selector`` is passed on for the server to filter the nodes.
+    """
+    client = get_client(context, kubeconfig)
+    headers = None
+    if projection is not None and all(path.startswith("metadata.") for path in projection.paths):
+        headers = {"Accept": METADATA_ONLY_ACCEPT}
+    params = selector.params() if selector is not None else None
+    nodes = client.get_json("/api/v1/nodes", params, timeout=timeout, headers=headers)
+    if projection is not None:
+        with phase("prune", nodes=len(nodes.get("items", []))):
+            projection.prune_list(nodes)
+    return nodes
+
+
+def list_node_pages(context: Optional[str] = None, page_size: int = 500,
+                    kubeconfig: Optional[str] = None,
+                    selector=None) -> Iterator[List[Dict[str, Any]]]:
+    """List nodes page by page using ``limit``/``continue``."""
+    client = get_client(context, kubeconfig)
+    params = dict(selector.params() if selector is not None else {}, limit=page_size)
+    token = None
+    while True:
+        params["continue"] = token
+        page = client.get_json("/api/v1/nodes", params)
+        yield page.get("items", [])
+        token = page.get("metadata", {}).get("continue")
+        if not token:
+            return
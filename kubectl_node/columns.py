@@ -0,0 +1,161 @@
+"""Column extractors and compiled extraction plans for node tables.
+
+Extractors are called with ``record.NodeRecord`` instances and read their
+attributes; plans turn node objects they are handed into records first.
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .config import FIELD_MAPPINGS
+from .record import NodeRecord, as_record
+from .utils import calculate_node_age, get_node_status, get_node_roles
+
+Extractor = Callable[[NodeRecord], str]
+
+
+def reads(*paths: str):
+    """Declare the dotted node field paths an extractor reads.
+
+    Fetches are projected down to the fields the active columns declare;
+    a column without a declaration makes the whole node object be fetched.
+    """
+    def decorate(extractor):
+        extractor.fields = paths
+        return extractor
+    return decorate
+
+
+def extractor_fields(extractor) -> Optional[Tuple[str, ...]]:
+    """Return the field paths an extractor declared, or None if unknown."""
+    return getattr(extractor, "fields", None)
+
+
+@reads("metadata.name")
+def _name(node: NodeRecord) -> str:
+    return node.name
+
+
+@reads("metadata.creationTimestamp")
+def _age(node: NodeRecord) -> str:
+    return calculate_node_age(node.created)
+
+
+def node_info_extractor(key: str) -> Extractor:
+    """Build an extractor for a ``status.nodeInfo`` field."""
+    @reads(f"status.nodeInfo.{key}")
+    def extract(node: NodeRecord) -> str:
+        return node.node_info.get(key, "N/A")
+    return extract
+
+
+def label_extractor(key: str, default: str = "N/A") -> Extractor:
+    """Build an extractor for a node label."""
+    @reads("metadata.labels")
+    def extract(node: NodeRecord) -> str:
+        return node.labels.get(key, default)
+    return extract
+
+
+def address_extractor(address_type: str) -> Extractor:
+    """Build an extractor for a node address of the given type."""
+    @reads("status.addresses")
+    def extract(node: NodeRecord) -> str:
+        value = "N/A"
+        for kind, address in node.addresses:
+            if kind == address_type:
+                value = address
+        return value
+    return extract
+
+
+def provider_name_extractor(name: str) -> Extractor:
+    """Build an extractor naming the provider a node was detected as."""
+    @reads()
+    def extract(node: NodeRecord) -> str:
+        return name
+    return extract
+
+
+@reads("spec.providerID")
+def _provider_id(node: NodeRecord) -> str:
+    return node.provider_id or "N/A"
+
+
+@lru_cache(maxsize=None)
+def _zone_extractor() -> Extractor:
+    # Imported on first use, as the providers package imports this module
+    from .providers.provider_id import ZONE_LABELS, provider_id_extractor
+    return provider_id_extractor("zone", *ZONE_LABELS)
+
+
+@reads("metadata.labels", "spec.providerID")
+def _zone(node: NodeRecord) -> str:
+    # Read as the providers read their own zone columns (AWS-ZONE, GCP-ZONE,
+    # ...): either topology label, or else the zone in the providerID
+    return _zone_extractor()(node)
+
+
+@reads()
+def _missing(node: NodeRecord) -> str:
+    return "N/A"
+
+
+# Extractors for the columns shown for every node
+BASE_COLUMNS = {
+    "NAME": _name,
+    "STATUS": reads("status.conditions", "spec.unschedulable")(get_node_status),
+    "ROLES": reads("metadata.labels")(get_node_roles),
+    "AGE": _age,
+    "INTERNAL-IP": address_extractor("InternalIP"),
+    "EXTERNAL-IP": address_extractor("ExternalIP"),
+    "INSTANCE-TYPE": label_extractor("node.kubernetes.io/instance-type"),
+    **{header: node_info_extractor(key) for header, key in FIELD_MAPPINGS.items()},
+    # Extra columns of the wide output
+    "ZONE": _zone,
+    "PROVIDER-ID": _provider_id,
+}
+
+
+class ExtractionPlan:
+    """Per-column extractors compiled once for a fixed header list.
+
+    For each provider the plan holds a tuple of extractor callables, one per
+    header, so extracting a row only computes the requested columns.
+    Provider columns take precedence over base columns of the same name,
+    which ``columns`` can add to or override; columns a provider does not
+    have extract as "N/A".
+    """
+
+    def __init__(self, headers: Sequence[str], columns: Optional[Dict[str, Extractor]] = None):
+        self.headers = tuple(headers)
+        self.columns = {**BASE_COLUMNS, **(columns or {})}
+        self._compiled = {}
+
+    def compile(self, provider) -> Tuple[Extractor, ...]:
+        """Return the extractor tuple for a provider, compiling it on first use."""
+        extractors = self._compiled.get(provider)
+        if extractors is None:
+            provider_columns = provider.get_field_extractors()
+            base_columns = {**self.columns, "PROVIDER": provider_name_extractor(provider.name)}
+            extractors = tuple(
+                provider_columns.get(header) or base_columns.get(header) or _missing
+                for header in self.headers
+            )
+            self._compiled[provider] = extractors
+        return extractors
+
+    def extract(self, node: NodeRecord, provider) -> List[str]:
+        """Extract one row for a node detected as ``provider``."""
+        node = as_record(node)
+        return [extract(node) for extract in self.compile(provider)]
+    
+    def fields(self, provider) -> Optional[Set[str]]:
+        """Return the node fields a provider's row reads, or None if unknown."""
+        paths = set()
+        for extract in self.compile(provider):
+            declared = extractor_fields(extract)
+            if declared is None:
+                return None
+            paths.update(declared)
+        return paths
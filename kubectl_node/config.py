@@ -15,19 +15,89 @@ DEFAULT_FIELDS = [
     "INSTANCE-TYPE"
 ]
 
+# Columns added by the wide output, after the default ones
+WIDE_FIELDS = [
+    "PROVIDER",
+    "ZONE",
+    "PROVIDER-ID"
+]
+
+# Columns added by --requests: pods and resource requests against allocatable
+REQUEST_FIELDS = [
+    "PODS",
+    "CPU-REQ",
+    "MEM-REQ"
+]
+
+# Pods listed per request when counting them for --requests
+DEFAULT_POD_PAGE_SIZE = 500
+
+# Columns added by --metrics: live usage from metrics.k8s.io (kubectl top)
+METRICS_FIELDS = [
+    "CPU%",
+    "MEM%"
+]
+
+# Seconds to wait for the metrics API before its columns show N/A
+DEFAULT_METRICS_TIMEOUT = 5
+
+# Columns --summary counts nodes by, unless --group-by picks others
+DEFAULT_SUMMARY_GROUPS = [
+    "PROVIDER",
+    "ZONE",
+    "INSTANCE-TYPE",
+    "VERSION",
+    "STATUS"
+]
+
+# Output formats: tables, and records streamed one node at a time
+OUTPUT_FORMATS = ["table", "wide", "json", "ndjson", "csv", "tsv"]
+
+# Node list cache: seconds a cached list is used without asking the API server
+DEFAULT_CACHE_TTL = 30
+
+# Multi-context listing: clusters fetched at once, and the deadline per context
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_CONTEXT_TIMEOUT = 30
+
+# Table style; "plain" uses the built-in renderer, anything else tabulate
+DEFAULT_TABLE_FORMAT = "plain"
+
 # Provider-specific additional fields
 PROVIDER_FIELDS = {
     "aws": [
         "AWS-INSTANCE-ID",
+        "AWS-REGION",
         "AWS-ZONE", 
         "AWS-ASG"
     ],
     "azure": [
-        "AZURE-INSTANCE-TYPE"
+        "AZURE-INSTANCE-ID",
+        "AZURE-INSTANCE-TYPE",
+        "AZURE-RESOURCE-GROUP",
+        "AZURE-ZONE"
     ],
     "gcp": [
         "GCP-INSTANCE-ID",
-        "GCP-ZONE"
+        "GCP-PROJECT",
+        "GCP-REGION",
+        "GCP-ZONE",
+        "GCP-NODE-POOL",
+        "GCP-PREEMPTIBLE"
+    ],
+    "openstack": [
+        "OPENSTACK-INSTANCE-ID",
+        "OPENSTACK-REGION",
+        "OPENSTACK-ZONE"
+    ],
+    "hetzner": [
+        "HETZNER-SERVER-ID",
+        "HETZNER-REGION",
+        "HETZNER-ZONE"
+    ],
+    "k3s": [
+        "K3S-REGION",
+        "K3S-ZONE"
     ],
     "generic": []
 }
@@ -40,18 +110,38 @@ FIELD_MAPPINGS = {
     "CONTAINER-RUNTIME": "containerRuntimeVersion"
 }
 
-# Cloud provider detection patterns
+# Cloud provider detection patterns: a node is detected as the first provider,
+# in detection order, whose marker labels or annotations it carries, or whose
+# "provider_ids" prefixes (e.g. "aws://") its spec.providerID starts with
 PROVIDER_DETECTION = {
     "aws": {
         "labels": ["k8s.io/cloud-provider-aws"],
-        "annotations": []
+        "annotations": [],
+        "provider_ids": ["aws://"]
     },
     "azure": {
         "labels": ["kubernetes.azure.com/cluster"],
-        "annotations": []
+        "annotations": [],
+        "provider_ids": ["azure://"]
     },
     "gcp": {
         "labels": ["cloud.google.com/gke-nodepool"],
-        "annotations": []
+        "annotations": [],
+        "provider_ids": ["gce://"]
+    },
+    "openstack": {
+        "labels": [],
+        "annotations": [],
+        "provider_ids": ["openstack://"]
+    },
+    "hetzner": {
+        "labels": [],
+        "annotations": [],
+        "provider_ids": ["hcloud://"]
+    },
+    "k3s": {
+        "labels": [],
+        "annotations": [],
+        "provider_ids": ["k3s://"]
     }
 }
@@ -0,0 +1,258 @@
+"""Node cache daemon serving node lists over a local Unix socket.
+
+``kubectl-node --daemon`` keeps one watch-driven node map per context (see
+``watch.NodeWatcher``) and answers queries on a Unix domain socket, so
+every other invocation on the machine renders from memory instead of
+listing the cluster again. A context is only watched once some client asks
+for it; from then on all clients share that one upstream watch.
+
+The protocol is one JSON request line and one JSON response line per
+connection::
+
+    {"op": "nodes", "context": "prod", "kubeconfig": "...", "fields": [...],
+     "selector": {"labelSelector": "...", "fieldSelector": "..."}}
+    {"ok": true, "items": [...], "resourceVersion": "123", "age": 0.4, "hit": true}
+
+    {"op": "stats"}
+    {"ok": true, "uptime": 60.0, "contexts": {"prod": {"hits": 9, "misses": 1, ...}}}
+
+Each distinct selection of a context is its own cache with its own
+server-side filtered watch; its stats are listed as ``context [selection]``.
+While a context's watch is failing its queries are answered with an error,
+so clients list the cluster themselves rather than render a frozen list.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .exceptions import DaemonError
+from .projection import Projection
+from .selector import NodeSelector
+from .timings import phase
+from .watch import NodeWatcher
+
+# How long the first query for a context waits for its initial list
+SYNC_TIMEOUT_SECONDS = 30
+
+# How long a client waits for the daemon before listing the cluster itself
+CLIENT_TIMEOUT_SECONDS = 10
+
+
+def default_socket_path() -> str:
+    """Return the daemon socket path: $KUBECTL_NODE_SOCKET, or a per-user runtime path."""
+    path = os.environ.get("KUBECTL_NODE_SOCKET")
+    if path:
+        return path
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base:
+        from .cache import default_cache_dir
+        base = default_cache_dir()
+    return os.path.join(base, "kubectl-node.sock")
+
+
+def _kubeconfig_identity() -> str:
+    # Daemon and client must read the same kubeconfig for context names to agree
+    return os.environ.get("KUBECONFIG", "")
+
+
+class ContextCache:
+    """The watcher for one context, with its hit and miss counters."""
+
+    def __init__(self, watcher: NodeWatcher):
+        self.watcher = watcher
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        watcher = self.watcher
+        updated = watcher.updated
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "nodes": len(watcher.nodes),
+            "age": None if updated is None else round(time.monotonic() - updated, 3),
+            "events": watcher.events,
+            "relists": watcher.relists,
+            "reconnects": watcher.reconnects,
+            "error": None if watcher.error is None else str(watcher.error),
+        }
+
+
+class NodeDaemon:
+    """Per-context node caches behind a Unix socket server."""
+
+    def __init__(self, socket_path: Optional[str] = None, transport: str = "kubectl",
+                 sync_timeout: float = SYNC_TIMEOUT_SECONDS):
+        self.socket_path = socket_path or default_socket_path()
+        self.transport = transport
+        self.sync_timeout = sync_timeout
+        self.kubeconfig = _kubeconfig_identity()
+        self.caches = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def cache_for(self, context: str, selector: Optional[NodeSelector] = None):
+        """Return the cache for a context and selection, starting its watch on first use.
+
+        Returns the cache and whether it was already serving (a hit).
+        """
+        selection = selector.describe() if selector is not None else ""
+        key = f"{context} [{selection}]" if selection else context
+        with self._lock:
+            cache = self.caches.get(key)
+            if cache is None:
+                watcher = NodeWatcher(context=context, transport=self.transport,
+                                      selector=selector).start()
+                cache = self.caches[key] = ContextCache(watcher)
+            hit = cache.watcher.synced.is_set()
+            if hit:
+                cache.hits += 1
+            else:
+                cache.misses += 1
+        return cache, hit
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request."""
+        op = request.get("op")
+        if op == "stats":
+            with self._lock:
+                caches = dict(self.caches)
+            return {"ok": True, "pid": os.getpid(), "transport": self.transport,
+                    "uptime": round(time.monotonic() - self.started, 3),
+                    "contexts": {name: cache.stats() for name, cache in caches.items()}}
+        if op != "nodes":
+            return {"ok": False, "error": f"unknown op {op!r}"}
+        if request.get("kubeconfig", "") != self.kubeconfig:
+            return {"ok": False, "error": "the daemon reads a different kubeconfig"}
+        context = request.get("context")
+        if not context:
+            return {"ok": False, "error": "no context given"}
+
+        selection = request.get("selector") or {}
+        selector = NodeSelector(selection.get("labelSelector"), selection.get("fieldSelector"))
+        cache, hit = self.cache_for(context, selector)
+        watcher = cache.watcher
+        if not watcher.synced.wait(self.sync_timeout):
+            error = watcher.error or "initial list did not finish in time"
+            return {"ok": False, "error": f"context {context!r} is not synced: {error}"}
+        error = watcher.error
+        if error is not None:
+            # The watch is retrying; its node map may be arbitrarily old
+            return {"ok": False, "error": f"watch of context {context!r} failed: {error}"}
+
+        items = watcher.snapshot()
+        if request.get("fields") is not None:
+            projection = Projection(request["fields"])
+            items = [projection.prune(node) for node in items]
+        updated = watcher.updated
+        return {"ok": True, "hit": hit, "items": items,
+                "resourceVersion": watcher.resource_version,
+                "age": None if updated is None else round(time.monotonic() - updated, 3)}
+
+    def bind(self):
+        """Create the listening socket, replacing a stale one; not yet serving."""
+        if os.path.exists(self.socket_path):
+            if query_daemon({"op": "stats"}, self.socket_path, timeout=1) is not None:
+                raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", mode=0o700, exist_ok=True)
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline())
+                    response = daemon.handle(request if isinstance(request, dict) else {})
+                except ValueError as e:
+                    response = {"ok": False, "error": f"invalid request: {e}"}
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+        # Only the owner may connect; node lists can be sensitive
+        umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon_threads = True
+        return self
+
+    def serve_forever(self):
+        """Serve queries until ``shutdown`` is called, then remove the socket."""
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def start(self) -> "NodeDaemon":
+        """Serve on a background thread."""
+        self.bind()
+        threading.Thread(target=self.serve_forever, name="node-daemon", daemon=True).start()
+        return self
+
+    def shutdown(self):
+        """Stop serving and stop every watcher."""
+        if self._server is not None:
+            self._server.shutdown()
+        with self._lock:
+            for cache in self.caches.values():
+                cache.watcher.stop()
+
+
+def daemon_available(socket_path: Optional[str] = None) -> bool:
+    """Check cheaply whether a daemon socket exists."""
+    return os.path.exists(socket_path or default_socket_path())
+
+
+def query_daemon(request: Dict[str, Any], socket_path: Optional[str] = None,
+                 timeout: float = CLIENT_TIMEOUT_SECONDS) -> Optional[Dict[str, Any]]:
+    """Send one request to the daemon; None if no daemon is listening."""
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def daemon_get_nodes(context: str, socket_path: Optional[str] = None,
+                     projection=None, selector=None) -> Optional[Dict[str, Any]]:
+    """Get a context's node list from the daemon, or None to list it directly.
+
+    The list is shaped like ``kubectl get nodes -o json``; with a
+    ``projection`` the daemon only sends the projected fields, and with a
+    (resolved) ``selector`` only the selected nodes.
+    """
+    request = {"op": "nodes", "context": context, "kubeconfig": _kubeconfig_identity(),
+               "fields": list(projection.paths) if projection is not None else None,
+               "selector": selector.params() if selector is not None else {}}
+    with phase("daemon_query") as span:
+        response = query_daemon(request, socket_path)
+        if not response or not response.get("ok"):
+            return None
+        span.set(nodes=len(response["items"]), hit=response.get("hit"))
+    return {"kind": "List", "apiVersion": "v1",
+            "metadata": {"resourceVersion": response.get("resourceVersion")},
+            "items": response["items"]}
@@ -14,6 +14,11 @@ class KubectlCommandError(KubectlNodeError):
         self.stderr = stderr
 
 
+class KubectlTimeoutError(KubectlCommandError):
+    """Raised when a kubectl command does not finish within its deadline."""
+    pass
+
+
 class JSONParseError(KubectlNodeError):
     """Raised when JSON parsing fails."""
     
@@ -30,3 +35,32 @@ class ProviderDetectionError(KubectlNodeError):
 class NodeInfoError(KubectlNodeError):
     """Raised when node information extraction fails."""
     pass
+
+
+class KubeconfigError(KubectlNodeError):
+    """Raised when the kubeconfig cannot be read or resolved natively."""
+    pass
+
+
+class APIError(KubectlNodeError):
+    """Raised when the Kubernetes API server returns an error response."""
+    
+    def __init__(self, message, status=None, body=None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class DaemonError(KubectlNodeError):
+    """Raised when the node cache daemon cannot be started."""
+    pass
+
+
+class SelectorError(KubectlNodeError):
+    """Raised when a node selection (e.g. --nodepool) cannot be resolved."""
+    pass
+
+
+class SortError(KubectlNodeError):
+    """Raised when rows cannot be sorted by the requested column."""
+    pass
@@ -0,0 +1,217 @@
+"""Concurrent node listing across several kubectl contexts."""
+
+import math
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import (
+    DEFAULT_FIELDS, DEFAULT_MAX_WORKERS, DEFAULT_CONTEXT_TIMEOUT, DEFAULT_METRICS_TIMEOUT
+)
+from .exceptions import KubectlNodeError, KubectlTimeoutError
+from .metrics import NodeMetrics
+from .pods import NodeRequests
+from .providers import ProviderManager
+from .selector import NodeSelector
+from .sorting import RowOrder
+from .sources import source_columns, start_sources, wait_for_sources
+from .utils import kubectl_get_nodes
+
+# Seconds a context may overrun its deadline, e.g. while kubectl is being
+# killed, before the listing stops waiting for it
+DEADLINE_GRACE_SECONDS = 1
+
+
+class ContextResult:
+    """The extracted table, or the error, for one context."""
+
+    def __init__(self, context: str, headers: Optional[List[str]] = None,
+                 rows: Optional[List[List[str]]] = None,
+                 error: Optional[Exception] = None, keys: Optional[List] = None,
+                 warnings: Optional[List[str]] = None):
+        self.context = context
+        self.headers = headers or []
+        self.rows = rows or []
+        self.error = error
+        # Sort key of each row, when the rows were ordered
+        self.keys = keys or []
+        # Columns that could not be filled, e.g. "Pod requests unavailable: ..."
+        self.warnings = warnings or []
+
+    @property
+    def timed_out(self) -> bool:
+        return isinstance(self.error, KubectlTimeoutError) or "timed out" in str(self.error)
+
+
+def _countdown(timeout: Optional[float]) -> Callable[[], Optional[float]]:
+    """Return a function giving the seconds left of ``timeout`` from now.
+
+    It raises KubectlTimeoutError once none are left, and returns None
+    for no deadline.
+    """
+    if timeout is None:
+        return lambda: None
+    deadline = time.monotonic() + timeout
+
+    def remaining():
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise KubectlTimeoutError(f"no response within {timeout:g} seconds")
+        return left
+    return remaining
+
+
+def fetch_context(context: str, transport: str = "kubectl",
+                  timeout: Optional[float] = DEFAULT_CONTEXT_TIMEOUT,
+                  projected: bool = True,
+                  base_fields: Optional[Sequence[str]] = None,
+                  requests: bool = False, metrics: bool = False,
+                  metrics_timeout: Optional[float] = DEFAULT_METRICS_TIMEOUT,
+                  selector: Optional[NodeSelector] = None,
+                  order: Optional[RowOrder] = None) -> ContextResult:
+    """Fetch and extract the nodes of one context, capturing any failure.
+
+    With ``requests`` the context's pods are counted, and with ``metrics``
+    its node metrics fetched, alongside the nodes; if they cannot be had
+    their columns show "N/A". A ``selector`` is resolved per context, as
+    each cluster may mark its node pools with another label. With an
+    ``order`` each context's rows come back ordered (and limited) with
+    their keys, ready to be merged. ``timeout`` covers all of it: the
+    selector probe, the node list and the sources each get what is left.
+    """
+    remaining = _countdown(timeout)
+    try:
+        if selector is not None:
+            selector = selector.resolve(context, transport, timeout=remaining())
+        sources = []
+        if requests:
+            sources.append(NodeRequests())
+        if metrics:
+            sources.append(NodeMetrics(deadline=metrics_timeout))
+        provider_manager = ProviderManager(base_fields=base_fields,
+                                           columns=source_columns(sources))
+        projection = provider_manager.projection() if projected else None
+        left = remaining()
+        for source in sources:
+            if left is not None:
+                source.deadline = left if source.deadline is None else min(source.deadline, left)
+        start_sources(sources, context=context, transport=transport)
+        nodes = kubectl_get_nodes(context=context, transport=transport, timeout=remaining(),
+                                  projection=projection, selector=selector)
+        warnings = wait_for_sources(sources)
+        keys = []
+        pages = provider_manager.node_records([nodes.get("items", [])], release=True)
+        headers, rows = provider_manager.collect_rows(pages, order, keys)
+        return ContextResult(context, headers, rows, keys=keys, warnings=warnings)
+    except KubectlNodeError as e:
+        return ContextResult(context, error=e)
+    except Exception as e:
+        return ContextResult(context, error=KubectlNodeError(f"Unexpected error: {e}"))
+
+
+def fetch_contexts(contexts: Sequence[str], transport: str = "kubectl",
+                   timeout: Optional[float] = DEFAULT_CONTEXT_TIMEOUT,
+                   max_workers: int = DEFAULT_MAX_WORKERS,
+                   projected: bool = True,
+                   base_fields: Optional[Sequence[str]] = None,
+                   requests: bool = False, metrics: bool = False,
+                   metrics_timeout: Optional[float] = DEFAULT_METRICS_TIMEOUT,
+                   selector: Optional[NodeSelector] = None,
+                   order: Optional[RowOrder] = None) -> List[ContextResult]:
+    """Fetch several contexts concurrently on a bounded worker pool.
+
+    Results are returned in the order the contexts were given; a context
+    that fails or misses its deadline yields a result carrying the error.
+    A context's deadline starts when a worker picks it up; should one
+    overrun it, e.g. in a call that does not honour its timeout, it is
+    reported as timed out rather than waited for. The workers are daemon
+    threads, so such a call does not keep the process from exiting either.
+    """
+    results = {}
+    workers = max(1, min(max_workers, len(contexts)))
+    deadline = None
+    if timeout is not None:
+        budget = timeout * math.ceil(len(contexts) / workers) + DEADLINE_GRACE_SECONDS
+        deadline = time.monotonic() + budget
+    pending = queue.Queue()
+    for context in contexts:
+        pending.put(context)
+    finished = queue.Queue()
+    given_up = threading.Event()
+
+    def work():
+        while not given_up.is_set():
+            try:
+                context = pending.get_nowait()
+            except queue.Empty:
+                return
+            finished.put((context, fetch_context(
+                context, transport, timeout, projected, base_fields, requests, metrics,
+                metrics_timeout, selector, order)))
+
+    for index in range(workers):
+        threading.Thread(target=work, name=f"context-fetch-{index}", daemon=True).start()
+    try:
+        while len(results) < len(contexts):
+            wait = None if deadline is None else deadline - time.monotonic()
+            if wait is not None and wait <= 0:
+                break
+            try:
+                context, result = finished.get(timeout=wait)
+            except queue.Empty:
+                break
+            results[context] = result
+    finally:
+        # Contexts no worker has picked up yet are not started any more
+        given_up.set()
+    for context in contexts:
+        if context not in results:
+            results[context] = ContextResult(context, error=KubectlTimeoutError(
+                f"no response within {timeout:g} seconds"))
+    return [results[context] for context in contexts]
+
+
+def merge_results(results: Sequence[ContextResult],
+                  base_fields: Sequence[str] = DEFAULT_FIELDS,
+                  order: Optional[RowOrder] = None) -> Tuple[List[str], List[List[str]]]:
+    """Merge per-context tables into one table with a leading CONTEXT column.
+
+    Failed contexts get a single placeholder row so they show up inline.
+    With an ``order`` the already ordered per-context rows are merged by
+    their keys, up to the limit, and the placeholders follow them.
+    """
+    # Base columns first and provider columns sorted, as for one context
+    provider_headers = set()
+    for result in results:
+        provider_headers.update(h for h in result.headers if h not in base_fields)
+    headers = list(base_fields) + sorted(provider_headers)
+
+    rows = []
+    ordered = []
+    for result in results:
+        if result.error is not None:
+            placeholder = {"NAME": "<unavailable>",
+                           "STATUS": "Timeout" if result.timed_out else "Error"}
+            rows.append([result.context] + [placeholder.get(header, "") for header in headers])
+            continue
+        position = {header: index for index, header in enumerate(result.headers)}
+        context_rows = [
+            [result.context] + [
+                row[position[header]] if header in position else "N/A" for header in headers
+            ]
+            for row in result.rows
+        ]
+        if order is None:
+            rows.extend(context_rows)
+        else:
+            ordered.append(list(zip(result.keys, context_rows)))
+
+    if order is not None:
+        rows = [row for key, row in order.merge(ordered)] + rows
+    return ["CONTEXT"] + headers, rows
+
+
+def context_errors(results: Sequence[ContextResult]) -> Dict[str, Exception]:
+    """Map each failed context to its error."""
+    return {result.context: result.error for result in results if result.error is not None}
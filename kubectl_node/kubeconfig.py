@@ -0,0 +1,257 @@
+"""Native kubeconfig reader for kubectl-node-cloud."""
+
+import base64
+import json
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from .exceptions import KubeconfigError
+
+
+def _yaml():
+    """Import PyYAML on first use, or return None if it is not installed."""
+    try:
+        import yaml
+    except ImportError:  # pragma: no cover - depends on environment
+        return None
+    return yaml
+
+
+def kubeconfig_paths() -> List[str]:
+    """Return the kubeconfig files kubectl would read, in precedence order."""
+    value = os.environ.get("KUBECONFIG", "")
+    if value:
+        paths = []
+        for path in value.split(os.pathsep):
+            if path and path not in paths:
+                paths.append(path)
+        if paths:
+            return paths
+    return [os.path.join(os.path.expanduser("~"), ".kube", "config")]
+
+
+def default_kubeconfig_path() -> str:
+    """Return the kubeconfig path kubectl would use by default."""
+    return kubeconfig_paths()[0]
+
+
+# Parsed kubeconfigs per tuple of paths, with the (mtime, size) of each file
+# they were parsed from; a changed file invalidates the entry
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _file_stamp(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_kubeconfig(path: str) -> Dict[str, Any]:
+    """Read and parse one kubeconfig file."""
+    try:
+        with open(path, "r") as handle:
+            raw = handle.read()
+    except OSError as e:
+        raise KubeconfigError(f"Cannot read kubeconfig '{path}': {e}")
+
+    yaml = _yaml()
+    try:
+        if yaml is not None:
+            config = yaml.safe_load(raw)
+        else:
+            # Without PyYAML only JSON kubeconfigs can be read natively
+            config = json.loads(raw)
+    except Exception as e:
+        if yaml is None:
+            raise KubeconfigError(f"Cannot parse kubeconfig '{path}' without PyYAML "
+                                  f"(pip install PyYAML): {e}")
+        raise KubeconfigError(f"Cannot parse kubeconfig '{path}': {e}")
+
+    if not isinstance(config, dict):
+        raise KubeconfigError(f"Kubeconfig '{path}' is empty or malformed")
+
+    # Remember where each named entry came from, so relative file
+    # references resolve against the file that defined them
+    for kind in ("clusters", "contexts", "users"):
+        for entry in config.get(kind) or []:
+            if isinstance(entry, dict):
+                entry["__path__"] = path
+    config.setdefault("__path__", path)
+    return config
+
+
+def _merge(configs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge kubeconfig files the way kubectl does: the first definition wins."""
+    merged = {"__path__": configs[0]["__path__"], "clusters": [], "contexts": [], "users": []}
+    for config in configs:
+        if not merged.get("current-context") and config.get("current-context"):
+            merged["current-context"] = config["current-context"]
+        for kind in ("clusters", "contexts", "users"):
+            seen = {entry.get("name") for entry in merged[kind]}
+            for entry in config.get(kind) or []:
+                if isinstance(entry, dict) and entry.get("name") not in seen:
+                    merged[kind].append(entry)
+                    seen.add(entry.get("name"))
+        for key, value in config.items():
+            merged.setdefault(key, value)
+    return merged
+
+
+def load_kubeconfig(path: Optional[str] = None) -> Dict[str, Any]:
+    """Read and parse the kubeconfig.
+
+    With no ``path`` every file listed in ``KUBECONFIG`` is read and merged
+    like kubectl does (missing files are skipped), falling back to
+    ``~/.kube/config``. Parsed results are cached until a file's mtime or
+    size changes, so repeated lookups cost a ``stat`` per file. The result
+    is shared and must not be modified.
+    """
+    paths = (path,) if path else tuple(kubeconfig_paths())
+    stamps = tuple(_file_stamp(p) for p in paths)
+
+    with _CACHE_LOCK:
+        cached = _CACHE.get(paths)
+        if cached is not None and cached[0] == stamps:
+            return cached[1]
+
+    if path:
+        config = _read_kubeconfig(path)
+    else:
+        readable = [p for p, stamp in zip(paths, stamps) if stamp is not None]
+        if not readable:
+            raise KubeconfigError(f"Cannot read kubeconfig: no such file '{paths[0]}'")
+        config = _merge([_read_kubeconfig(p) for p in readable])
+
+    with _CACHE_LOCK:
+        _CACHE[paths] = (stamps, config)
+    return config
+
+
+def current_context(config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Return the current context name, or None if it is not set."""
+    config = load_kubeconfig() if config is None else config
+    return config.get("current-context") or None
+
+
+def context_names(config: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Return the names of all contexts, sorted like ``kubectl config get-contexts``."""
+    config = load_kubeconfig() if config is None else config
+    return sorted(entry["name"] for entry in config.get("contexts") or [] if entry.get("name"))
+
+
+def _find_entry(entries, name: str, kind: str) -> Dict[str, Any]:
+    """Find a named entry (context, cluster or user) in a kubeconfig list."""
+    for entry in entries or []:
+        if entry.get("name") == name:
+            return entry
+    raise KubeconfigError(f"{kind.capitalize()} '{name}' not found in kubeconfig")
+
+
+def _find_named(entries, name: str, kind: str) -> Dict[str, Any]:
+    """Find the body of a named entry in a kubeconfig list."""
+    return _find_entry(entries, name, kind).get(kind) or {}
+
+
+def _entry_dir(config: Dict[str, Any], entry: Dict[str, Any]) -> str:
+    """Return the directory relative file references in an entry resolve against."""
+    return os.path.dirname(os.path.abspath(entry.get("__path__") or config.get("__path__", ".")))
+
+
+def _resolve_path(base_dir: str, path: Optional[str]) -> Optional[str]:
+    """Resolve a kubeconfig file reference relative to the kubeconfig."""
+    if not path:
+        return None
+    path = os.path.expanduser(path)
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    return path
+
+
+def _decode_data(value: Optional[str]) -> Optional[bytes]:
+    """Decode a base64 ``*-data`` field from the kubeconfig."""
+    if not value:
+        return None
+    try:
+        return base64.b64decode(value)
+    except ValueError as e:
+        raise KubeconfigError(f"Invalid base64 data in kubeconfig: {e}")
+
+
+def context_server(config: Dict[str, Any], context: Optional[str] = None) -> Tuple[str, str]:
+    """Return the context name and its cluster's server URL.
+
+    Unlike ``resolve_context`` this does not look at credentials, so it also
+    works for contexts that need kubectl to authenticate.
+    """
+    context = context or config.get("current-context")
+    if not context:
+        raise KubeconfigError("No current context set in kubeconfig")
+
+    ctx = _find_named(config.get("contexts"), context, "context")
+    cluster = _find_named(config.get("clusters"), ctx.get("cluster"), "cluster")
+    server = cluster.get("server")
+    if not server:
+        raise KubeconfigError(f"Cluster for context '{context}' has no server URL")
+    return context, server.rstrip("/")
+
+
+def resolve_context(config: Dict[str, Any], context: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve a context into the connection settings for its cluster and user.
+
+    Raises KubeconfigError for anything that cannot be handled natively
+    (exec credential plugins, auth providers), so callers can fall back to
+    the kubectl subprocess.
+    """
+    context = context or config.get("current-context")
+    if not context:
+        raise KubeconfigError("No current context set in kubeconfig")
+
+    ctx = _find_named(config.get("contexts"), context, "context")
+    cluster_entry = _find_entry(config.get("clusters"), ctx.get("cluster"), "cluster")
+    cluster = cluster_entry.get("cluster") or {}
+    user_entry = _find_entry(config.get("users"), ctx.get("user"), "user") if ctx.get("user") else {}
+    user = user_entry.get("user") or {}
+
+    if "exec" in user or "auth-provider" in user:
+        raise KubeconfigError(
+            f"Context '{context}' uses a credential plugin, which requires kubectl"
+        )
+    if cluster.get("proxy-url") or cluster.get("tls-server-name"):
+        raise KubeconfigError(
+            f"Context '{context}' uses proxy or TLS overrides, which require kubectl"
+        )
+
+    server = cluster.get("server")
+    if not server:
+        raise KubeconfigError(f"Cluster for context '{context}' has no server URL")
+
+    cluster_dir = _entry_dir(config, cluster_entry)
+    user_dir = _entry_dir(config, user_entry)
+
+    token = user.get("token")
+    token_file = _resolve_path(user_dir, user.get("tokenFile"))
+    if not token and token_file:
+        try:
+            with open(token_file, "r") as handle:
+                token = handle.read().strip()
+        except OSError as e:
+            raise KubeconfigError(f"Cannot read token file '{token_file}': {e}")
+
+    return {
+        "context": context,
+        "server": server.rstrip("/"),
+        "insecure": bool(cluster.get("insecure-skip-tls-verify", False)),
+        "ca_file": _resolve_path(cluster_dir, cluster.get("certificate-authority")),
+        "ca_data": _decode_data(cluster.get("certificate-authority-data")),
+        "cert_file": _resolve_path(user_dir, user.get("client-certificate")),
+        "cert_data": _decode_data(user.get("client-certificate-data")),
+        "key_file": _resolve_path(user_dir, user.get("client-key")),
+        "key_data": _decode_data(user.get("client-key-data")),
+        "token": token,
+        "username": user.get("username"),
+        "password": user.get("password"),
+    }
@@ -1,85 +1,460 @@
 """Main module for kubectl-node-cloud."""
 
+import os
 import sys
 import time
 import argparse
-from tabulate import tabulate
 
-from .utils import kubectl_get_nodes, get_current_context, list_contexts
-from .providers import ProviderManager
-from .exceptions import KubectlNodeError
+# Only what argument parsing needs is imported here, so --help and --version
+# return quickly; the fetching, provider and rendering modules are imported
+# by the functions that use them
+from .config import (
+    DEFAULT_CACHE_TTL, DEFAULT_MAX_WORKERS, DEFAULT_CONTEXT_TIMEOUT, DEFAULT_TABLE_FORMAT,
+    DEFAULT_METRICS_TIMEOUT, DEFAULT_FIELDS, WIDE_FIELDS, REQUEST_FIELDS, METRICS_FIELDS,
+    OUTPUT_FORMATS
+)
 
 
-def display_nodes(context=None, clear_screen=False):
-    """Display Kubernetes nodes with cloud provider information."""
+def default_options():
+    """Return the options used when none are given on the command line."""
+    return build_parser().parse_args([])
+
+
+def base_fields(options):
+    """Return the columns shown for every node with the chosen output."""
+    fields = DEFAULT_FIELDS + WIDE_FIELDS if options.output == "wide" else DEFAULT_FIELDS
+    if options.requests:
+        fields = fields + REQUEST_FIELDS
+    if options.metrics:
+        fields = fields + METRICS_FIELDS
+    return fields
+
+
+def node_selector(options):
+    """Return the node selector the options ask for, or None for all nodes."""
+    from .selector import NodeSelector
+    
+    selector = NodeSelector(options.selector, options.field_selector, options.nodepool)
+    return selector if selector else None
+
+
+def row_order(options):
+    """Return the row order --sort-by/--limit ask for, or None for API order."""
+    if not options.sort_by and not options.limit:
+        return None
+    from .sorting import RowOrder
+    return RowOrder(options.sort_by, reverse=options.reverse, limit=options.limit)
+
+
+def column_sources(options):
+    """Return the column sources (pod requests, metrics) the options ask for."""
+    sources = []
+    if options.requests:
+        from .pods import NodeRequests
+        sources.append(NodeRequests())
+    if options.metrics:
+        from .metrics import NodeMetrics
+        sources.append(NodeMetrics(deadline=options.metrics_timeout))
+    return sources
+
+
+def build_provider_manager(options):
+    """Build the provider manager for the chosen columns.
+
+    Returns the manager and the column sources its extra columns read,
+    which must be fetched before rows are extracted.
+    """
+    from .providers import ProviderManager
+    from .sources import source_columns
+    
+    sources = column_sources(options)
+    manager = ProviderManager(base_fields=base_fields(options), columns=source_columns(sources))
+    return manager, sources
+
+
+def render_table(headers, rows, current_context, clear_screen=False, status_lines=None,
+                 renderer=None, table_format=DEFAULT_TABLE_FORMAT):
+    """Render extracted node rows as a table with cloud provider information."""
+    from .table import table_lines, write_table
+    from .timings import phase
+    
+    if renderer is not None:
+        # Watch mode: redraw only what changed since the previous frame
+        with phase("render", nodes=len(rows)) as span:
+            body = table_lines(headers, rows, table_format) if rows else ["No nodes found in the cluster."]
+            footer = [
+                "",
+                f"Context: {current_context}",
+                f"Last updated: {time.strftime('%Y-%m-%d %H:%M:%S')} "
+                f"(previous frame: {renderer.last_frame_bytes} bytes)",
+            ]
+            repaints = renderer.full_repaints
+            frame_bytes = renderer.render(body, footer + list(status_lines or []),
+                                          layout_key=body[0])
+            span.set(bytes=frame_bytes, full_repaint=renderer.full_repaints != repaints)
+        return
+    
     if clear_screen:
         # Clear screen for watch mode
         print("\033[2J\033[H", end="")
+    else:  # Only show context header in non-watch mode initially
+        print(f"Context: {current_context}")
+        print()
+    
+    if not rows:
+        print("No nodes found in the cluster.")
+    else:
+        # Display the table
+        with phase("render", nodes=len(rows)) as span:
+            span.set(bytes=write_table(headers, rows, table_format))
+    
+    if clear_screen:
+        # Add timestamp and context for watch mode
+        print(f"\nContext: {current_context}")
+        print(f"Last updated: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        for line in status_lines or []:
+            print(line)
+
+
+def render_nodes(nodes, current_context, provider_manager=None, order=None, **kwargs):
+    """Render a node list as a table with cloud provider information."""
+    from .providers import ProviderManager
+    provider_manager = provider_manager or ProviderManager()
+    headers, rows = provider_manager.collect_rows([nodes], order)
+    if order is not None and rows:
+        order.check(headers)
+    render_table(headers, rows, current_context, **kwargs)
+
+
+def display_nodes(context=None, clear_screen=False, options=None, renderer=None,
+                  provider_manager=None, sources=None):
+    """Display Kubernetes nodes with cloud provider information."""
+    import itertools
+    from .utils import kubectl_get_nodes, kubectl_get_node_pages, get_current_context
+    from .cache import cached_get_nodes
+    from .daemon import daemon_available, daemon_get_nodes
+    from .exceptions import KubectlNodeError
+    from .output import RECORD_FORMATS, WRITERS, write_keyed_records, write_records
+    from .sources import start_sources, wait_for_sources
+    from .timings import phase
+    
+    options = options or default_options()
+    summary = None
+    if options.summary or options.group_by:
+        # Counted in one pass over the nodes instead of extracting rows
+        from .summary import FleetSummary, parse_groups
+        summary = FleetSummary(parse_groups(options.group_by))
+        provider_manager, sources = summary.manager, []
+    elif provider_manager is None:
+        provider_manager, sources = build_provider_manager(options)
+    sources = sources or []
+    
+    if options.contexts or options.all_contexts:
+        display_contexts(options)
+        return
+    
+    # Only fetch the node fields the columns read, unless asked not to
+    projection = None if options.full_objects else provider_manager.projection()
+    selector = node_selector(options)
+    order = row_order(options)
     
     try:
-        # Get nodes data from kubectl
-        nodes_data = kubectl_get_nodes(context=context)
-        nodes = nodes_data.get("items", [])
+        # The API server filters the nodes; --nodepool first needs the
+        # provider's node pool label
+        if selector is not None:
+            selector = selector.resolve(context, options.transport)
         
-        # Display context information
-        current_context = context or get_current_context()
-        if not clear_screen:  # Only show context header in non-watch mode initially
-            print(f"Context: {current_context}")
-            print()
+        # Pod requests and metrics are fetched while the nodes are
+        start_sources(sources, context=context, transport=options.transport)
         
-        if not nodes:
-            print("No nodes found in the cluster.")
-            return
+        # A running daemon answers from its watch cache
+        nodes_data = None
+        if options.use_daemon and not options.page_size and daemon_available(options.daemon_socket):
+            current_context = context or get_current_context()
+            if current_context != "unknown":
+                nodes_data = daemon_get_nodes(current_context, options.daemon_socket,
+                                              projection=projection, selector=selector)
         
-        # Initialize provider manager
-        provider_manager = ProviderManager()
+        # Get nodes data from kubectl, page by page if requested so only
+        # one page of raw node objects is held in memory at a time
+        if nodes_data is not None:
+            pages = [nodes_data.get("items", [])]
+        elif options.page_size:
+            pages = kubectl_get_node_pages(
+                context=context, transport=options.transport, page_size=options.page_size,
+                selector=selector
+            )
+            # Fetch the first page now, next to the sources
+            pages = itertools.chain([next(pages, [])], pages)
+        elif options.cache and not clear_screen:
+            # One-shot runs may reuse a recent list; watch mode always asks
+            nodes_data = cached_get_nodes(
+                context=context, transport=options.transport, ttl=options.cache_ttl,
+                projection=projection, selector=selector
+            )
+            pages = [nodes_data.get("items", [])]
+        else:
+            nodes_data = kubectl_get_nodes(context=context, transport=options.transport,
+                                           projection=projection, selector=selector)
+            pages = [nodes_data.get("items", [])]
         
-        # Get all headers needed for this set of nodes
-        headers = provider_manager.get_all_headers(nodes)
+        # The nodes were fetched for this call alone, so each node object
+        # is freed as soon as its record is built
+        pages = provider_manager.node_records(pages, release=True)
         
-        # Extract information for each node
-        table_data = []
-        for node in nodes:
-            row_data = provider_manager.get_node_info(node, headers)
-            table_data.append(row_data)
+        status_lines = wait_for_sources(sources)
+        if status_lines and not clear_screen:
+            for line in status_lines:
+                print(f"Warning: {line}", file=sys.stderr)
         
-        # Display the table
-        print(tabulate(table_data, headers=headers, tablefmt="plain"))
+        if summary is not None:
+            summary.add(pages).check()
+            if options.output not in RECORD_FORMATS:
+                print(f"Context: {context or get_current_context()}")
+                print()
+            with phase("render"):
+                summary.write(options.output, options.table_format)
+            return
+        
+        if options.output in RECORD_FORMATS and (order is None or order.header is None):
+            # Each node is written out as soon as it is extracted
+            with phase("write_records") as span:
+                if WRITERS[options.output].keyed:
+                    # Each record keeps its provider's columns, whatever page it is on
+                    records = provider_manager.stream_records(pages)
+                    if order is not None:
+                        records = itertools.islice(records, order.limit)
+                    span.set(nodes=write_keyed_records(records, options.output))
+                else:
+                    headers, rows = provider_manager.stream_rows(pages)
+                    if order is not None:
+                        rows = itertools.islice(rows, order.limit)
+                    span.set(nodes=write_records(headers, rows, options.output))
+            return
         
-        if clear_screen:
-            # Add timestamp and context for watch mode
-            print(f"\nContext: {current_context}")
-            print(f"Last updated: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        headers, rows = provider_manager.collect_rows(pages, order)
+        if order is not None and rows:
+            order.check(headers)
+        
+        if options.output in RECORD_FORMATS:
+            with phase("write_records") as span:
+                span.set(nodes=write_records(headers, rows, options.output))
+            return
+        
+        # Display context information
+        current_context = context or get_current_context()
+        render_table(headers, rows, current_context, clear_screen=clear_screen,
+                     status_lines=status_lines if clear_screen else None, renderer=renderer,
+                     table_format=options.table_format)
         
     except KubectlNodeError as e:
+        if renderer is not None:
+            renderer.invalidate()
         print(f"Error: {e}", file=sys.stderr)
         if hasattr(e, 'stderr') and e.stderr:
             print(f"kubectl stderr: {e.stderr}", file=sys.stderr)
         if not clear_screen:  # Don't exit in watch mode
             sys.exit(1)
     except Exception as e:
+        if renderer is not None:
+            renderer.invalidate()
         print(f"Unexpected error: {e}", file=sys.stderr)
         if not clear_screen:  # Don't exit in watch mode
             sys.exit(1)
 
 
-def watch_nodes(context=None, interval=2):
+def display_contexts(options):
+    """Display the nodes of several contexts, fetched concurrently, in one table."""
+    from .utils import list_contexts
+    from .fanout import fetch_contexts, merge_results, context_errors
+    from .exceptions import SortError
+    from .output import RECORD_FORMATS, write_records
+    from .table import write_table
+    
+    if options.all_contexts:
+        contexts = list_contexts()
+    else:
+        contexts = [ctx.strip() for ctx in options.contexts.split(",") if ctx.strip()]
+    
+    if not contexts:
+        print("No contexts found. Make sure kubectl is configured.", file=sys.stderr)
+        sys.exit(1)
+    
+    # Each context is ordered and limited on its own, then merged
+    order = row_order(options)
+    results = fetch_contexts(
+        contexts,
+        transport=options.transport,
+        timeout=options.context_timeout,
+        max_workers=options.max_workers,
+        projected=not options.full_objects,
+        base_fields=base_fields(options),
+        requests=options.requests,
+        metrics=options.metrics,
+        metrics_timeout=options.metrics_timeout,
+        selector=node_selector(options),
+        order=order
+    )
+    headers, rows = merge_results(results, base_fields(options), order=order)
+    if order is not None and rows:
+        try:
+            order.check(headers)
+        except SortError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    if options.output in RECORD_FORMATS:
+        write_records(headers, rows, options.output)
+    else:
+        print(f"Contexts: {', '.join(contexts)}")
+        print()
+        write_table(headers, rows, options.table_format)
+    
+    # Failed clusters are reported inline; the run itself is not aborted
+    errors = context_errors(results)
+    warnings = [(result.context, line) for result in results for line in result.warnings]
+    if errors or warnings:
+        print()
+    for ctx, line in warnings:
+        print(f"Warning in context '{ctx}': {line}", file=sys.stderr)
+    if errors:
+        for ctx, error in errors.items():
+            print(f"Error in context '{ctx}': {error}", file=sys.stderr)
+            stderr = getattr(error, "stderr", None)
+            if stderr:
+                print(f"  kubectl stderr: {stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
+
+
+def stream_nodes(context, current_context, interval, options):
+    """Render nodes from a list+watch stream instead of re-listing every tick."""
+    from .watch import NodeWatcher
+    from .terminal import IncrementalRenderer
+    from .exceptions import KubectlNodeError, SortError
+    from .sources import start_sources, wait_for_sources
+    from .timings import phase
+    
+    provider_manager, sources = build_provider_manager(options)
+    projection = None if options.full_objects else provider_manager.projection()
+    order = row_order(options)
+    selector = node_selector(options)
+    if selector is not None:
+        try:
+            selector = selector.resolve(context, options.transport)
+        except KubectlNodeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    # The watched nodes are kept as records, unless some column reads
+    # fields records do not carry
+    watcher = NodeWatcher(context=context, transport=options.transport,
+                          projection=projection, selector=selector,
+                          records=provider_manager.projection() is not None).start()
+    renderer = IncrementalRenderer()
+    
+    while True:
+        if watcher.synced.wait(interval):
+            status_lines = []
+            if watcher.error is not None:
+                status_lines.append(f"Watch error (retrying): {watcher.error}")
+            with phase("tick", events=watcher.events, relists=watcher.relists) as span:
+                # Pods and metrics are not watched; they are fetched every tick
+                start_sources(sources, context=context, transport=options.transport)
+                nodes = watcher.snapshot()
+                status_lines.extend(wait_for_sources(sources))
+                span.set(nodes=len(nodes))
+                try:
+                    render_nodes(nodes, current_context, clear_screen=True, order=order,
+                                 status_lines=status_lines, renderer=renderer,
+                                 provider_manager=provider_manager,
+                                 table_format=options.table_format)
+                except SortError as e:
+                    # A mistyped column; every later tick would fail the same way
+                    renderer.invalidate()
+                    print(f"Error: {e}", file=sys.stderr)
+                    sys.exit(1)
+            time.sleep(interval)
+        elif watcher.error is not None:
+            renderer.invalidate()
+            print(f"Error: {watcher.error}", file=sys.stderr)
+
+
+def watch_nodes(context=None, interval=2, options=None):
     """Watch nodes and refresh display periodically."""
+    from .utils import get_current_context
+    from .terminal import IncrementalRenderer
+    from .timings import phase
+    
+    options = options or default_options()
     current_context = context or get_current_context()
     print(f"Watching nodes in context '{current_context}' (press Ctrl+C to stop)...")
     print(f"Refresh interval: {interval} seconds\n")
     
     try:
-        while True:
-            display_nodes(context=context, clear_screen=True)
-            time.sleep(interval)
+        if options.poll:
+            renderer = IncrementalRenderer()
+            provider_manager, sources = build_provider_manager(options)
+            while True:
+                with phase("tick"):
+                    display_nodes(context=context, clear_screen=True, options=options,
+                                  renderer=renderer, provider_manager=provider_manager,
+                                  sources=sources)
+                time.sleep(interval)
+        else:
+            stream_nodes(context, current_context, interval, options)
     except KeyboardInterrupt:
         print("\n\nWatch stopped.")
         sys.exit(0)
 
 
+def run_daemon(options):
+    """Serve cached node lists on the daemon socket until interrupted."""
+    from .daemon import NodeDaemon
+    from .exceptions import DaemonError
+    
+    daemon = NodeDaemon(options.daemon_socket, transport=options.transport)
+    try:
+        daemon.bind()
+    except (DaemonError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Serving node lists on {daemon.socket_path} (press Ctrl+C to stop)...")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.shutdown()
+        print("\nDaemon stopped.")
+
+
+def show_daemon_status(options):
+    """Print the daemon's per-context cache age and hit/miss counters."""
+    from .daemon import default_socket_path, query_daemon
+    from .table import write_table
+    
+    socket_path = options.daemon_socket or default_socket_path()
+    stats = query_daemon({"op": "stats"}, socket_path)
+    if stats is None:
+        print(f"No daemon is listening on {socket_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"Daemon pid {stats['pid']} on {socket_path}, up {stats['uptime']:.0f}s "
+          f"(transport: {stats['transport']})")
+    print()
+    headers = ["CONTEXT", "NODES", "AGE", "HITS", "MISSES", "EVENTS", "RELISTS", "ERROR"]
+    rows = []
+    for name, context in sorted(stats["contexts"].items()):
+        age = "N/A" if context["age"] is None else f"{context['age']:.1f}s"
+        rows.append([name, context["nodes"], age, context["hits"], context["misses"],
+                     context["events"], context["relists"], context["error"] or ""])
+    if rows:
+        write_table(headers, rows)
+    else:
+        print("No contexts cached yet.")
+
+
 def list_available_contexts():
     """List available kubectl contexts."""
+    from .utils import get_current_context, list_contexts
+    
     contexts = list_contexts()
     current = get_current_context()
     
@@ -93,8 +468,8 @@ def list_available_contexts():
         print(f"{marker} {ctx}")
 
 
-def parse_args():
-    """Parse command line arguments."""
+def build_parser():
+    """Build the command line argument parser."""
     parser = argparse.ArgumentParser(
         description="Enhanced kubectl node information with cloud provider details",
         prog="kubectl-node"
@@ -114,6 +489,51 @@ def parse_args():
         help="Refresh interval for watch mode (default: 2 seconds)"
     )
     
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="In watch mode, re-list all nodes every interval instead of "
+             "streaming incremental changes"
+    )
+    
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Fetch and process nodes in pages of N (limit/continue, or kubectl "
+             "--chunk-size) to bound memory on very large clusters; csv and tsv "
+             "output then only has the provider columns of the first page"
+    )
+    
+    parser.add_argument(
+        "--full-objects",
+        action="store_true",
+        help="Fetch whole node objects instead of only the fields the columns need"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Use the on-disk node list cache; results may be up to --cache-ttl old"
+    )
+    
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        metavar="SECONDS",
+        help=f"With --cache, reuse a cached node list this young without asking the API server; "
+             f"older entries are revalidated by resourceVersion (default: {DEFAULT_CACHE_TTL})"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Do not use the node list cache (the default; overrides an earlier --cache)"
+    )
+    
     parser.add_argument(
         "--context",
         type=str,
@@ -121,19 +541,243 @@ def parse_args():
         help="Kubectl context to use (default: current context)"
     )
     
+    parser.add_argument(
+        "--contexts",
+        type=str,
+        metavar="A,B,C",
+        help="Show nodes of several contexts, fetched concurrently, in one table"
+    )
+    
+    parser.add_argument(
+        "--all-contexts",
+        action="store_true",
+        help="Show nodes of every context in the kubeconfig in one table"
+    )
+    
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        metavar="N",
+        help=f"Contexts fetched concurrently with --contexts/--all-contexts "
+             f"(default: {DEFAULT_MAX_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--context-timeout",
+        type=float,
+        default=DEFAULT_CONTEXT_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Deadline per context with --contexts/--all-contexts; slower "
+             f"clusters are reported as timed out (default: {DEFAULT_CONTEXT_TIMEOUT})"
+    )
+    
+    parser.add_argument(
+        "-l", "--selector",
+        metavar="SELECTOR",
+        help="Only show nodes matching this label selector (e.g. "
+             "'tier=web,zone!=a'); the API server does the filtering"
+    )
+    
+    parser.add_argument(
+        "--field-selector",
+        metavar="SELECTOR",
+        help="Only show nodes matching this field selector (e.g. "
+             "'spec.unschedulable=false'); the API server does the filtering"
+    )
+    
+    parser.add_argument(
+        "--nodepool",
+        metavar="NAME",
+        help="Only show nodes of this node pool, selected by the provider's "
+             "label (GKE node pool, EKS node group or AKS agent pool)"
+    )
+    
+    parser.add_argument(
+        "--requests",
+        action="store_true",
+        help="Add PODS, CPU-REQ and MEM-REQ columns: pods scheduled on each node "
+             "and their resource requests against its allocatable capacity"
+    )
+    
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Add CPU%% and MEM%% columns: live usage from the metrics API "
+             "(as kubectl top nodes) against each node's allocatable capacity"
+    )
+    
+    parser.add_argument(
+        "--metrics-timeout",
+        type=float,
+        default=DEFAULT_METRICS_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Give up on the metrics API after this long and show N/A "
+             f"(default: {DEFAULT_METRICS_TIMEOUT})"
+    )
+    
+    parser.add_argument(
+        "-o", "--output",
+        choices=OUTPUT_FORMATS,
+        default="table",
+        help="Output format: a table, a wide table with extra columns, or one "
+             "record per node as json, ndjson, csv or tsv, written as each node "
+             "is extracted (default: table)"
+    )
+    
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Instead of one row per node, print node counts per provider, zone, "
+             "instance type, kubelet version and status, and the age distribution"
+    )
+    
+    parser.add_argument(
+        "--group-by",
+        metavar="COLUMNS",
+        help="Columns --summary counts nodes by, comma-separated; join columns "
+             "with + to count their combinations (e.g. zone,provider+instance-type)"
+    )
+    
+    parser.add_argument(
+        "--sort-by",
+        type=str.upper,
+        metavar="COLUMN",
+        help="Sort rows by a column: AGE by creation time, versions "
+             "semantically, IPs and numbers numerically; missing values last"
+    )
+    
+    parser.add_argument(
+        "--reverse",
+        action="store_true",
+        help="Sort in descending order (e.g. --sort-by AGE --reverse for the oldest first)"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        metavar="N",
+        help="Show only the first N rows; with --sort-by, the top N are "
+             "selected without sorting every row"
+    )
+    
+    parser.add_argument(
+        "--table-format",
+        default=DEFAULT_TABLE_FORMAT,
+        metavar="FORMAT",
+        help="Table style: plain, or any tabulate format such as github, grid "
+             "or simple (default: plain)"
+    )
+    
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print how long each phase took, with byte and node counts, to stderr"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write every phase (every tick in watch mode) to FILE as Chrome "
+             "trace events, for chrome://tracing or Perfetto"
+    )
+    
+    parser.add_argument(
+        "--trace-allocations",
+        action="store_true",
+        help="With --trace or --timings, also record Python heap growth per "
+             "phase (tracemalloc; slows everything down)"
+    )
+    
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run a daemon that keeps a watch-driven node cache per context and "
+             "serves it over a Unix socket; other invocations use it automatically"
+    )
+    
+    parser.add_argument(
+        "--daemon-status",
+        action="store_true",
+        help="Show the running daemon's cache age and hit/miss counters and exit"
+    )
+    
+    parser.add_argument(
+        "--daemon-socket",
+        metavar="PATH",
+        help="Daemon socket (default: $KUBECTL_NODE_SOCKET, or kubectl-node.sock "
+             "in $XDG_RUNTIME_DIR or the cache directory)"
+    )
+    
+    parser.add_argument(
+        "--no-daemon",
+        dest="use_daemon",
+        action="store_false",
+        help="Do not ask a running daemon; always list the cluster"
+    )
+    
     parser.add_argument(
         "--list-contexts",
         action="store_true",
         help="List available kubectl contexts and exit"
     )
     
+    parser.add_argument(
+        "--transport",
+        choices=["kubectl", "native"],
+        default=os.environ.get("KUBECTL_NODE_TRANSPORT", "kubectl"),
+        help="How to reach the API server: fork kubectl, or talk to it natively "
+             "using the kubeconfig (default: kubectl, or $KUBECTL_NODE_TRANSPORT)"
+    )
+    
     parser.add_argument(
         "--version",
         action="version",
         version="kubectl-node-cloud 0.2.0"
     )
     
-    return parser.parse_args()
+    return parser
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.contexts or args.all_contexts:
+        if args.context:
+            parser.error("--context cannot be combined with --contexts/--all-contexts")
+        if args.contexts and args.all_contexts:
+            parser.error("--contexts and --all-contexts are mutually exclusive")
+        if args.watch:
+            parser.error("--watch cannot be combined with --contexts/--all-contexts")
+    
+    if args.watch and args.output not in ("table", "wide"):
+        parser.error(f"--watch cannot be combined with -o {args.output}")
+    
+    if args.summary or args.group_by:
+        if args.watch or args.contexts or args.all_contexts:
+            parser.error("--summary cannot be combined with --watch or --contexts/--all-contexts")
+        if args.sort_by or args.limit:
+            parser.error("--summary cannot be combined with --sort-by or --limit")
+    
+    if args.limit is not None and args.limit < 1:
+        parser.error("--limit must be at least 1")
+    if args.reverse and not args.sort_by:
+        parser.error("--reverse requires --sort-by")
+    
+    if args.nodepool is not None:
+        from .selector import LABEL_VALUE
+        if not args.nodepool or not LABEL_VALUE.match(args.nodepool):
+            parser.error(f"--nodepool '{args.nodepool}' is not a valid label value")
+    
+    if args.table_format != DEFAULT_TABLE_FORMAT:
+        from tabulate import tabulate_formats
+        if args.table_format not in tabulate_formats:
+            parser.error(f"unknown --table-format '{args.table_format}' "
+                         f"(choose from {', '.join(sorted(tabulate_formats))})")
+    
+    return args
 
 
 def main():
@@ -144,10 +788,45 @@ def main():
         list_available_contexts()
         return
     
-    if args.watch:
-        watch_nodes(context=args.context, interval=args.watch_interval)
-    else:
-        display_nodes(context=args.context)
+    if args.daemon_status:
+        show_daemon_status(args)
+        return
+    
+    if args.daemon:
+        run_daemon(args)
+        return
+    
+    recorder = None
+    if args.timings or args.trace:
+        from .timings import start_recording
+        try:
+            recorder = start_recording(args.trace, allocations=args.trace_allocations)
+        except OSError as e:
+            print(f"Error: cannot write trace file '{args.trace}': {e.strerror}", file=sys.stderr)
+            sys.exit(1)
+    
+    try:
+        if args.watch:
+            watch_nodes(context=args.context, interval=args.watch_interval, options=args)
+        else:
+            display_nodes(context=args.context, options=args)
+    finally:
+        if recorder is not None:
+            report_timings(args)
+
+
+def report_timings(options):
+    """Stop recording, and print the per-phase breakdown if asked to."""
+    from .timings import stop_recording
+    
+    recorder = stop_recording()
+    sys.stdout.flush()
+    if options.timings:
+        print(file=sys.stderr)
+        for line in recorder.summary():
+            print(line, file=sys.stderr)
+    if options.trace:
+        print(f"Trace written to {options.trace}", file=sys.stderr)
 
 
 if __name__ == "__main__":
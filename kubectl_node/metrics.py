@@ -0,0 +1,75 @@
+"""Live node CPU and memory usage from the metrics API (``kubectl top nodes``).
+
+metrics-server is an add-on: it may be missing, or slow to answer while it
+starts. The NodeMetrics list is therefore fetched next to the node list
+with a deadline, and the CPU% and MEM% columns show "N/A" whenever it is
+not available in time.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from .columns import Extractor, reads
+from .config import DEFAULT_METRICS_TIMEOUT
+from .record import NodeRecord
+from .sources import ColumnSource, allocatable
+from .timings import phase
+from .utils import api_get, parse_cpu_millis, parse_memory_bytes
+
+NODE_METRICS_PATH = "/apis/metrics.k8s.io/v1beta1/nodes"
+
+
+def parse_node_metrics(metrics_list: Dict[str, Any]) -> Dict[str, Tuple[int, int]]:
+    """Map node names to their CPU (millicores) and memory (bytes) usage."""
+    usage = {}
+    for item in metrics_list.get("items") or ():
+        name = (item.get("metadata") or {}).get("name")
+        resources = item.get("usage") or {}
+        try:
+            usage[name] = (parse_cpu_millis(resources["cpu"]),
+                           parse_memory_bytes(resources["memory"]))
+        except (KeyError, ValueError):
+            continue
+    return usage
+
+
+def _percent(used: int, total: Optional[int]) -> str:
+    if not total:
+        return "N/A"
+    return f"{used * 100 // total}%"
+
+
+class NodeMetrics(ColumnSource):
+    """Node CPU and memory usage as a share of allocatable, like ``kubectl top``."""
+
+    title = "Node metrics"
+
+    def __init__(self, deadline: Optional[float] = DEFAULT_METRICS_TIMEOUT):
+        super().__init__()
+        self.deadline = deadline
+
+    def fetch(self, context: Optional[str], transport: str,
+              timeout: Optional[float]) -> Dict[str, Tuple[int, int]]:
+        with phase("node_metrics") as span:
+            usage = parse_node_metrics(api_get(NODE_METRICS_PATH, context=context,
+                                               transport=transport, timeout=timeout))
+            span.set(nodes=len(usage))
+        return usage
+
+    def columns(self) -> Dict[str, Extractor]:
+        """Return the extractors of the CPU% and MEM% columns."""
+
+        @reads("metadata.name", "status.allocatable")
+        def cpu(node: NodeRecord) -> str:
+            usage = self.usage.get(node.name)
+            if usage is None:
+                return "N/A"
+            return _percent(usage[0], allocatable(node, "cpu", parse_cpu_millis))
+
+        @reads("metadata.name", "status.allocatable")
+        def memory(node: NodeRecord) -> str:
+            usage = self.usage.get(node.name)
+            if usage is None:
+                return "N/A"
+            return _percent(usage[1], allocatable(node, "memory", parse_memory_bytes))
+
+        return {"CPU%": cpu, "MEM%": memory}
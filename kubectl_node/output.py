@@ -0,0 +1,122 @@
+"""Machine-readable node output for kubectl-node-cloud."""
+
+import csv
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Sequence
+
+# Output formats written one record per node rather than as a table
+RECORD_FORMATS = ("json", "ndjson", "csv", "tsv")
+
+
+class RecordWriter(ABC):
+    """Write rows as records keyed by the headers, one at a time."""
+
+    # Whether each record can carry its own keys (see ``write_record``)
+    keyed = False
+
+    def __init__(self, headers: Sequence[str], stream=None):
+        self.headers = list(headers)
+        self.stream = stream or sys.stdout
+
+    def begin(self):
+        """Write whatever precedes the first record."""
+
+    @abstractmethod
+    def write(self, row: List[str]):
+        """Write one record."""
+        pass
+
+    def end(self):
+        """Write whatever follows the last record."""
+
+
+class KeyedWriter(RecordWriter):
+    """Records written as objects, which need not all have the same keys."""
+
+    keyed = True
+
+    def write(self, row: List[str]):
+        self.write_record(dict(zip(self.headers, row)))
+
+    @abstractmethod
+    def write_record(self, record: Dict[str, str]):
+        """Write one record with its own keys."""
+        pass
+
+
+class NDJSONWriter(KeyedWriter):
+    """One JSON object per line."""
+
+    def write_record(self, record: Dict[str, str]):
+        self.stream.write(json.dumps(record) + "\n")
+
+
+class JSONWriter(KeyedWriter):
+    """A JSON array of objects, written element by element."""
+
+    def begin(self):
+        self.count = 0
+
+    def write_record(self, record: Dict[str, str]):
+        self.stream.write(("[\n  " if not self.count else ",\n  ") + json.dumps(record))
+        self.count += 1
+
+    def end(self):
+        self.stream.write("\n]\n" if self.count else "[]\n")
+
+
+class DelimitedWriter(RecordWriter):
+    """A header line, then one delimited line per record."""
+
+    delimiter = ","
+
+    def begin(self):
+        self.writer = csv.writer(self.stream, delimiter=self.delimiter, lineterminator="\n")
+        self.writer.writerow(self.headers)
+
+    def write(self, row: List[str]):
+        self.writer.writerow(row)
+
+
+class TSVWriter(DelimitedWriter):
+    delimiter = "\t"
+
+
+WRITERS = {
+    "json": JSONWriter,
+    "ndjson": NDJSONWriter,
+    "csv": DelimitedWriter,
+    "tsv": TSVWriter,
+}
+
+
+def write_records(headers: Sequence[str], rows: Iterable[List[str]], output: str,
+                  stream=None) -> int:
+    """Write rows in a record format as they are produced; return the count.
+
+    ``rows`` may be a lazy iterator: each row is written as soon as it is
+    extracted, so nothing but the current record is held for output.
+    """
+    writer = WRITERS[output](headers, stream)
+    return _write(writer, writer.write, rows)
+
+
+def write_keyed_records(records: Iterable[Dict[str, str]], output: str, stream=None) -> int:
+    """Write records that each carry their own keys; return the count.
+
+    Only for formats whose writer is ``keyed``, i.e. the JSON ones.
+    """
+    writer = WRITERS[output]((), stream)
+    return _write(writer, writer.write_record, records)
+
+
+def _write(writer: RecordWriter, write, items) -> int:
+    writer.begin()
+    count = 0
+    for item in items:
+        write(item)
+        count += 1
+    writer.end()
+    return count
@@ -0,0 +1,220 @@
+"""Per-node pod counts and resource requests, joined from one pod listing.
+
+All pods are listed once and folded into per-node counters as they arrive,
+so memory grows with the number of nodes rather than the number of pods:
+kubectl prints only the fields counted, one pod per line, through a
+go-template and each line is counted as it is read; the native transport
+folds each page before fetching the next. The PODS, CPU-REQ and MEM-REQ
+columns then compare those counters with each node's
+``status.allocatable``.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .columns import Extractor, reads
+from .config import DEFAULT_POD_PAGE_SIZE
+from .exceptions import JSONParseError
+from .projection import MAP, STRING, Projection
+from .record import NodeRecord
+from .sources import ColumnSource, allocatable
+from .timings import phase
+from .utils import (
+    api_get, kubectl_stream_projected, parse_cpu_millis, parse_memory_bytes, format_cpu_millis,
+    format_memory_bytes, format_usage
+)
+
+# Only pods that are bound to a node and still hold their requests
+POD_FIELD_SELECTOR = "spec.nodeName!=,status.phase!=Succeeded,status.phase!=Failed"
+
+TERMINAL_PHASES = ("Succeeded", "Failed")
+
+# The pod fields the request columns count, with their projection kinds
+POD_FIELD_KINDS = {
+    "spec.nodeName": STRING,
+    "spec.containers": ("resources.requests.cpu", "resources.requests.memory"),
+    "spec.initContainers": ("restartPolicy", "resources.requests.cpu",
+                            "resources.requests.memory"),
+    "spec.overhead": MAP,
+    "status.phase": STRING,
+}
+
+POD_PROJECTION = Projection(POD_FIELD_KINDS, kinds=POD_FIELD_KINDS, required=())
+
+
+class NodeUsage:
+    """Pods scheduled on one node and the CPU and memory they request."""
+
+    __slots__ = ("pods", "cpu_millis", "memory_bytes")
+
+    def __init__(self):
+        self.pods = 0
+        self.cpu_millis = 0
+        self.memory_bytes = 0
+
+
+# Counters of nodes no pod is scheduled on
+_NO_PODS = NodeUsage()
+
+
+def _requests(container: Dict[str, Any]) -> Tuple[int, int]:
+    """Return the CPU (millicores) and memory (bytes) a container requests."""
+    requests = (container.get("resources") or {}).get("requests") or {}
+    cpu = requests.get("cpu")
+    memory = requests.get("memory")
+    return (parse_cpu_millis(cpu) if cpu else 0,
+            parse_memory_bytes(memory) if memory else 0)
+
+
+def pod_requests(spec: Dict[str, Any]) -> Tuple[int, int]:
+    """Return the effective CPU and memory requests of a pod, as the scheduler sees them.
+
+    That is the larger of the containers' sum and the largest init
+    container, plus the pod overhead. Init containers with
+    ``restartPolicy: Always`` (sidecars) keep running, so they count with
+    the containers and with every init container started after them.
+    """
+    cpu = memory = 0
+    for container in spec.get("containers") or ():
+        container_cpu, container_memory = _requests(container)
+        cpu += container_cpu
+        memory += container_memory
+
+    init_cpu = init_memory = 0
+    sidecar_cpu = sidecar_memory = 0
+    for container in spec.get("initContainers") or ():
+        container_cpu, container_memory = _requests(container)
+        if container.get("restartPolicy") == "Always":
+            sidecar_cpu += container_cpu
+            sidecar_memory += container_memory
+            container_cpu, container_memory = 0, 0
+        init_cpu = max(init_cpu, sidecar_cpu + container_cpu)
+        init_memory = max(init_memory, sidecar_memory + container_memory)
+
+    cpu = max(cpu + sidecar_cpu, init_cpu)
+    memory = max(memory + sidecar_memory, init_memory)
+
+    overhead = spec.get("overhead") or {}
+    if overhead.get("cpu"):
+        cpu += parse_cpu_millis(overhead["cpu"])
+    if overhead.get("memory"):
+        memory += parse_memory_bytes(overhead["memory"])
+    return cpu, memory
+
+
+def fold_pods(usage: Dict[str, NodeUsage], pods: Iterable[Dict[str, Any]]):
+    """Fold pods into per-node counters, skipping unbound and finished pods."""
+    for pod in pods:
+        spec = pod.get("spec") or {}
+        node_name = spec.get("nodeName")
+        if not node_name or (pod.get("status") or {}).get("phase") in TERMINAL_PHASES:
+            continue
+        counters = usage.get(node_name)
+        if counters is None:
+            counters = usage[node_name] = NodeUsage()
+        cpu, memory = pod_requests(spec)
+        counters.pods += 1
+        counters.cpu_millis += cpu
+        counters.memory_bytes += memory
+
+
+def _count(pods: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, NodeUsage], int]:
+    """Fold pods into per-node counters as they arrive; only the counters are kept."""
+    usage = {}
+    total = 0
+    for total, pod in enumerate(pods, 1):
+        fold_pods(usage, (pod,))
+    return usage, total
+
+
+class NodeRequests(ColumnSource):
+    """Pod counts and requests per node name, counted from a pod listing.
+
+    ``columns()`` returns extractors for the PODS, CPU-REQ and MEM-REQ
+    columns; they read whatever the last fetch counted, so extraction
+    plans compiled with them stay valid across watch ticks. Listing pods
+    commonly fails on RBAC; the columns then show "N/A".
+    """
+
+    title = "Pod requests"
+
+    def __init__(self, page_size: int = DEFAULT_POD_PAGE_SIZE):
+        super().__init__()
+        self.page_size = page_size
+
+    def add_pods(self, pods: Iterable[Dict[str, Any]]):
+        """Fold pods into the current counters."""
+        fold_pods(self.usage, pods)
+
+    def fetch(self, context: Optional[str], transport: str,
+              timeout: Optional[float]) -> Dict[str, NodeUsage]:
+        """List all pods and count them per node.
+
+        kubectl prints only ``POD_FIELD_KINDS`` through a go-template,
+        fetching the pods in chunks of ``page_size``, and each line is
+        counted as it is read. The native transport, and kubectl when a
+        value cannot go through the template, list whole pods in pages.
+        """
+        from .client import native_available
+        with phase("pod_requests") as span:
+            usage = None
+            if transport != "native" or not native_available(context):
+                args = ["--all-namespaces", f"--field-selector={POD_FIELD_SELECTOR}",
+                        f"--chunk-size={self.page_size}"]
+                try:
+                    usage, pods = _count(kubectl_stream_projected(
+                        "pods", POD_PROJECTION, args, context=context, timeout=timeout))
+                except JSONParseError:
+                    transport = "kubectl"
+            if usage is None:
+                usage, pods = _count(
+                    pod for page in self._pages(context, transport, timeout) for pod in page)
+            span.set(nodes=len(usage), pods=pods)
+        return usage
+
+    def _pages(self, context: Optional[str], transport: str,
+               timeout: Optional[float]) -> Iterator[List[Dict[str, Any]]]:
+        params = {"limit": self.page_size, "fieldSelector": POD_FIELD_SELECTOR}
+        while True:
+            page = api_get("/api/v1/pods", params, context=context, transport=transport,
+                           timeout=timeout)
+            yield page.get("items") or []
+            token = page.get("metadata", {}).get("continue")
+            del page
+            if not token:
+                break
+            params["continue"] = token
+
+    def get(self, node_name: str) -> Optional[NodeUsage]:
+        """Return a node's counters; nodes without pods count as empty."""
+        if not self.loaded:
+            return None
+        return self.usage.get(node_name, _NO_PODS)
+
+    def columns(self) -> Dict[str, Extractor]:
+        """Return the extractors of the request columns."""
+
+        @reads("metadata.name", "status.allocatable")
+        def pods(node: NodeRecord) -> str:
+            counters = self.get(node.name)
+            if counters is None:
+                return "N/A"
+            pod_capacity = allocatable(node, "pods", int)
+            return f"{counters.pods}/{pod_capacity}" if pod_capacity else str(counters.pods)
+
+        @reads("metadata.name", "status.allocatable")
+        def cpu(node: NodeRecord) -> str:
+            counters = self.get(node.name)
+            if counters is None:
+                return "N/A"
+            return format_usage(format_cpu_millis(counters.cpu_millis), counters.cpu_millis,
+                                allocatable(node, "cpu", parse_cpu_millis))
+
+        @reads("metadata.name", "status.allocatable")
+        def memory(node: NodeRecord) -> str:
+            counters = self.get(node.name)
+            if counters is None:
+                return "N/A"
+            return format_usage(format_memory_bytes(counters.memory_bytes), counters.memory_bytes,
+                                allocatable(node, "memory", parse_memory_bytes))
+
+        return {"PODS": pods, "CPU-REQ": cpu, "MEM-REQ": memory}
@@ -0,0 +1,177 @@
+"""Node field projections derived from the columns being displayed.
+
+Most of a node object is ``status.images`` and other fields no column reads.
+A projection is the set of dotted field paths the active columns (and
+provider detection) need; it prunes fetched nodes down to those fields and,
+for the kubectl transport, generates a go-template so kubectl only prints
+them in the first place. Pods are projected the same way for the request
+columns, with their own field kinds (``pods.POD_FIELD_KINDS``).
+"""
+
+import json
+from typing import Dict, Any, Iterable, List
+
+from .config import FIELD_MAPPINGS
+from .exceptions import JSONParseError
+
+# Field kinds a projection knows how to carry through a go-template
+STRING = "string"
+BOOL = "bool"
+MAP = "map"
+
+# Every field a column may read, with its kind. Lists of objects are given
+# as the tuple of string keys kept for each element; a dotted key reaches
+# into nested objects of the element.
+FIELD_KINDS = {
+    "metadata.name": STRING,
+    "metadata.uid": STRING,
+    "metadata.resourceVersion": STRING,
+    "metadata.creationTimestamp": STRING,
+    "metadata.labels": MAP,
+    "metadata.annotations": MAP,
+    "spec.providerID": STRING,
+    "spec.podCIDR": STRING,
+    "spec.unschedulable": BOOL,
+    "spec.taints": ("key", "value", "effect"),
+    "status.conditions": ("type", "status", "reason"),
+    "status.addresses": ("type", "address"),
+    "status.capacity": MAP,
+    "status.allocatable": MAP,
+    **{f"status.nodeInfo.{key}": STRING for key in sorted(set(FIELD_MAPPINGS.values()) | {
+        "architecture", "operatingSystem", "kubeProxyVersion", "machineID", "systemUUID", "bootID"
+    })},
+}
+
+# Needed for every node regardless of columns: keying, memoization, sorting
+REQUIRED_FIELDS = ("metadata.name", "metadata.uid", "metadata.resourceVersion")
+
+
+class Projection:
+    """A fixed set of node field paths.
+
+    ``kinds`` and ``required`` default to those of nodes; other resources
+    give their own.
+    """
+
+    def __init__(self, paths: Iterable[str], kinds: Dict[str, Any] = FIELD_KINDS,
+                 required: Iterable[str] = REQUIRED_FIELDS):
+        self.kinds = kinds
+        self.paths = tuple(sorted(set(paths) | set(required)))
+        self._split = [(path, path.split(".")) for path in self.paths]
+
+    def prune(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of a node holding only the projected fields."""
+        pruned = {}
+        for path, keys in self._split:
+            value = node
+            for key in keys:
+                if not isinstance(value, dict) or key not in value:
+                    break
+                value = value[key]
+            else:
+                kind = self.kinds.get(path)
+                if isinstance(kind, tuple) and isinstance(value, list):
+                    # Lists keep only the element keys the template carries
+                    value = [_prune_element(element, kind) for element in value]
+                _set_path(pruned, keys, value)
+        # Extractors index these directly, as kubectl always sends them
+        pruned.setdefault("metadata", {})
+        pruned.setdefault("spec", {})
+        pruned.setdefault("status", {})
+        return pruned
+
+    def prune_list(self, node_list: Dict[str, Any]) -> Dict[str, Any]:
+        """Prune every node of a node list in place and return the list."""
+        node_list["items"] = [self.prune(node) for node in node_list.get("items", [])]
+        return node_list
+
+    def supports_template(self) -> bool:
+        """Check whether every path can be carried through a go-template."""
+        return all(path in self.kinds for path in self.paths)
+
+    def go_template(self) -> str:
+        """Generate a go-template that prints one JSON array per node.
+
+        Each array holds the projected field values in path order; missing
+        fields print as null. ``parse_template_output`` turns the lines back
+        into (pruned) node objects.
+        """
+        values = ",".join(_template_value(keys, self.kinds[path]) for path, keys in self._split)
+        return "{{range .items}}[" + values + "]{{\"\\n\"}}{{end}}"
+
+    def parse_template_output(self, output: str) -> List[Dict[str, Any]]:
+        """Decode the output of ``go_template`` into node objects."""
+        return [self.parse_template_line(line) for line in output.splitlines() if line.strip()]
+
+    def parse_template_line(self, line: str) -> Dict[str, Any]:
+        """Decode one line of ``go_template`` output into an object."""
+        try:
+            values = json.loads(line)
+        except ValueError as e:
+            raise JSONParseError(f"Failed to parse projected kubectl output: {e}",
+                                 raw_output=line[:1000])
+        node = {"metadata": {}, "spec": {}, "status": {}}
+        for (path, keys), value in zip(self._split, values):
+            if value is not None:
+                _set_path(node, keys, _decode_value(self.kinds[path], value))
+        return node
+
+
+def _set_path(target: Dict[str, Any], keys: List[str], value: Any):
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+
+def _prune_element(element: Dict[str, Any], kind) -> Dict[str, Any]:
+    pruned = {}
+    for key in kind:
+        keys = key.split(".")
+        value = element
+        for part in keys:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            _set_path(pruned, keys, value)
+    return pruned
+
+
+def _quoted(key: str) -> str:
+    # Go's %q output is a valid JSON string for the label, name and version
+    # values found on nodes; anything else fails to parse and is refetched
+    keys = key.split(".")
+    return ("".join("{{with ." + part + "}}" for part in keys) + "{{printf \"%q\" .}}"
+            + "{{else}}null{{end}}" * len(keys))
+
+
+def _template_value(keys: List[str], kind) -> str:
+    """Template fragment printing one field as JSON, null if missing."""
+    if kind == STRING:
+        leaf = "{{printf \"%q\" .}}"
+    elif kind == BOOL:
+        leaf = "true"
+    elif kind == MAP:
+        leaf = "[{{range $k, $v := .}}{{printf \"%q\" $k}},{{printf \"%q\" $v}},{{end}}null]"
+    else:
+        element = ",".join(_quoted(key) for key in kind)
+        leaf = "[{{range .}}[" + element + "],{{end}}null]"
+    # Nested withs so a missing intermediate object is not an error
+    return "".join("{{with ." + key + "}}" for key in keys) + leaf + "{{else}}null{{end}}" * len(keys)
+
+
+def _decode_value(kind, value):
+    if kind == MAP:
+        pairs = value[:-1]
+        return dict(zip(pairs[0::2], pairs[1::2]))
+    if isinstance(kind, tuple):
+        elements = []
+        for element in value[:-1]:
+            decoded = {}
+            for key, item in zip(kind, element):
+                if item is not None:
+                    _set_path(decoded, key.split("."), item)
+            elements.append(decoded)
+        return elements
+    return value
+
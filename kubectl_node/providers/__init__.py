@@ -1,5 +1,6 @@
 """Cloud provider modules for kubectl-node-cloud."""
 
-from .manager import ProviderManager
+from .detection import DetectionRules
+from .manager import ProviderManager, ProviderSpec
 
-__all__ = ['ProviderManager']
+__all__ = ['DetectionRules', 'ProviderManager', 'ProviderSpec']
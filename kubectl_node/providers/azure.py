@@ -1,40 +1,31 @@
 """Azure provider implementation."""
 
-from typing import Dict, List, Any
+from typing import Callable, Dict, List
+from ..columns import label_extractor
+from ..record import NodeRecord
 from .base import BaseProvider
+from .provider_id import provider_id_extractor
 
 
 class AzureProvider(BaseProvider):
     """Azure cloud provider implementation."""
     
+    nodepool_label = "kubernetes.azure.com/agentpool"
+    
     def __init__(self):
         super().__init__("azure")
     
-    def detect(self, node: Dict[str, Any]) -> bool:
-        """Detect if node is from Azure."""
-        labels = node["metadata"].get("labels", {})
-        return "kubernetes.azure.com/cluster" in labels
-    
-    def get_provider_fields(self, node: Dict[str, Any]) -> Dict[str, str]:
-        """Extract Azure-specific fields."""
-        labels = node["metadata"].get("labels", {})
-        
-        # Get instance type
-        instance_type = labels.get("node.kubernetes.io/instance-type", "N/A")
-        
-        # Get resource group
-        resource_group = labels.get("kubernetes.azure.com/resource-group", "N/A")
-        
-        # Get zone
-        zone = labels.get("failure-domain.beta.kubernetes.io/zone",
-                         labels.get("topology.kubernetes.io/zone", "N/A"))
-        
+    def get_field_extractors(self) -> Dict[str, Callable[[NodeRecord], str]]:
+        """Get one extractor per Azure-specific header."""
         return {
-            "AZURE-INSTANCE-TYPE": instance_type,
-            "AZURE-RESOURCE-GROUP": resource_group,
-            "AZURE-ZONE": zone
+            # Scale set instance name, <scale set>_<index>, from the provider ID
+            "AZURE-INSTANCE-ID": self.get_provider_id,
+            "AZURE-INSTANCE-TYPE": label_extractor("node.kubernetes.io/instance-type"),
+            "AZURE-RESOURCE-GROUP": provider_id_extractor(
+                "project", "kubernetes.azure.com/resource-group"),
+            "AZURE-ZONE": self.get_zone
         }
     
     def get_additional_headers(self) -> List[str]:
         """Get Azure-specific headers."""
-        return ["AZURE-INSTANCE-TYPE", "AZURE-RESOURCE-GROUP", "AZURE-ZONE"]
+        return ["AZURE-INSTANCE-ID", "AZURE-INSTANCE-TYPE", "AZURE-RESOURCE-GROUP", "AZURE-ZONE"]
@@ -1,23 +1,47 @@
 """Base provider class for cloud provider implementations."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Callable, Dict, List
+
+from ..columns import reads
+from ..record import NodeRecord, as_record
+from .detection import DetectionRules
+from .provider_id import REGION_LABELS, ZONE_LABELS, parse_provider_id, provider_id_extractor
 
 
 class BaseProvider(ABC):
-    """Base class for cloud provider implementations."""
+    """Base class for cloud provider implementations.
+    
+    Detection and extractors are handed ``record.NodeRecord`` instances,
+    which also answer ``node["metadata"]`` style lookups for providers
+    written against node objects. A node is detected by the provider's
+    rules in ``config.PROVIDER_DETECTION``; the manager looks them up in
+    its compiled ``DetectionTable`` rather than calling ``detect``.
+    """
+    
+    # Node fields ``detect`` reads, fetched even when no column needs them
+    detect_fields = ("metadata.labels",)
+    
+    # Label naming a node's pool, which --nodepool selects on; None if unknown
+    nodepool_label = None
     
     def __init__(self, name: str):
         self.name = name
+        self.detection = DetectionRules.for_provider(name)
+        if self.detection:
+            self.detect_fields = self.detection.fields
     
-    @abstractmethod
-    def detect(self, node: Dict[str, Any]) -> bool:
+    def detect(self, node: NodeRecord) -> bool:
         """Detect if this provider matches the given node."""
-        pass
+        return self.detection.matches(as_record(node))
     
     @abstractmethod
-    def get_provider_fields(self, node: Dict[str, Any]) -> Dict[str, str]:
-        """Extract provider-specific fields from node."""
+    def get_field_extractors(self) -> Dict[str, Callable[[NodeRecord], str]]:
+        """Get one extractor callable per provider-specific header.
+        
+        Each column is computed on its own, so columns the user does not
+        see are never computed.
+        """
         pass
     
     @abstractmethod
@@ -25,10 +49,16 @@ class BaseProvider(ABC):
         """Get additional headers specific to this provider."""
         pass
     
-    def get_provider_id(self, node: Dict[str, Any]) -> str:
-        """Extract provider ID from node spec."""
-        spec = node.get("spec", {})
-        provider_id = spec.get("providerID", "N/A")
-        if provider_id != "N/A" and "/" in provider_id:
-            return provider_id.split("/")[-1]
-        return provider_id
+    def get_provider_fields(self, node: NodeRecord) -> Dict[str, str]:
+        """Extract provider-specific fields from node."""
+        node = as_record(node)
+        return {header: extract(node) for header, extract in self.get_field_extractors().items()}
+    
+    @reads("spec.providerID")
+    def get_provider_id(self, node: NodeRecord) -> str:
+        """Extract the instance ID from the node's providerID."""
+        return parse_provider_id(node.provider_id).instance_id or "N/A"
+    
+    # Topology from the labels, or else from the providerID
+    get_zone = staticmethod(provider_id_extractor("zone", *ZONE_LABELS))
+    get_region = staticmethod(provider_id_extractor("region", *REGION_LABELS))
@@ -0,0 +1,133 @@
+"""Declarative provider detection, compiled into one lookup table.
+
+Providers are recognised by marker labels, annotations and providerID
+prefixes, declared per provider in ``config.PROVIDER_DETECTION``. Rather
+than asking every provider in turn, the rules of all providers are compiled
+into dicts keyed by label, annotation and providerID scheme, each pointing
+at the first provider (in detection order) that declares it. Classifying a
+node then takes one pass over its label keys, or over the marker labels if
+there are fewer of those, and a lookup of its providerID scheme, however
+many providers are registered.
+"""
+
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..config import PROVIDER_DETECTION
+from ..record import NodeRecord
+from .provider_id import parse_provider_id
+
+
+class DetectionRules:
+    """The marker labels, annotations and providerID prefixes of one provider.
+
+    A node matches if it carries any of them.
+    """
+
+    def __init__(self, labels: Sequence[str] = (), annotations: Sequence[str] = (),
+                 provider_ids: Sequence[str] = ()):
+        self.labels = tuple(labels)
+        self.annotations = tuple(annotations)
+        self.provider_ids = tuple(provider_ids)
+
+    @classmethod
+    def from_config(cls, rules: Dict[str, Sequence[str]]) -> "DetectionRules":
+        """Build rules from a ``config.PROVIDER_DETECTION`` entry."""
+        return cls(rules.get("labels", ()), rules.get("annotations", ()),
+                   rules.get("provider_ids", ()))
+
+    @classmethod
+    def for_provider(cls, name: str) -> "DetectionRules":
+        """Return the configured rules of a provider; none if it has no entry."""
+        return cls.from_config(PROVIDER_DETECTION.get(name, {}))
+
+    def __bool__(self) -> bool:
+        return bool(self.labels or self.annotations or self.provider_ids)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """The node fields the rules read."""
+        fields = ["metadata.labels"]
+        if self.annotations:
+            fields.append("metadata.annotations")
+        if self.provider_ids:
+            fields.append("spec.providerID")
+        return tuple(fields)
+
+    def matches(self, node: NodeRecord) -> bool:
+        """Check a single node against these rules."""
+        provider_id = node.provider_id or ""
+        return (any(label in node.labels for label in self.labels)
+                or any(annotation in node.annotations for annotation in self.annotations)
+                or any(provider_id.startswith(prefix) for prefix in self.provider_ids))
+
+
+class DetectionTable:
+    """The rules of several providers, compiled for classifying nodes.
+
+    ``lookup`` returns the position of the first provider, in the order the
+    rules were given, that a node matches.
+    """
+
+    def __init__(self, rules: Sequence[DetectionRules]):
+        self.labels = {}
+        self.annotations = {}
+        # providerID prefixes of the form "scheme://" by scheme; others are
+        # tried one by one
+        self.schemes = {}
+        self.prefixes = []
+        for index, rule in enumerate(rules):
+            for label in rule.labels:
+                self.labels.setdefault(label, index)
+            for annotation in rule.annotations:
+                self.annotations.setdefault(annotation, index)
+            for prefix in rule.provider_ids:
+                scheme, separator, rest = prefix.partition("://")
+                if separator and not rest:
+                    self.schemes.setdefault(scheme, index)
+                else:
+                    self.prefixes.append((prefix, index))
+        # Markers in detection order, for nodes with more keys than markers
+        self._label_markers = sorted(self.labels.items(), key=itemgetter(1))
+        self._annotation_markers = sorted(self.annotations.items(), key=itemgetter(1))
+
+        fields = {"metadata.labels"}
+        if self.annotations:
+            fields.add("metadata.annotations")
+        if self.schemes or self.prefixes:
+            fields.add("spec.providerID")
+        self.fields = tuple(sorted(fields))
+
+    def lookup(self, node: NodeRecord) -> Optional[int]:
+        """Return the position of the provider a node is detected as, or None."""
+        best = _first_marker(node.labels, self.labels, self._label_markers)
+        if self.annotations and node.annotations:
+            index = _first_marker(node.annotations, self.annotations, self._annotation_markers)
+            if index is not None and (best is None or index < best):
+                best = index
+        provider_id = node.provider_id
+        if provider_id and (self.schemes or self.prefixes):
+            # The parse is cached, and shared with the provider columns
+            index = self.schemes.get(parse_provider_id(provider_id).scheme)
+            if index is not None and (best is None or index < best):
+                best = index
+            for prefix, index in self.prefixes:
+                if (best is None or index < best) and provider_id.startswith(prefix):
+                    best = index
+        return best
+
+
+def _first_marker(keys: Dict[str, str], table: Dict[str, int],
+                  markers: List[Tuple[str, int]]) -> Optional[int]:
+    # Scan whichever is shorter: the node's keys, or the markers in order
+    if len(keys) <= len(markers):
+        best = None
+        for key in keys:
+            index = table.get(key)
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+    for marker, index in markers:
+        if marker in keys:
+            return index
+    return None
@@ -1,6 +1,7 @@
 """Generic provider for non-cloud or unknown providers."""
 
-from typing import Dict, List, Any
+from typing import Callable, Dict, List
+from ..record import NodeRecord
 from .base import BaseProvider
 
 
@@ -10,12 +11,12 @@ class GenericProvider(BaseProvider):
     def __init__(self):
         super().__init__("generic")
     
-    def detect(self, node: Dict[str, Any]) -> bool:
+    def detect(self, node: NodeRecord) -> bool:
         """Generic provider always matches as fallback."""
         return True
     
-    def get_provider_fields(self, node: Dict[str, Any]) -> Dict[str, str]:
-        """Generic provider has no additional fields."""
+    def get_field_extractors(self) -> Dict[str, Callable[[NodeRecord], str]]:
+        """Generic provider has no additional columns."""
         return {}
     
     def get_additional_headers(self) -> List[str]:
@@ -0,0 +1,26 @@
+"""Hetzner Cloud provider implementation."""
+
+from typing import Callable, Dict, List
+from ..record import NodeRecord
+from .base import BaseProvider
+
+
+class HetznerProvider(BaseProvider):
+    """Hetzner Cloud provider implementation."""
+    
+    def __init__(self):
+        super().__init__("hetzner")
+    
+    def get_field_extractors(self) -> Dict[str, Callable[[NodeRecord], str]]:
+        """Get one extractor per Hetzner-specific header."""
+        return {
+            # Server ID from provider ID
+            "HETZNER-SERVER-ID": self.get_provider_id,
+            # Location (fsn1) and datacenter (fsn1-dc14), from the labels
+            "HETZNER-REGION": self.get_region,
+            "HETZNER-ZONE": self.get_zone
+        }
+    
+    def get_additional_headers(self) -> List[str]:
+        """Get Hetzner-specific headers."""
+        return ["HETZNER-SERVER-ID", "HETZNER-REGION", "HETZNER-ZONE"]
@@ -0,0 +1,27 @@
+"""k3s provider implementation."""
+
+from typing import Callable, Dict, List
+from ..record import NodeRecord
+from .base import BaseProvider
+
+
+class K3sProvider(BaseProvider):
+    """k3s embedded cloud controller implementation.
+    
+    Its provider ID only names the node, so the columns come from the
+    topology labels set on the nodes.
+    """
+    
+    def __init__(self):
+        super().__init__("k3s")
+    
+    def get_field_extractors(self) -> Dict[str, Callable[[NodeRecord], str]]:
+        """Get one extractor per k3s-specific header."""
+        return {
+            "K3S-REGION": self.get_region,
+            "K3S-ZONE": self.get_zone
+        }
+    
+    def get_additional_headers(self) -> List[str]:
+        """Get k3s-specific headers."""
+        return ["K3S-REGION", "K3S-ZONE"]
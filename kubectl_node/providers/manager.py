@@ -1,92 +1,350 @@
 """Provider manager for automatic cloud provider detection."""
 
-from typing import Dict, List, Any, Optional
-from .aws import AWSProvider
-from .azure import AzureProvider
-from .gcp import GCPProvider
+import importlib
+import itertools
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Sequence, Tuple
+
+from ..columns import Extractor, ExtractionPlan
+from ..config import DEFAULT_FIELDS, PROVIDER_FIELDS
+from ..exceptions import ProviderDetectionError
+from ..projection import Projection
+from ..record import NodeRecord, as_record, records
+from ..timings import phase
 from .generic import GenericProvider
 from .base import BaseProvider
+from .detection import DetectionRules, DetectionTable
+
+
+class ProviderSpec:
+    """What is known about a provider before its module is imported.
+    
+    ``rules`` are its detection rules, from ``config.PROVIDER_DETECTION``
+    unless given as ``detection``; the provider class is only imported once
+    a node matches them. ``fields`` are the node fields its columns read,
+    so fetches can be projected without importing it, and ``headers`` its
+    columns, from ``config.PROVIDER_FIELDS`` unless given.
+    """
+    
+    def __init__(self, name: str, module: str, class_name: str,
+                 fields: Sequence[str] = (), detection: Optional[DetectionRules] = None,
+                 headers: Optional[Sequence[str]] = None):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.rules = DetectionRules.for_provider(name) if detection is None else detection
+        self.labels = self.rules.labels
+        self.fields = tuple(fields)
+        self.headers = tuple(PROVIDER_FIELDS.get(name, ()) if headers is None else headers)
+    
+    def load(self) -> BaseProvider:
+        """Import the provider module and instantiate the provider."""
+        try:
+            module = importlib.import_module(self.module, __package__)
+            provider_class = getattr(module, self.class_name)
+        except (ImportError, AttributeError) as e:
+            raise ProviderDetectionError(f"Cannot load provider '{self.name}': {e}")
+        return provider_class()
+
+
+# Cloud providers in detection order; the generic provider is the fallback
+PROVIDER_SPECS = [
+    ProviderSpec("aws", ".aws", "AWSProvider",
+                 fields=("metadata.labels", "spec.providerID", "spec.taints")),
+    ProviderSpec("azure", ".azure", "AzureProvider", fields=("metadata.labels", "spec.providerID")),
+    ProviderSpec("gcp", ".gcp", "GCPProvider", fields=("metadata.labels", "spec.providerID")),
+    ProviderSpec("openstack", ".openstack", "OpenStackProvider",
+                 fields=("metadata.labels", "spec.providerID")),
+    ProviderSpec("hetzner", ".hetzner", "HetznerProvider",
+                 fields=("metadata.labels", "spec.providerID")),
+    ProviderSpec("k3s", ".k3s", "K3sProvider", fields=("metadata.labels", "spec.providerID")),
+]
+
+# Entry-point group installed packages register provider specs under
+ENTRY_POINT_GROUP = "kubectl_node.providers"
+
+
+def _entry_points(group: str) -> List[Any]:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8: no plugin discovery
+        return []
+    try:
+        return list(entry_points(group=group))
+    except TypeError:  # Python < 3.10 returns all groups
+        return list(entry_points().get(group, ()))
+
+
+@lru_cache(maxsize=None)
+def plugin_specs() -> Tuple[ProviderSpec, ...]:
+    """Get the provider specs installed packages register, by name.
+    
+    Each entry point in the ``kubectl_node.providers`` group names a
+    ``ProviderSpec``, e.g. ``vsphere = acme_nodes.specs:VSPHERE``.
+    Loading it only imports the module defining the spec; the provider
+    module the spec points at is imported once a node matches its rules.
+    Discovery runs once per process. A plugin that fails to load is
+    skipped with a warning on stderr, so one broken package does not stop
+    the built-in providers from working.
+    """
+    specs = []
+    for entry_point in sorted(_entry_points(ENTRY_POINT_GROUP), key=lambda ep: ep.name):
+        try:
+            spec = entry_point.load()
+        except Exception as e:
+            _warn(f"Cannot load provider plugin '{entry_point.name}': {e}")
+            continue
+        if not isinstance(spec, ProviderSpec):
+            _warn(f"Provider plugin '{entry_point.name}' is not a ProviderSpec")
+            continue
+        specs.append(spec)
+    return tuple(specs)
+
+
+def _warn(message: str):
+    print(f"Warning: {message} (skipped)", file=sys.stderr)
+
+
+def default_specs() -> List[ProviderSpec]:
+    """Get the built-in cloud provider specs, then those of plugins.
+    
+    Plugins come after the built-in providers in detection order, and
+    one named like a built-in provider is ignored.
+    """
+    names = {spec.name for spec in PROVIDER_SPECS}
+    return PROVIDER_SPECS + [spec for spec in plugin_specs() if spec.name not in names]
 
 
 class ProviderManager:
     """Manages cloud provider detection and field extraction."""
     
-    def __init__(self):
-        # Order matters - generic should be last as it always matches
-        self.providers = [
-            AWSProvider(),
-            AzureProvider(), 
-            GCPProvider(),
-            GenericProvider()  # Fallback
-        ]
-    
-    def detect_provider(self, node: Dict[str, Any]) -> BaseProvider:
-        """Detect the cloud provider for a given node."""
+    def __init__(self, specs: Optional[Sequence[ProviderSpec]] = None,
+                 base_fields: Optional[Sequence[str]] = None,
+                 columns: Optional[Dict[str, Extractor]] = None):
+        # Columns shown for every node, before the provider columns
+        self.base_fields = list(DEFAULT_FIELDS if base_fields is None else base_fields)
+        # Extractors for base fields beyond the built-in ones
+        self.columns = dict(columns or {})
+        # Providers registered as instances are checked first, in order
+        self.providers = []
+        # Cloud providers, built-in and plugins, are imported on the first
+        # node that matches them
+        self.specs = list(default_specs() if specs is None else specs)
+        self._loaded = {}
+        # The rules of all specs, compiled once; a lookup gives a spec's index
+        self.detection = DetectionTable([spec.rules for spec in self.specs])
+        self.generic = GenericProvider()
+        # Provider per (uid, resourceVersion); an unchanged node object is
+        # never re-detected, e.g. across watch refreshes
+        self._classified = {}
+        # Compiled extraction plans per header tuple
+        self._plans = {}
+    
+    def load_provider(self, spec: ProviderSpec) -> BaseProvider:
+        """Get the provider for a spec, importing it on first use."""
+        provider = self._loaded.get(spec.name)
+        if provider is None:
+            provider = self._loaded[spec.name] = spec.load()
+            if not provider.detection:
+                provider.detection = spec.rules
+        return provider
+    
+    def detect_provider(self, node: NodeRecord) -> BaseProvider:
+        """Detect the cloud provider for a given node.
+        
+        Registered provider instances are asked first; cloud providers are
+        then looked up in the compiled detection table, at the same cost
+        however many specs there are.
+        """
+        node = as_record(node)
         for provider in self.providers:
             if provider.detect(node):
                 return provider
         
-        # Should never reach here due to GenericProvider fallback
-        return GenericProvider()
+        index = self.detection.lookup(node)
+        if index is not None:
+            return self.load_provider(self.specs[index])
+        
+        return self.generic
     
-    def get_all_headers(self, nodes: List[Dict[str, Any]]) -> List[str]:
-        """Get all headers needed for the given set of nodes."""
-        # Base headers that are always shown
-        base_headers = [
-            "NAME",
-            "STATUS", 
-            "ROLES",
-            "AGE",
-            "VERSION",
-            "INTERNAL-IP",
-            "EXTERNAL-IP",
-            "OS-IMAGE",
-            "KERNEL-VERSION",
-            "CONTAINER-RUNTIME",
-            "INSTANCE-TYPE"
-        ]
+    def classify(self, node: NodeRecord, memo: Optional[Dict] = None) -> BaseProvider:
+        """Return the provider for a node, memoized by UID and resourceVersion."""
+        node = as_record(node)
+        uid = node.uid
+        if uid is None:
+            return self.detect_provider(node)
         
-        # Collect all provider-specific headers needed
-        provider_headers = set()
-        for node in nodes:
+        key = (uid, node.resource_version)
+        provider = self._classified.get(key)
+        if provider is None:
             provider = self.detect_provider(node)
+            self._classified[key] = provider
+        if memo is not None:
+            memo[key] = provider
+        return provider
+    
+    def headers_for(self, providers: Iterable[BaseProvider]) -> List[str]:
+        """Get the table headers for a set of detected providers."""
+        provider_headers = set()
+        for provider in providers:
             provider_headers.update(provider.get_additional_headers())
+        return self.base_fields + sorted(provider_headers)
+    
+    def get_all_headers(self, nodes: List[NodeRecord]) -> List[str]:
+        """Get all headers needed for the given set of nodes."""
+        # Collect all provider-specific headers needed
+        return self.headers_for({self.classify(node) for node in nodes})
+    
+    def compile_plan(self, headers: List[str]) -> ExtractionPlan:
+        """Get the compiled extraction plan for a header list."""
+        key = tuple(headers)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = ExtractionPlan(key, self.columns)
+        return plan
+    
+    def projection(self) -> Optional[Projection]:
+        """Get the node fields any provider's columns or detection read.
+        
+        Providers that are not imported yet contribute the fields their
+        spec declares. Returns None if some column does not declare the
+        fields it reads, in which case whole node objects must be fetched.
+        """
+        providers = self.providers + list(self._loaded.values()) + [self.generic]
+        plan = self.compile_plan(self.headers_for(providers))
+        paths = set()
+        for provider in providers:
+            fields = plan.fields(provider)
+            if fields is None:
+                return None
+            paths.update(fields)
+            paths.update(provider.detect_fields)
+        for spec in self.specs:
+            if spec.name not in self._loaded:
+                paths.update(spec.fields)
+        paths.update(self.detection.fields)
+        return Projection(paths)
+    
+    def node_records(self, pages: Iterable[List[Dict[str, Any]]],
+                     release: bool = False) -> Iterator[List[NodeRecord]]:
+        """Turn the nodes of each page into records as the page arrives.
         
-        return base_headers + sorted(list(provider_headers))
+        Records only carry the fields columns declare they read; if some
+        column does not declare them, each record keeps its node object.
+        With ``release`` the nodes are replaced in the page lists, freeing
+        their objects (see ``record.records``).
+        """
+        return records(pages, keep_source=self.projection() is None, release=release)
+    
+    def get_node_fields(self, node: NodeRecord,
+                        provider: Optional[BaseProvider] = None) -> Dict[str, str]:
+        """Extract all base and provider-specific fields for a node."""
+        node = as_record(node)
+        provider = provider or self.classify(node)
+        plan = self.compile_plan(self.headers_for([provider]))
+        return dict(zip(plan.headers, plan.extract(node, provider)))
     
-    def get_node_info(self, node: Dict[str, Any], headers: List[str]) -> List[str]:
+    def get_node_info(self, node: NodeRecord, headers: List[str]) -> List[str]:
         """Extract all information for a node based on required headers."""
-        from ..utils import (
-            calculate_node_age, 
-            get_node_status, 
-            get_node_roles, 
-            get_node_addresses
-        )
-        
-        metadata = node["metadata"]
-        status = node["status"]
-        labels = metadata.get("labels", {})
-        
-        # Base node information
-        base_info = {
-            "NAME": metadata["name"],
-            "STATUS": get_node_status(node),
-            "ROLES": get_node_roles(node),
-            "AGE": calculate_node_age(metadata["creationTimestamp"]),
-            "VERSION": status.get("nodeInfo", {}).get("kubeletVersion", "N/A"),
-            "OS-IMAGE": status.get("nodeInfo", {}).get("osImage", "N/A"),
-            "KERNEL-VERSION": status.get("nodeInfo", {}).get("kernelVersion", "N/A"),
-            "CONTAINER-RUNTIME": status.get("nodeInfo", {}).get("containerRuntimeVersion", "N/A"),
-            "INSTANCE-TYPE": labels.get("node.kubernetes.io/instance-type", "N/A"),
-            **get_node_addresses(node)
-        }
-        
-        # Get provider-specific information
-        provider = self.detect_provider(node)
-        provider_info = provider.get_provider_fields(node)
-        
-        # Combine all information
-        all_info = {**base_info, **provider_info}
-        
-        # Return values in the order of headers
-        return [all_info.get(header, "N/A") for header in headers]
+        node = as_record(node)
+        return self.compile_plan(headers).extract(node, self.classify(node))
+    
+    def collect_rows(self, pages: Iterable[List[Dict[str, Any]]], order=None,
+                     keys: Optional[List] = None) -> Tuple[List[str], List[List[str]]]:
+        """Extract table headers and rows from nodes arriving in pages.
+        
+        Each node is turned into a record, classified once and reduced to
+        a row as soon as its page arrives, so raw node objects only need to
+        live for one page at a time. Rows are extracted with the plan for their provider's
+        columns, which are all part of the final headers, and are only
+        re-ordered into the final column layout when providers are mixed.
+        Classifications of nodes that are no longer listed are dropped.
+        
+        With a ``sorting.RowOrder`` each row's sort key is computed from
+        its node during extraction and the rows are ordered, and limited,
+        as they arrive; ``keys``, if given, receives the key of every row
+        returned. The headers then only cover the providers of those rows.
+        """
+        memo = {}
+        plans = {}
+        
+        def extract():
+            for page in self.node_records(pages):
+                with phase("detect", nodes=len(page)):
+                    providers = [self.classify(node, memo) for node in page]
+                with phase("get_node_info", nodes=len(page)):
+                    for node, provider in zip(page, providers):
+                        plan = plans.get(provider)
+                        if plan is None:
+                            plan = plans[provider] = self.compile_plan(self.headers_for([provider]))
+                        row = plan.extract(node, provider)
+                        if order is None:
+                            yield provider, row
+                        else:
+                            yield order.key(node, plan.headers, row), (provider, row)
+        
+        if order is None:
+            extracted = list(extract())
+        else:
+            selected = order.select(extract())
+            if keys is not None:
+                keys.extend(key for key, item in selected)
+            extracted = [item for key, item in selected]
+            plans = {provider: plans[provider] for provider, row in extracted}
+        self._classified = memo
+        
+        headers = self.headers_for(plans)
+        if len(plans) <= 1:
+            return headers, [row for provider, row in extracted]
+        
+        layouts = {}
+        for provider, plan in plans.items():
+            position = {header: index for index, header in enumerate(plan.headers)}
+            layouts[provider] = [position.get(header) for header in headers]
+        rows = []
+        for provider, row in extracted:
+            rows.append([row[index] if index is not None else "N/A" for index in layouts[provider]])
+        return headers, rows
+    
+    def stream_rows(self, pages: Iterable[List[Dict[str, Any]]]) -> Tuple[List[str], Iterator[List[str]]]:
+        """Extract headers up front, then rows one node at a time.
+        
+        The headers are those the first page needs; every node is then
+        reduced to a row only when the returned iterator reaches it, so
+        rows can be written out as they are extracted instead of being
+        collected into a table first. Columns of providers that only show
+        up in later pages are not included; see ``stream_records``.
+        """
+        pages = self.node_records(pages)
+        first = next(pages, [])
+        memo = {}
+        with phase("detect", nodes=len(first)):
+            headers = self.headers_for({self.classify(node, memo) for node in first})
+        plan = self.compile_plan(headers)
+        
+        def rows():
+            for page in itertools.chain([first], pages):
+                for node in page:
+                    yield plan.extract(node, self.classify(node, memo))
+            self._classified = memo
+        
+        return headers, rows()
+    
+    def stream_records(self, pages: Iterable[List[Dict[str, Any]]]) -> Iterator[Dict[str, str]]:
+        """Extract one record per node, keyed by its own provider's headers.
+        
+        Like ``stream_rows`` each node is extracted only when the iterator
+        reaches it, but no headers are fixed up front, so provider columns
+        are kept whichever page their nodes arrive in.
+        """
+        memo = {}
+        plans = {}
+        for page in self.node_records(pages):
+            for node in page:
+                provider = self.classify(node, memo)
+                plan = plans.get(provider)
+                if plan is None:
+                    plan = plans[provider] = self.compile_plan(self.headers_for([provider]))
+                yield dict(zip(plan.headers, plan.extract(node, provider)))
+        self._classified = memo
@@ -0,0 +1,28 @@
+"""OpenStack provider implementation."""
+
+from typing import Callable, Dict, List
+from ..record import NodeRecord
+from .base import BaseProvider
+
+
+class OpenStackProvider(BaseProvider):
+    """OpenStack cloud provider implementation."""
+    
+    # Magnum node groups
+    nodepool_label = "magnum.openstack.org/nodegroup"
+    
+    def __init__(self):
+        super().__init__("openstack")
+    
+    def get_field_extractors(self) -> Dict[str, Callable[[NodeRecord], str]]:
+        """Get one extractor per OpenStack-specific header."""
+        return {
+            # Nova server UUID from provider ID
+            "OPENSTACK-INSTANCE-ID": self.get_provider_id,
+            "OPENSTACK-REGION": self.get_region,
+            "OPENSTACK-ZONE": self.get_zone
+        }
+    
+    def get_additional_headers(self) -> List[str]:
+        """Get OpenStack-specific headers."""
+        return ["OPENSTACK-INSTANCE-ID", "OPENSTACK-REGION", "OPENSTACK-ZONE"]
@@ -0,0 +1,134 @@
+"""Parsing of ``spec.providerID`` into structured fields.
+
+The cloud controller of each platform writes a providerID naming the
+machine behind a node, in a scheme of its own:
+
+- ``aws:///us-east-1a/i-0abc``
+- ``azure:///subscriptions/<id>/resourceGroups/<group>/providers/
+  Microsoft.Compute/virtualMachineScaleSets/<set>/virtualMachines/<index>``
+- ``gce://<project>/<zone>/<instance>``
+- ``openstack:///<uuid>`` or ``openstack://<region>/<uuid>``
+- ``hcloud://<server id>``
+- ``k3s://<node name>``
+
+Detection dispatches on the scheme and provider columns read the parsed
+fields; a providerID is parsed once, however many of them ask.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from ..columns import Extractor, reads
+from ..record import NodeRecord
+
+# A region name at the start of an AWS zone name: us-east-1 in us-east-1a,
+# us-west-2 in the local zone us-west-2-lax-1a
+_AWS_REGION = re.compile(r"[a-z]{2}(?:-[a-z]+)+-\d+")
+
+# Topology labels, deprecated beta label first as the providers always read them
+ZONE_LABELS = ("failure-domain.beta.kubernetes.io/zone", "topology.kubernetes.io/zone")
+REGION_LABELS = ("failure-domain.beta.kubernetes.io/region", "topology.kubernetes.io/region")
+
+
+class ProviderID(NamedTuple):
+    """The fields of a providerID; those a scheme does not carry are None.
+
+    ``project`` is the GCP project, or the Azure resource group.
+    """
+    scheme: str
+    instance_id: Optional[str] = None
+    region: Optional[str] = None
+    zone: Optional[str] = None
+    project: Optional[str] = None
+
+
+def _segments(path: str) -> List[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def _parse_aws(path: str) -> ProviderID:
+    segments = _segments(path)
+    zone = segments[-2] if len(segments) > 1 else None
+    region = _AWS_REGION.match(zone) if zone else None
+    return ProviderID("aws", segments[-1] if segments else None,
+                      region.group() if region else None, zone)
+
+
+def _parse_azure(path: str) -> ProviderID:
+    segments = _segments(path)
+    # Resource IDs are /key/value pairs, with case-insensitive keys
+    pairs = {key.lower(): value for key, value in zip(segments[::2], segments[1::2])}
+    instance = pairs.get("virtualmachines")
+    scale_set = pairs.get("virtualmachinescalesets")
+    if scale_set and instance is not None:
+        # Scale set instances are named <set>_<index>
+        instance = f"{scale_set}_{instance}"
+    return ProviderID("azure", instance, project=pairs.get("resourcegroups"))
+
+
+def _parse_gce(path: str) -> ProviderID:
+    segments = _segments(path)
+    if len(segments) != 3:
+        return ProviderID("gce", segments[-1] if segments else None)
+    project, zone, instance = segments
+    return ProviderID("gce", instance, zone.rpartition("-")[0] or None, zone, project)
+
+
+def _parse_openstack(path: str) -> ProviderID:
+    region, _, rest = path.partition("/")
+    segments = _segments(rest)
+    return ProviderID("openstack", segments[-1] if segments else None, region or None)
+
+
+def _parse_instance(scheme: str) -> Callable[[str], ProviderID]:
+    def parse(path: str) -> ProviderID:
+        segments = _segments(path)
+        return ProviderID(scheme, segments[-1] if segments else None)
+    return parse
+
+
+# Parsers by scheme, handed what follows "<scheme>://"
+PARSERS: Dict[str, Callable[[str], ProviderID]] = {
+    "aws": _parse_aws,
+    "azure": _parse_azure,
+    "gce": _parse_gce,
+    "openstack": _parse_openstack,
+    "hcloud": _parse_instance("hcloud"),
+    "k3s": _parse_instance("k3s"),
+}
+
+
+# Sized for the largest clusters, so a refresh finds every node's parse
+@lru_cache(maxsize=65536)
+def parse_provider_id(provider_id: Optional[str]) -> ProviderID:
+    """Parse a providerID, cached per string.
+
+    Unknown schemes keep the last path segment as the instance ID, as does
+    a providerID without a scheme.
+    """
+    if not provider_id:
+        return ProviderID("")
+    scheme, separator, path = provider_id.partition("://")
+    if not separator:
+        return ProviderID("", provider_id.rpartition("/")[2] or None)
+    parse = PARSERS.get(scheme)
+    if parse is None:
+        return _parse_instance(scheme)(path)
+    return parse(path)
+
+
+def provider_id_extractor(field: str, *labels: str) -> Extractor:
+    """Build an extractor for a parsed providerID field.
+
+    The first of ``labels`` a node carries takes precedence; the parsed
+    field is the fallback for nodes without them.
+    """
+    @reads(*(("metadata.labels",) if labels else ()), "spec.providerID")
+    def extract(node: NodeRecord) -> str:
+        for label in labels:
+            value = node.labels.get(label)
+            if value is not None:
+                return value
+        return getattr(parse_provider_id(node.provider_id), field) or "N/A"
+    return extract
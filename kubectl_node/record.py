@@ -0,0 +1,171 @@
+"""Compact per-node records built once from node objects.
+
+A decoded node is a tree of dicts and lists, most of it (``status.images``,
+``managedFields``, condition messages and heartbeats) never read by any
+column. ``NodeRecord`` keeps only the fields the columns, detection and
+sorting read, in slots instead of nested dicts, with lists turned into
+tuples. Values that repeat across a fleet (OS image, kernel and kubelet
+versions, runtime, label values such as instance type and zone) are
+interned, so every node shares one string for each of them.
+
+Listed nodes are replaced by their records as their page is processed,
+which releases the raw objects right away. Records still answer ``node["status"]``
+style lookups, for providers written against node objects.
+"""
+
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .timings import phase
+
+_intern = sys.intern
+
+# nodeInfo fields that are unique per node and not worth interning
+_UNIQUE_NODE_INFO = frozenset(["machineID", "systemUUID", "bootID"])
+
+# Element keys kept for the list fields, in tuple order
+CONDITION_KEYS = ("type", "status", "reason")
+ADDRESS_KEYS = ("type", "address")
+TAINT_KEYS = ("key", "value", "effect")
+
+
+def _interned(mapping: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Keys too: one decoded list shares them, but every watch event is
+    # decoded on its own
+    return {_intern(key): _intern(value) if type(value) is str else value
+            for key, value in (mapping or {}).items()}
+
+
+def _shared(value: Optional[str]) -> Optional[str]:
+    return _intern(value) if type(value) is str else value
+
+
+def _dicts(rows: Tuple[Tuple[Optional[str], ...], ...],
+           keys: Tuple[str, ...]) -> List[Dict[str, str]]:
+    return [{key: value for key, value in zip(keys, row) if value is not None} for row in rows]
+
+
+class NodeRecord:
+    """The fields of one node that the tool reads.
+
+    ``conditions``, ``addresses`` and ``taints`` are tuples of tuples in
+    the order of ``CONDITION_KEYS``, ``ADDRESS_KEYS`` and ``TAINT_KEYS``.
+    ``source`` is the original node object, kept only when some column
+    reads fields a record does not carry.
+    """
+
+    __slots__ = ("name", "uid", "resource_version", "created", "labels", "annotations",
+                 "provider_id", "pod_cidr", "unschedulable", "taints", "conditions",
+                 "addresses", "capacity", "allocatable", "node_info", "source")
+
+    @classmethod
+    def from_node(cls, node: Dict[str, Any], keep_source: bool = False) -> "NodeRecord":
+        """Build a record from a (possibly pruned) node object."""
+        metadata = node.get("metadata") or {}
+        spec = node.get("spec") or {}
+        status = node.get("status") or {}
+        record = cls.__new__(cls)
+        record.name = metadata.get("name")
+        record.uid = metadata.get("uid")
+        record.resource_version = metadata.get("resourceVersion")
+        record.created = metadata.get("creationTimestamp")
+        record.labels = _interned(metadata.get("labels"))
+        record.annotations = metadata.get("annotations") or {}
+        record.provider_id = spec.get("providerID")
+        record.pod_cidr = spec.get("podCIDR")
+        record.unschedulable = bool(spec.get("unschedulable", False))
+        record.taints = tuple(
+            (_shared(taint.get("key")), _shared(taint.get("value")), _shared(taint.get("effect")))
+            for taint in spec.get("taints") or ()
+        )
+        record.conditions = tuple(
+            (_shared(condition.get("type")), _shared(condition.get("status")),
+             _shared(condition.get("reason")))
+            for condition in status.get("conditions") or ()
+        )
+        record.addresses = tuple((_shared(address.get("type")), address.get("address"))
+                                 for address in status.get("addresses") or ())
+        record.capacity = _interned(status.get("capacity"))
+        record.allocatable = _interned(status.get("allocatable"))
+        record.node_info = {
+            key: value if key in _UNIQUE_NODE_INFO or type(value) is not str else _intern(value)
+            for key, value in (status.get("nodeInfo") or {}).items()
+        }
+        record.source = node if keep_source else None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a node object holding only its fields."""
+        if self.source is not None:
+            return self.source
+        metadata = {"name": self.name, "uid": self.uid, "resourceVersion": self.resource_version,
+                    "creationTimestamp": self.created}
+        metadata = {key: value for key, value in metadata.items() if value is not None}
+        if self.labels:
+            metadata["labels"] = self.labels
+        if self.annotations:
+            metadata["annotations"] = self.annotations
+        spec = {}
+        if self.provider_id is not None:
+            spec["providerID"] = self.provider_id
+        if self.pod_cidr is not None:
+            spec["podCIDR"] = self.pod_cidr
+        if self.unschedulable:
+            spec["unschedulable"] = True
+        if self.taints:
+            spec["taints"] = _dicts(self.taints, TAINT_KEYS)
+        status = {}
+        if self.conditions:
+            status["conditions"] = _dicts(self.conditions, CONDITION_KEYS)
+        if self.addresses:
+            status["addresses"] = _dicts(self.addresses, ADDRESS_KEYS)
+        if self.capacity:
+            status["capacity"] = self.capacity
+        if self.allocatable:
+            status["allocatable"] = self.allocatable
+        if self.node_info:
+            status["nodeInfo"] = self.node_info
+        return {"metadata": metadata, "spec": spec, "status": status}
+
+    def __getitem__(self, key: str) -> Any:
+        return self.to_dict()[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.to_dict()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.to_dict().get(key, default)
+
+    def __repr__(self) -> str:
+        return f"NodeRecord({self.name!r})"
+
+
+def as_record(node) -> NodeRecord:
+    """Return a node as a record, keeping the object it was built from.
+
+    For callers handed node objects directly; nodes the tool lists are
+    turned into records by ``records`` instead.
+    """
+    if isinstance(node, NodeRecord):
+        return node
+    return NodeRecord.from_node(node, keep_source=True)
+
+
+def records(pages: Iterable[List[Any]], keep_source: bool = False,
+            release: bool = False) -> Iterator[List[NodeRecord]]:
+    """Turn the nodes of each page into records as the page arrives.
+
+    With ``release`` every node is replaced by its record in the page list
+    itself, so its object is freed right away unless something else still
+    holds it; only the caller that fetched the pages should ask for that.
+    """
+    for page in pages:
+        with phase("records", nodes=len(page)):
+            if release:
+                for index, node in enumerate(page):
+                    if not isinstance(node, NodeRecord):
+                        page[index] = NodeRecord.from_node(node, keep_source)
+            else:
+                page = [node if isinstance(node, NodeRecord)
+                        else NodeRecord.from_node(node, keep_source) for node in page]
+        yield page
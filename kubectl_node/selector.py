@@ -0,0 +1,109 @@
+"""Server-side node selection: label and field selectors, and node pools.
+
+Selectors are sent with every node list and watch (``labelSelector`` and
+``fieldSelector`` natively, ``-l``/``--field-selector`` to kubectl), so the
+API server filters the nodes and only the selected ones are transferred,
+decoded and rendered.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional
+
+from .exceptions import SelectorError
+from .utils import api_get
+
+# A label value: empty, or alphanumerics with -_. inside, at most 63 long
+LABEL_VALUE = re.compile(r"^(([A-Za-z0-9][-A-Za-z0-9_.]{0,61})?[A-Za-z0-9])?$")
+
+
+def join_selectors(*selectors: Optional[str]) -> Optional[str]:
+    """AND selectors together; None if none is given."""
+    parts = [selector for selector in selectors if selector]
+    return ",".join(parts) or None
+
+
+class NodeSelector:
+    """The label and field selectors every node list and watch is sent with.
+
+    ``nodepool`` names a node pool without saying which label marks it, as
+    that depends on the cloud provider; ``resolve`` turns it into a label
+    selector for one context.
+    """
+
+    def __init__(self, labels: Optional[str] = None, fields: Optional[str] = None,
+                 nodepool: Optional[str] = None):
+        self.labels = labels or None
+        self.fields = fields or None
+        self.nodepool = nodepool or None
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.labels or self.fields or self.nodepool)
+
+    def params(self) -> Dict[str, str]:
+        """Return the list and watch query parameters."""
+        params = {}
+        if self.labels:
+            params["labelSelector"] = self.labels
+        if self.fields:
+            params["fieldSelector"] = self.fields
+        return params
+
+    def kubectl_args(self) -> List[str]:
+        """Return the ``kubectl get nodes`` arguments."""
+        args = []
+        if self.labels:
+            args.extend(["-l", self.labels])
+        if self.fields:
+            args.extend(["--field-selector", self.fields])
+        return args
+
+    def describe(self) -> str:
+        """Describe the selection for status lines and cache keys."""
+        parts = [part for part in (self.labels, self.fields) if part]
+        if self.nodepool:
+            parts.append(f"nodepool={self.nodepool}")
+        return ";".join(parts)
+
+    def resolve(self, context: Optional[str] = None, transport: str = "kubectl",
+                timeout: Optional[float] = None) -> "NodeSelector":
+        """Map ``nodepool`` to the provider's node pool label in a context.
+
+        One node is listed (``limit=1``) to detect the cloud provider, whose
+        ``nodepool_label`` is then ANDed to the label selector. The result
+        is kept per context, so watch ticks do not probe again.
+        """
+        if not self.nodepool:
+            return self
+        with self._lock:
+            resolved = self._resolved.get(context)
+        if resolved is not None:
+            return resolved
+
+        label = nodepool_label(context, transport, timeout)
+        resolved = NodeSelector(join_selectors(self.labels, f"{label}={self.nodepool}"),
+                                self.fields)
+        with self._lock:
+            self._resolved[context] = resolved
+        return resolved
+
+
+def nodepool_label(context: Optional[str] = None, transport: str = "kubectl",
+                   timeout: Optional[float] = None) -> str:
+    """Return the label marking node pools in a context, from one probed node."""
+    from .providers import ProviderManager
+
+    probe = api_get("/api/v1/nodes", {"limit": 1}, context=context, transport=transport,
+                    timeout=timeout)
+    items = probe.get("items") or []
+    if not items:
+        raise SelectorError("Cannot map --nodepool to a label: the cluster has no nodes")
+    provider = ProviderManager().detect_provider(items[0])
+    if not provider.nodepool_label:
+        raise SelectorError(
+            f"Cannot map --nodepool to a label on {provider.name} nodes; "
+            f"select the pool with -l LABEL=VALUE instead"
+        )
+    return provider.nodepool_label
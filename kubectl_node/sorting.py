@@ -0,0 +1,172 @@
+"""Row ordering and top-N selection for --sort-by and --limit.
+
+Columns are rendered as strings, which do not sort the way they read:
+"10d" is not older than "9d", "v1.9.0" is not newer than "v1.28.0", and
+"10.0.0.10" does not come after "10.0.0.9". Each column therefore gets a
+key of the right type, computed once per node while its row is extracted.
+With a limit the rows go through a bounded heap, so only N rows are kept
+and ordered however many nodes are listed.
+"""
+
+import heapq
+import ipaddress
+import itertools
+import re
+from operator import itemgetter
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from .exceptions import SortError
+from .record import NodeRecord, as_record
+from .utils import parse_quantity, parse_timestamp
+
+# Sorts after every real value, in either direction
+MISSING = (1,)
+
+_VERSION = re.compile(r"v?(\d+)\.(\d+)(?:\.(\d+))?(.*)")
+_DIGITS = re.compile(r"(\d+)")
+
+
+def age_key(node: NodeRecord, value: str):
+    """Order by creation time, youngest first like an ascending AGE."""
+    created = parse_timestamp(as_record(node).created)
+    if created is None:
+        return MISSING
+    return (0, -created)
+
+
+def version_key(node: NodeRecord, value: str):
+    """Order ``v1.28.3-eks-1`` style versions by their numeric parts.
+
+    A pre-release or build suffix sorts after the bare release, then by its
+    own natural order (``+k3s1`` before ``+k3s2``).
+    """
+    match = _VERSION.match(value)
+    if match is None:
+        return MISSING
+    major, minor, patch, suffix = match.groups()
+    return (0, int(major), int(minor), int(patch or 0), _natural(suffix))
+
+
+def ip_key(node: NodeRecord, value: str):
+    """Order addresses numerically, IPv4 before IPv6."""
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return MISSING
+    return (0, address.version, int(address))
+
+
+def quantity_key(node: NodeRecord, value: str):
+    """Order ``1250m (31%)`` style request cells by the quantity."""
+    try:
+        return (0, parse_quantity(value.split(" ", 1)[0]))
+    except ValueError:
+        return MISSING
+
+
+def natural_key(node: NodeRecord, value: str):
+    """Order text with embedded numbers numerically (``node-2`` before ``node-10``)."""
+    if value in ("", "N/A", "<none>"):
+        return MISSING
+    return (0, _natural(value))
+
+
+def _natural(text: str) -> Tuple:
+    # Alternating text and numbers, always starting with text, so any two
+    # keys compare position by position
+    parts = _DIGITS.split(text)
+    return tuple(int(part) if index % 2 else part for index, part in enumerate(parts))
+
+
+def column_key(header: str) -> Callable[[NodeRecord, str], Tuple]:
+    """Return the key for a column, given the node and its cell."""
+    if header == "AGE":
+        return age_key
+    if header.endswith("VERSION"):
+        return version_key
+    if header.endswith("-IP"):
+        return ip_key
+    if header.endswith("-REQ"):
+        return quantity_key
+    return natural_key
+
+
+class _Descending:
+    """Inverts the order of a key."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Tuple):
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other) -> bool:
+        return self.key == other.key
+
+
+class RowOrder:
+    """Order rows by one column, and/or keep only the first ``limit`` of them.
+
+    Without a ``header`` rows keep the order the API server listed them in
+    and ``limit`` simply stops extraction after that many.
+    """
+
+    def __init__(self, header: Optional[str] = None, reverse: bool = False,
+                 limit: Optional[int] = None):
+        self.header = header
+        self.reverse = reverse
+        self.limit = limit
+        self.key_for = column_key(header) if header else None
+        # Position of the column per plan header tuple
+        self._positions = {}
+
+    def check(self, headers: Sequence[str]):
+        """Raise SortError if the rows do not have the sort column."""
+        if self.header is not None and self.header not in headers:
+            raise SortError(f"Cannot sort by '{self.header}': no such column "
+                            f"(columns: {', '.join(headers)})")
+
+    def key(self, node: NodeRecord, headers: Tuple[str, ...], row: List[str]) -> Tuple:
+        """Return the sort key of a row extracted with ``headers``."""
+        position = self._positions.get(headers, -1)
+        if position == -1:
+            position = self._positions[headers] = (
+                headers.index(self.header) if self.header in headers else None
+            )
+        if position is None:
+            return MISSING
+        key = self.key_for(node, row[position])
+        if self.reverse and key is not MISSING:
+            # Real values descending, missing ones still last
+            return (0, _Descending(key))
+        return key
+
+    def select(self, keyed: Iterable[Tuple[Tuple, Any]]) -> List[Tuple[Tuple, Any]]:
+        """Order ``(key, item)`` pairs, keeping at most ``limit`` of them.
+
+        With a limit only that many pairs are ever held, in a heap; the
+        rest are dropped as they arrive.
+        """
+        if self.header is None:
+            return list(itertools.islice(keyed, self.limit))
+        # The counter keeps the order of equal keys and never compares items
+        counter = itertools.count()
+        entries = ((key, next(counter), item) for key, item in keyed)
+        if self.limit is not None:
+            selected = heapq.nsmallest(self.limit, entries, key=_ENTRY_KEY)
+        else:
+            selected = sorted(entries, key=_ENTRY_KEY)
+        return [(key, item) for key, index, item in selected]
+
+    def merge(self, sequences: Sequence[Iterable[Tuple[Tuple, Any]]]) -> List[Tuple[Tuple, Any]]:
+        """Merge already ordered ``(key, item)`` sequences, e.g. one per context."""
+        if self.header is None:
+            merged = itertools.chain.from_iterable(sequences)
+        else:
+            merged = heapq.merge(*sequences, key=itemgetter(0))
+        return list(itertools.islice(merged, self.limit))
+
+
+_ENTRY_KEY = itemgetter(0, 1)
@@ -0,0 +1,147 @@
+"""Column sources: per-node data fetched alongside the node list.
+
+Columns such as pod requests or live metrics need a second API call. A
+source runs that call on a background thread while the nodes are being
+fetched, keeps the result keyed by node name, and provides extractors that
+look nodes up in it, so the extra columns cost no more wall-clock time than
+the slower of the two calls. A source with a ``deadline`` gives up waiting
+once it has passed and its columns extract as "N/A".
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+from .columns import Extractor
+from .exceptions import KubectlNodeError, KubectlTimeoutError
+from .record import NodeRecord
+
+
+class ColumnSource(ABC):
+    """Per-node data joined into rows by node name.
+
+    Subclasses implement ``fetch``, returning a dict keyed by node name,
+    and ``columns``. ``usage`` only ever holds the result of one complete
+    fetch; until a fetch succeeds ``loaded`` is False and the columns
+    extract as "N/A".
+    """
+
+    # Named in warnings, e.g. "Node metrics unavailable: ..."
+    title = "Column data"
+    # Seconds to wait for a fetch before giving up on it, or None to wait
+    deadline = None
+
+    def __init__(self):
+        self.usage = {}
+        self.loaded = False
+        self.error = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._done = None
+        self._started = None
+
+    @abstractmethod
+    def fetch(self, context: Optional[str], transport: str,
+              timeout: Optional[float]) -> Dict[str, Any]:
+        """Fetch the per-node data, keyed by node name."""
+        pass
+
+    @abstractmethod
+    def columns(self) -> Dict[str, Extractor]:
+        """Get the extractors of the source's columns."""
+        pass
+
+    def _begin(self) -> int:
+        with self._lock:
+            self._generation += 1
+            self.usage = {}
+            self.loaded = False
+            self.error = None
+            return self._generation
+
+    def _run(self, generation: int, context: Optional[str], transport: str):
+        try:
+            usage, error = self.fetch(context, transport, self.deadline), None
+        except KubectlNodeError as e:
+            usage, error = {}, e
+        except Exception as e:
+            # E.g. a malformed response; a background fetch must not die
+            # silently and leave the columns waiting on nothing
+            usage, error = {}, KubectlNodeError(f"Unexpected error: {e}")
+        with self._lock:
+            # A fetch that was given up on must not change the rows of a
+            # table that is already being extracted
+            if generation == self._generation:
+                self.usage = usage
+                self.loaded = error is None
+                self.error = error
+
+    def refresh(self, context: Optional[str] = None, transport: str = "kubectl"):
+        """Fetch in the calling thread; failures are kept in ``error``."""
+        self._run(self._begin(), context, transport)
+        return self
+
+    def start(self, context: Optional[str] = None, transport: str = "kubectl"):
+        """Start fetching on a background thread; ``wait`` collects the result."""
+        generation = self._begin()
+        done = self._done = threading.Event()
+        self._started = time.monotonic()
+
+        def run():
+            try:
+                self._run(generation, context, transport)
+            finally:
+                done.set()
+
+        # A daemon thread, so a fetch that is given up on never delays exit
+        threading.Thread(target=run, name=f"{type(self).__name__}-fetch", daemon=True).start()
+        return self
+
+    def wait(self) -> bool:
+        """Wait for the started fetch until the deadline; False if it missed it."""
+        if self._done is None:
+            return self.loaded
+        remaining = None
+        if self.deadline is not None:
+            remaining = max(0.0, self._started + self.deadline - time.monotonic())
+        if self._done.wait(remaining):
+            return self.loaded
+        with self._lock:
+            self._generation += 1
+            self.error = KubectlTimeoutError(f"no response within {self.deadline:g} seconds")
+        return False
+
+
+def start_sources(sources: Sequence[ColumnSource], context: Optional[str] = None,
+                  transport: str = "kubectl"):
+    """Start every source fetching in the background."""
+    for source in sources:
+        source.start(context=context, transport=transport)
+
+
+def wait_for_sources(sources: Sequence[ColumnSource]) -> List[str]:
+    """Wait for started sources; return a line describing each failed one."""
+    lines = []
+    for source in sources:
+        source.wait()
+        if source.error is not None:
+            lines.append(f"{source.title} unavailable: {source.error}")
+    return lines
+
+
+def source_columns(sources: Sequence[ColumnSource]) -> Dict[str, Extractor]:
+    """Merge the extractors of several sources."""
+    columns = {}
+    for source in sources:
+        columns.update(source.columns())
+    return columns
+
+
+def allocatable(node: NodeRecord, resource: str, parse) -> Optional[int]:
+    """Parse a node's allocatable amount of a resource, or None if unknown."""
+    value = node.allocatable.get(resource)
+    try:
+        return parse(value) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,184 @@
+"""Fleet summary (--summary): node counts per group, built in one pass.
+
+Group values are the table's own cells (PROVIDER, ZONE, INSTANCE-TYPE, ...),
+extracted through the same compiled plans but restricted to the grouped
+columns, so nothing else is computed for a node and no row is kept: each
+node only bumps a few counters before the next one is read.
+"""
+
+import bisect
+import json
+import sys
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .columns import BASE_COLUMNS
+from .config import DEFAULT_SUMMARY_GROUPS, DEFAULT_TABLE_FORMAT
+from .exceptions import NodeInfoError
+from .providers import ProviderManager
+from .sorting import natural_key
+from .timings import phase
+from .utils import format_timedelta, parse_timestamp
+
+# Age buckets: label and exclusive upper bound in seconds
+AGE_BUCKETS = [
+    ("<1h", 3600),
+    ("<1d", 86400),
+    ("<7d", 7 * 86400),
+    ("<30d", 30 * 86400),
+    ("<90d", 90 * 86400),
+    ("<1y", 365 * 86400),
+    (">=1y", None),
+]
+
+
+def parse_groups(spec: Optional[str]) -> List[Tuple[str, ...]]:
+    """Parse ``zone,instance-type+version`` into column tuples.
+
+    Commas separate groupings; ``+`` combines columns into one grouping.
+    """
+    if not spec:
+        return [(header,) for header in DEFAULT_SUMMARY_GROUPS]
+    groups = []
+    for group in spec.split(","):
+        headers = tuple(header.strip().upper() for header in group.split("+") if header.strip())
+        if headers:
+            groups.append(headers)
+    return groups
+
+
+class FleetSummary:
+    """Node counts per group value and an age histogram.
+
+    ``groups`` are tuples of column headers; each is counted on its own,
+    a tuple of several columns by their combined values.
+    """
+
+    def __init__(self, groups: Sequence[Tuple[str, ...]], manager: Optional[ProviderManager] = None,
+                 now: Optional[float] = None):
+        self.groups = [tuple(group) for group in groups]
+        self.headers = list(dict.fromkeys(header for group in self.groups for header in group))
+        # AGE is not counted as a cell, but its field must be fetched
+        self.manager = manager or ProviderManager(base_fields=self.headers + ["AGE"])
+        self.now = time.time() if now is None else now
+        # Timestamps compare as strings, so a node's age bucket is found by
+        # bisecting the buckets' cutoff times without parsing its timestamp
+        self._cutoffs = [time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.now - bound))
+                         for label, bound in reversed(AGE_BUCKETS) if bound is not None]
+        self.nodes = 0
+        self.counts = [Counter() for _ in self.groups]
+        self.ages = [0] * len(AGE_BUCKETS)
+        self.oldest = None
+        self.newest = None
+        self.providers = set()
+        self._positions = [tuple(self.headers.index(header) for header in group)
+                           for group in self.groups]
+
+    def add(self, pages: Iterable[List[Dict[str, Any]]]) -> "FleetSummary":
+        """Count the nodes of every page."""
+        manager = self.manager
+        plan = manager.compile_plan(self.headers)
+        groups = list(zip(self._positions, self.counts))
+        ages = self.ages
+        cutoffs = self._cutoffs
+        oldest = len(AGE_BUCKETS) - 1
+        for page in manager.node_records(pages):
+            with phase("summarize", nodes=len(page)):
+                for node in page:
+                    provider = manager.classify(node)
+                    self.providers.add(provider)
+                    cells = plan.extract(node, provider)
+                    for positions, counter in groups:
+                        if len(positions) == 1:
+                            counter[cells[positions[0]]] += 1
+                        else:
+                            counter[tuple(cells[position] for position in positions)] += 1
+                    created = node.created
+                    if created and len(created) == 20:
+                        # Younger than a bucket's bound: created after its cutoff
+                        ages[oldest - bisect.bisect_left(cutoffs, created)] += 1
+                        if self.oldest is None or created < self.oldest:
+                            self.oldest = created
+                        if self.newest is None or created > self.newest:
+                            self.newest = created
+                self.nodes += len(page)
+        return self
+
+    def check(self):
+        """Raise NodeInfoError for grouped columns no node has."""
+        known = set(BASE_COLUMNS) | set(self.manager.columns) | {"PROVIDER"}
+        for provider in self.providers:
+            known.update(provider.get_additional_headers())
+        for spec in self.manager.specs:
+            known.update(spec.headers)
+        unknown = [header for header in self.headers if header not in known]
+        if unknown and self.nodes:
+            raise NodeInfoError(f"Cannot group by {', '.join(unknown)}: no such column")
+
+    def group_rows(self, index: int) -> List[Tuple[str, int]]:
+        """Return one group's values and counts, largest first."""
+        rows = []
+        for value, count in self.counts[index].items():
+            label = "/".join(value) if isinstance(value, tuple) else value
+            rows.append((label, count))
+        rows.sort(key=lambda row: (-row[1], natural_key(None, row[0])))
+        return rows
+
+    def age_rows(self) -> List[Tuple[str, int]]:
+        """Return the age buckets and their counts."""
+        return [(label, count) for (label, bound), count in zip(AGE_BUCKETS, self.ages)]
+
+    def _age(self, timestamp: Optional[str]) -> Optional[str]:
+        created = parse_timestamp(timestamp) if timestamp else None
+        if created is None:
+            return None
+        return format_timedelta(timedelta(seconds=max(0, self.now - created)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the summary as one JSON-ready document."""
+        return {
+            "nodes": self.nodes,
+            "groups": {"+".join(group): dict(self.group_rows(index))
+                       for index, group in enumerate(self.groups)},
+            "age": dict(self.age_rows()),
+            "oldest": self._age(self.oldest),
+            "newest": self._age(self.newest),
+        }
+
+    def records(self) -> Iterable[List[str]]:
+        """Yield GROUP, VALUE, NODES records for the delimited outputs."""
+        for index, group in enumerate(self.groups):
+            for value, count in self.group_rows(index):
+                yield ["+".join(group), value, str(count)]
+        for label, count in self.age_rows():
+            yield ["AGE", label, str(count)]
+
+    def write(self, output: str = "table", table_format: str = DEFAULT_TABLE_FORMAT,
+              stream=None):
+        """Write the summary as tables, one JSON document, or records."""
+        from .output import write_records
+        from .table import write_table
+
+        stream = stream or sys.stdout
+        if output == "json":
+            stream.write(json.dumps(self.to_dict(), indent=2) + "\n")
+            return
+        if output in ("ndjson", "csv", "tsv"):
+            write_records(["GROUP", "VALUE", "NODES"], self.records(), output, stream)
+            return
+
+        stream.write(f"Nodes: {self.nodes}\n")
+        for index, group in enumerate(self.groups):
+            rows = [[value, count, self._percent(count)] for value, count in self.group_rows(index)]
+            stream.write("\n")
+            write_table(["+".join(group), "NODES", "%"], rows, table_format, stream)
+        stream.write("\n")
+        rows = [[label, count, self._percent(count)] for label, count in self.age_rows()]
+        write_table(["AGE", "NODES", "%"], rows, table_format, stream)
+        if self.oldest is not None:
+            stream.write(f"\nOldest: {self._age(self.oldest)}  Newest: {self._age(self.newest)}\n")
+
+    def _percent(self, count: int) -> str:
+        return f"{count * 100 // self.nodes}%" if self.nodes else "0%"
@@ -0,0 +1,143 @@
+"""Table rendering for kubectl-node-cloud."""
+
+import math
+import re
+import sys
+from itertools import chain
+from typing import List, Sequence
+
+from .config import DEFAULT_TABLE_FORMAT
+
+COLUMN_SEPARATOR = "  "
+
+# tabulate pads every header by this much when sizing its column
+HEADER_PADDING = 2
+
+# Output is handed to the stream in chunks of about this many characters
+WRITE_CHUNK_SIZE = 64 * 1024
+
+# Cell kinds, ordered like tabulate's column types from least to most generic
+_EMPTY, _BOOL, _INT, _FLOAT, _TEXT = range(5)
+
+# Numbers such as "1,000" or "1,000.5", which tabulate also treats as numeric
+_THOUSANDS = re.compile(r"^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$")
+
+# Cells are joined with \x1f to be checked in one pass. Anything but
+# printable ASCII (wide characters, escape codes, newlines) or whitespace
+# at either end of a cell (tabulate strips it) is left to tabulate.
+_NEEDS_TABULATE = re.compile(r"[^\x1f -~]|^ | $| \x1f|\x1f ")
+
+
+def _cell_kind(cell: str) -> int:
+    """Classify a cell the way tabulate infers its type."""
+    if not cell:
+        return _EMPTY
+    if cell == "True" or cell == "False":
+        return _BOOL
+    try:
+        int(cell)
+        return _INT
+    except ValueError:
+        pass
+    if _THOUSANDS.match(cell):
+        return _FLOAT if "." in cell else _INT
+    try:
+        value = float(cell)
+    except ValueError:
+        return _TEXT
+    if (math.isinf(value) or math.isnan(value)) and cell.lower() not in ("inf", "-inf", "nan"):
+        return _TEXT
+    return _FLOAT
+
+
+def _column_kind(column: Sequence[str]) -> int:
+    """Return the most generic kind in a column.
+
+    Scanning stops at the first text cell, which for columns like NAME is
+    the first row, so only columns that look numeric are read to the end.
+    """
+    kind = _EMPTY
+    for cell in column:
+        cell_kind = _cell_kind(cell)
+        if cell_kind == _TEXT:
+            return _TEXT
+        if cell_kind > kind:
+            kind = cell_kind
+    return kind
+
+
+def plain_lines(headers: Sequence[str], rows: Sequence[Sequence[str]]):
+    """Lay out rows like ``tabulate(tablefmt="plain")``, or None if it cannot.
+
+    Tables of single-line, printable ASCII strings, which is what the
+    extractors produce, are laid out here with widths computed in one pass
+    over each column; None is returned for anything else (wide characters,
+    escape codes, non-string cells, float columns) so tabulate handles it.
+    """
+    width = len(headers)
+    if not width or any(len(row) != width for row in rows):
+        return None
+    try:
+        text = "\x1f".join(chain(headers, chain.from_iterable(rows)))
+    except TypeError:  # a cell that is not a string
+        return None
+    if _NEEDS_TABULATE.search(text):
+        return None
+
+    columns = list(zip(*rows)) if rows else [()] * width
+    formats = []
+    for header, column in zip(headers, columns):
+        kind = _column_kind(column)
+        if kind == _FLOAT:
+            return None
+        column_width = max(len(header) + HEADER_PADDING, max(map(len, column), default=0))
+        # Integer columns are right-aligned like tabulate aligns numbers
+        formats.append(f"{{:{'>' if kind == _INT else '<'}{column_width}}}")
+
+    row_format = COLUMN_SEPARATOR.join(formats)
+    lines = [row_format.format(*headers).rstrip()]
+    lines.extend(row_format.format(*row).rstrip() for row in rows)
+    return lines
+
+
+def table_lines(headers: Sequence[str], rows: Sequence[Sequence[str]],
+                table_format: str = DEFAULT_TABLE_FORMAT) -> List[str]:
+    """Lay out a table as lines, using tabulate for anything but plain tables."""
+    if table_format == DEFAULT_TABLE_FORMAT:
+        lines = plain_lines(headers, rows)
+        if lines is not None:
+            return lines
+    from tabulate import tabulate
+    return tabulate(rows, headers=headers, tablefmt=table_format).split("\n")
+
+
+def format_table(headers: Sequence[str], rows: Sequence[Sequence[str]],
+                 table_format: str = DEFAULT_TABLE_FORMAT) -> str:
+    """Format a table as one string without a trailing newline."""
+    return "\n".join(table_lines(headers, rows, table_format))
+
+
+def write_table(headers: Sequence[str], rows: Sequence[Sequence[str]],
+                table_format: str = DEFAULT_TABLE_FORMAT, stream=None):
+    """Write a table followed by a newline, in large chunks rather than per line.
+
+    Returns the number of characters written.
+    """
+    stream = stream or sys.stdout
+    chunk = []
+    size = 0
+    written = 0
+    for line in table_lines(headers, rows, table_format):
+        chunk.append(line)
+        size += len(line) + 1
+        if size >= WRITE_CHUNK_SIZE:
+            chunk.append("")
+            stream.write("\n".join(chunk))
+            written += size
+            chunk = []
+            size = 0
+    if chunk:
+        chunk.append("")
+        stream.write("\n".join(chunk))
+        written += size
+    return written
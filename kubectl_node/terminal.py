@@ -0,0 +1,119 @@
+"""Flicker-free incremental terminal rendering for watch mode."""
+
+import shutil
+import sys
+from typing import List, Optional
+
+CLEAR_SCREEN = "\033[H\033[2J"
+CLEAR_TO_EOL = "\033[K"
+CLEAR_TO_EOS = "\033[J"
+
+
+def _move(row: int, column: int = 1) -> str:
+    """Cursor-addressing escape for a 1-based row and column."""
+    return f"\033[{row};{column}H"
+
+
+def _line_update(row: int, old: str, new: str) -> str:
+    """Escape sequence rewriting only the changed span of one line."""
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+
+    if len(old) != len(new):
+        return _move(row, prefix + 1) + new[prefix:] + CLEAR_TO_EOL
+
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return _move(row, prefix + 1) + new[prefix:len(new) - suffix]
+
+
+class IncrementalRenderer:
+    """Redraw a frame by rewriting only the parts that changed.
+
+    The previous frame is kept; each new frame is compared line by line and
+    only the changed span of each changed line is written with cursor
+    addressing. A full repaint happens on the first frame, when the layout
+    key (e.g. the header line, which encodes the column widths) changes, or
+    when the terminal is resized. Lines are cut at the terminal width, as a
+    wrapped line would shift every row below it off its addressed row. ``last_frame_bytes`` holds the size of the
+    last frame written.
+    """
+
+    def __init__(self, stream=None, get_size=shutil.get_terminal_size):
+        self.stream = stream or sys.stdout
+        self.get_size = get_size
+        self.previous = None
+        self.layout_key = None
+        self.size = None
+        self.frames = 0
+        self.full_repaints = 0
+        self.last_frame_bytes = 0
+        self.total_bytes = 0
+
+    def invalidate(self):
+        """Force the next frame to be a full repaint (e.g. after stray output)."""
+        self.previous = None
+
+    def _is_terminal(self) -> bool:
+        isatty = getattr(self.stream, "isatty", None)
+        return bool(isatty and isatty())
+
+    def _fit(self, body: List[str], footer: List[str], width: int, height: int) -> List[str]:
+        """Clip the frame to the terminal so every line can be addressed.
+
+        The last row is kept free for the cursor: a full repaint ends with
+        a newline and updates park the cursor below the frame, so a frame
+        filling the whole height would scroll and shift every row by one.
+        """
+        room = height - len(footer) - 1
+        if len(body) <= room:
+            lines = body + footer
+        else:
+            room = max(room - 1, 0)
+            hidden = len(body) - room
+            lines = body[:room] + [f"... {hidden} more rows not shown"] + footer
+        return [line[:width] for line in lines]
+
+    def render(self, body: List[str], footer: Optional[List[str]] = None,
+               layout_key: Optional[str] = None) -> int:
+        """Draw a frame and return the number of bytes written."""
+        footer = footer or []
+
+        if self._is_terminal():
+            size = tuple(self.get_size())
+            lines = self._fit(body, footer, size[0], size[1])
+        else:
+            # Not a terminal: nothing to address, always write whole frames
+            size = None
+            lines = body + footer
+            self.previous = None
+
+        if self.previous is None or size != self.size or layout_key != self.layout_key:
+            output = CLEAR_SCREEN + "\n".join(lines) + "\n"
+            self.full_repaints += 1
+        else:
+            parts = []
+            previous = self.previous
+            for index, line in enumerate(lines):
+                old = previous[index] if index < len(previous) else ""
+                if line != old:
+                    parts.append(_line_update(index + 1, old, line))
+            if len(lines) < len(previous):
+                parts.append(_move(len(lines) + 1) + CLEAR_TO_EOS)
+            # Park the cursor below the frame
+            parts.append(_move(len(lines) + 1))
+            output = "".join(parts)
+
+        self.stream.write(output)
+        self.stream.flush()
+
+        self.previous = lines
+        self.layout_key = layout_key
+        self.size = size
+        self.frames += 1
+        self.last_frame_bytes = len(output.encode("utf-8"))
+        self.total_bytes += self.last_frame_bytes
+        return self.last_frame_bytes
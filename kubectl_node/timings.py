@@ -0,0 +1,178 @@
+"""Per-phase timings and Chrome trace events for kubectl-node-cloud.
+
+Code marks its phases with ``phase(name)``, which costs next to nothing
+unless a ``Recorder`` is active. The recorder sums the phases up for
+``--timings`` and, for ``--trace``, writes each one as a Chrome trace event
+(viewable in chrome://tracing or Perfetto) as soon as it ends, so a trace
+of a long watch session is usable even if the process is killed.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class _NullSpan:
+    """Stands in for a span when nothing is being recorded."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+# The recorder phases are reported to, if any
+_ACTIVE = None
+
+
+class Span:
+    """One timed phase; ``set`` attaches counts such as bytes or nodes."""
+
+    def __init__(self, recorder: "Recorder", name: str, args: Dict[str, Any]):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.allocated = self.recorder.allocated()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        if self.allocated is not None:
+            self.args["allocated"] = self.recorder.allocated() - self.allocated
+        self.recorder.record(self.name, self.start, end - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class Recorder:
+    """Collect phase timings, optionally streaming them to a trace file.
+
+    With ``allocations`` tracemalloc runs as well: every span records how
+    much the Python heap grew during it, and the heap size is written to
+    the trace as a counter. Tracing allocations slows everything down, so
+    timings taken with it are only good for comparing phases.
+    """
+
+    def __init__(self, trace_path: Optional[str] = None, allocations: bool = False):
+        self.started = time.perf_counter_ns()
+        self.allocations = allocations
+        self.totals = {}
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._trace = None
+        self._events = 0
+        self._tracemalloc = None
+        # Opened first, so an unwritable path (OSError) leaves nothing running
+        if trace_path:
+            self._trace = open(trace_path, "w")
+            self._trace.write("[")
+        if allocations:
+            import tracemalloc
+            tracemalloc.start()
+            self._tracemalloc = tracemalloc
+
+    def span(self, name: str, **args) -> Span:
+        return Span(self, name, args)
+
+    def allocated(self) -> Optional[int]:
+        """Current size of the traced Python heap, or None if not tracing."""
+        if self._tracemalloc is None:
+            return None
+        return self._tracemalloc.get_traced_memory()[0]
+
+    def record(self, name: str, start: int, duration: int, args: Dict[str, Any]):
+        """Add a finished phase to the totals and the trace."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            total = self.totals.setdefault(
+                name, {"calls": 0, "ns": 0, "bytes": 0, "nodes": 0, "allocated": 0})
+            total["calls"] += 1
+            total["ns"] += duration
+            for key in ("bytes", "nodes", "allocated"):
+                total[key] += args.get(key, 0)
+            if self._trace is None:
+                return
+            tid = self._threads.get(thread_id)
+            if tid is None:
+                tid = self._threads[thread_id] = len(self._threads) + 1
+                self._write({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                             "args": {"name": threading.current_thread().name}})
+            self._write({"name": name, "cat": "kubectl-node", "ph": "X", "pid": os.getpid(),
+                         "tid": tid, "ts": (start - self.started) / 1000,
+                         "dur": duration / 1000, "args": args})
+            if self._tracemalloc is not None:
+                current, peak = self._tracemalloc.get_traced_memory()
+                self._write({"name": "python heap", "ph": "C", "pid": os.getpid(),
+                             "ts": (start + duration - self.started) / 1000,
+                             "args": {"current": current, "peak": peak}})
+            if threading.current_thread() is threading.main_thread():
+                # Main-thread phases end ticks and runs; make them visible now
+                self._trace.flush()
+
+    def _write(self, event: Dict[str, Any]):
+        self._trace.write(("\n" if not self._events else ",\n") + json.dumps(event))
+        self._events += 1
+
+    def summary(self) -> List[str]:
+        """Format the per-phase totals as table lines."""
+        elapsed = (time.perf_counter_ns() - self.started) / 1e6
+        lines = [f"{'PHASE':<16}{'CALLS':>7}{'TIME (ms)':>12}{'BYTES':>13}{'NODES':>9}"
+                 + (f"{'HEAP GROWTH':>14}" if self.allocations else "")]
+        for name, total in sorted(self.totals.items(), key=lambda item: -item[1]["ns"]):
+            lines.append(f"{name:<16}{total['calls']:>7}{total['ns'] / 1e6:>12.1f}"
+                         f"{total['bytes'] or '':>13}{total['nodes'] or '':>9}"
+                         + (f"{total['allocated']:>14}" if self.allocations else ""))
+        lines.append(f"{'total':<16}{'':>7}{elapsed:>12.1f}")
+        return lines
+
+    def close(self):
+        """Finish the trace file and stop tracing allocations."""
+        with self._lock:
+            if self._trace is not None:
+                self._trace.write("\n]\n")
+                self._trace.close()
+                self._trace = None
+        if self._tracemalloc is not None:
+            self._tracemalloc.stop()
+            self._tracemalloc = None
+
+
+def phase(name: str, **args):
+    """Time a block as a phase of the active recorder, if there is one.
+
+    ``with phase("json_decode", bytes=len(text)) as span: ...``; use
+    ``span.set(nodes=...)`` for counts only known at the end.
+    """
+    recorder = _ACTIVE
+    if recorder is None:
+        return _NULL_SPAN
+    return recorder.span(name, **args)
+
+
+def start_recording(trace_path: Optional[str] = None, allocations: bool = False) -> Recorder:
+    """Make a new recorder the active one and return it."""
+    global _ACTIVE
+    _ACTIVE = Recorder(trace_path, allocations)
+    return _ACTIVE
+
+
+def stop_recording() -> Optional[Recorder]:
+    """Deactivate and close the active recorder, returning it."""
+    global _ACTIVE
+    recorder, _ACTIVE = _ACTIVE, None
+    if recorder is not None:
+        recorder.close()
+    return recorder
@@ -1,12 +1,22 @@
 """Utility functions for kubectl-node-cloud."""
 
+import calendar
 import json
+import math
 import subprocess
 import sys
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional
+from fractions import Fraction
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+from urllib.parse import urlencode
 
-from .exceptions import KubectlCommandError, JSONParseError
+from .exceptions import KubectlCommandError, KubectlTimeoutError, JSONParseError, KubeconfigError
+from .record import as_record
+from .timings import phase
+
+NODES_PATH = "/api/v1/nodes"
 
 
 def format_timedelta(td):
@@ -37,46 +47,471 @@ def calculate_node_age(creation_timestamp: str) -> str:
         return "Unknown"
 
 
-def kubectl_get_nodes(context: Optional[str] = None) -> Dict[str, Any]:
-    """Execute kubectl get nodes command and return parsed JSON."""
-    command = ["kubectl", "get", "nodes", "-o", "json"]
+def parse_timestamp(timestamp: str) -> Optional[int]:
+    """Parse a ``2023-01-01T12:00:00Z`` timestamp into epoch seconds, or None.
+
+    Slicing the fixed layout is much faster than ``strptime``, which counts
+    when it runs once per node of a large cluster.
+    """
+    try:
+        if len(timestamp) != 20 or timestamp[10] != "T" or timestamp[19] != "Z":
+            return None
+        return calendar.timegm((int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+                                int(timestamp[11:13]), int(timestamp[14:16]),
+                                int(timestamp[17:19])))
+    except (TypeError, ValueError):
+        return None
+
+
+# Multipliers of Kubernetes resource quantity suffixes
+_QUANTITY_SUFFIXES = {
+    "n": Fraction(1, 10 ** 9), "u": Fraction(1, 10 ** 6), "m": Fraction(1, 10 ** 3), "": 1,
+    "k": 10 ** 3, "M": 10 ** 6, "G": 10 ** 9, "T": 10 ** 12, "P": 10 ** 15, "E": 10 ** 18,
+    "Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30, "Ti": 2 ** 40, "Pi": 2 ** 50, "Ei": 2 ** 60,
+}
+
+
+def parse_quantity(quantity: str) -> Fraction:
+    """Parse a resource quantity such as ``250m``, ``1.5Gi`` or ``1e3`` exactly.
+
+    Raises ValueError for anything that is not a quantity.
+    """
+    text = str(quantity).strip()
+    number = text.rstrip("numkKMGTPEi")
+    suffix = text[len(number):]
+    if suffix not in _QUANTITY_SUFFIXES:
+        raise ValueError(f"Invalid quantity '{quantity}'")
+    return Fraction(number) * _QUANTITY_SUFFIXES[suffix]
+
+
+# Quantities repeat a lot (every pod of a deployment asks for the same), so
+# the parsed values are cached per string
+@lru_cache(maxsize=4096)
+def parse_cpu_millis(quantity: str) -> int:
+    """Parse a CPU quantity into millicores, rounding up like the scheduler."""
+    return math.ceil(parse_quantity(quantity) * 1000)
+
+
+@lru_cache(maxsize=4096)
+def parse_memory_bytes(quantity: str) -> int:
+    """Parse a memory quantity into bytes."""
+    return math.ceil(parse_quantity(quantity))
+
+
+def format_cpu_millis(millis: int) -> str:
+    """Format millicores as kubectl does: whole cores, or millicores."""
+    return str(millis // 1000) if millis % 1000 == 0 else f"{millis}m"
+
+
+def format_memory_bytes(size: int) -> str:
+    """Format bytes in Mi, or in Gi with one decimal from 10Gi up."""
+    if size >= 10 * 2 ** 30:
+        return f"{size / 2 ** 30:.1f}Gi"
+    return f"{size // 2 ** 20}Mi"
+
+
+def format_usage(used: str, amount: float, total: Optional[float]) -> str:
+    """Append the share of ``total`` that ``amount`` is, truncated like kubectl."""
+    if not total:
+        return used
+    return f"{used} ({int(amount * 100 // total)}%)"
+
+
+def kubectl_get_nodes(context: Optional[str] = None, transport: str = "kubectl",
+                      timeout: Optional[float] = None, projection=None,
+                      selector=None, versioned: bool = False) -> Dict[str, Any]:
+    """Get the node list, natively or via the kubectl subprocess.
+
+    With ``transport="native"`` the API server is queried in-process using
+    the kubeconfig; if the kubeconfig needs something only kubectl can do
+    (e.g. exec credential plugins) the kubectl subprocess is used instead.
+    ``timeout`` bounds the kubectl run, or each native network operation.
+    With a ``projection`` only the projected node fields are returned, and
+    with a ``selector`` only the nodes the API server selects. With
+    ``versioned`` the list keeps a ``metadata.resourceVersion`` a watch can
+    resume from, which ``kubectl get`` itself does not print.
+    """
+    if transport == "native":
+        from .client import list_nodes
+        try:
+            return list_nodes(context=context, timeout=timeout, projection=projection,
+                              selector=selector)
+        except KubeconfigError:
+            pass
+
+    if projection is not None and projection.supports_template():
+        try:
+            return _kubectl_get_projected_nodes(projection, context=context, timeout=timeout,
+                                                selector=selector, versioned=versioned)
+        except JSONParseError:
+            # A value the template cannot quote as JSON; fetch everything
+            pass
+
+    if versioned:
+        # The raw list keeps the API server's resourceVersion
+        nodes = api_get(NODES_PATH, _selector_params(selector), context=context, timeout=timeout)
+    else:
+        nodes = _kubectl_get_nodes_subprocess(context=context, timeout=timeout,
+                                              selector=selector)
+    if projection is not None:
+        with phase("prune", nodes=len(nodes.get("items", []))):
+            projection.prune_list(nodes)
+    return nodes
+
+
+def kubectl_get_node_pages(context: Optional[str] = None, transport: str = "kubectl",
+                           page_size: int = 500,
+                           selector=None) -> Iterator[List[Dict[str, Any]]]:
+    """Get the node list in pages of at most ``page_size`` nodes.
+
+    The native transport pages with ``limit``/``continue``. The kubectl
+    transport asks kubectl for ``--chunk-size`` pages and decodes its output
+    one node at a time, so only one page of nodes is held here at once.
+    """
+    if transport == "native":
+        from .client import list_node_pages
+        try:
+            pages = list_node_pages(context=context, page_size=page_size, selector=selector)
+            first = next(pages, None)
+        except KubeconfigError:
+            pages = None
+        if pages is not None:
+            if first is not None:
+                yield first
+                yield from pages
+            return
+    
+    command = _kubectl_command(["get", "nodes", "-o", "json", f"--chunk-size={page_size}"]
+                               + _selector_args(selector), context)
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+    except OSError as e:
+        raise KubectlCommandError(f"Unexpected error executing kubectl: {str(e)}")
+    
+    try:
+        page = []
+        for node in iter_json_list_items(process.stdout):
+            page.append(node)
+            if len(page) >= page_size:
+                yield page
+                page = []
+        error = process.stderr.read()
+        if process.wait() != 0:
+            raise _kubectl_error(process.returncode, error, context)
+        if page:
+            yield page
+    finally:
+        if process.poll() is None:
+            process.terminate()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def iter_json_list_items(stream, chunk_size: int = 65536) -> Iterator[Dict[str, Any]]:
+    """Decode the ``items`` of a JSON list object one at a time from a text stream."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+    
+    def read_more():
+        nonlocal buffer, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer += chunk
     
-    # Add context if specified
+    # Skip ahead to the opening bracket of the items array
+    while True:
+        start = buffer.find('"items"')
+        if start >= 0:
+            bracket = buffer.find("[", start)
+            if bracket >= 0:
+                buffer = buffer[bracket + 1:]
+                break
+        if eof:
+            return
+        read_more()
+    
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if buffer.startswith("]"):
+            return
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise JSONParseError(f"Failed to parse kubectl output as JSON: {str(e)}",
+                                         raw_output=buffer[:1000])
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            raise JSONParseError("Truncated kubectl output: items list not closed")
+        read_more()
+
+
+def _selector_args(selector) -> List[str]:
+    """Return the kubectl arguments selecting nodes, if any."""
+    return selector.kubectl_args() if selector is not None else []
+
+
+def _selector_params(selector) -> Dict[str, str]:
+    """Return the API query parameters selecting nodes, if any."""
+    return selector.params() if selector is not None else {}
+
+
+def _kubectl_get_nodes_subprocess(context: Optional[str] = None,
+                                  timeout: Optional[float] = None,
+                                  selector=None) -> Dict[str, Any]:
+    """Execute kubectl get nodes command and return parsed JSON."""
+    return _run_kubectl_json(["get", "nodes", "-o", "json"] + _selector_args(selector),
+                             context=context, timeout=timeout)
+
+
+def _kubectl_get_projected_nodes(projection, context: Optional[str] = None,
+                                 timeout: Optional[float] = None, selector=None,
+                                 versioned: bool = False) -> Dict[str, Any]:
+    """Have kubectl print only the projected node fields through a go-template.
+
+    ``kubectl get`` prints lists without their resourceVersion. With
+    ``versioned`` a one-node list is read first for one; a watch from it
+    replays any change made before the full list, so none is missed.
+    """
+    resource_version = ""
+    if versioned:
+        head = api_get(NODES_PATH, dict(_selector_params(selector), limit=1),
+                       context=context, timeout=timeout)
+        resource_version = head.get("metadata", {}).get("resourceVersion", "")
+    items = kubectl_get_projected("nodes", projection, _selector_args(selector),
+                                  context=context, timeout=timeout)
+    metadata = {"resourceVersion": resource_version} if versioned else {}
+    return {"kind": "List", "apiVersion": "v1", "metadata": metadata, "items": items}
+
+
+def kubectl_get_projected(resource: str, projection, args: Sequence[str] = (),
+                          context: Optional[str] = None,
+                          timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Have kubectl print only the projected fields of a resource through a go-template.
+
+    ``args`` are further ``kubectl get`` arguments, e.g. selectors. Raises
+    JSONParseError on a value the template could not quote as JSON.
+    """
+    output = _run_kubectl(["get", resource, "-o", f"go-template={projection.go_template()}"]
+                          + list(args), context=context, timeout=timeout)
+    with phase("json_decode", bytes=len(output)) as span:
+        items = projection.parse_template_output(output)
+        span.set(**{resource: len(items)})
+    return items
+
+
+def kubectl_stream_projected(resource: str, projection, args: Sequence[str] = (),
+                             context: Optional[str] = None,
+                             timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Like ``kubectl_get_projected``, but yield each object as kubectl prints it.
+
+    kubectl's output is read line by line, so however many objects there
+    are only one is held here at a time. ``timeout`` bounds the whole run;
+    kubectl is killed once it has passed.
+    """
+    command = _kubectl_command(["get", resource, "-o", f"go-template={projection.go_template()}"]
+                               + list(args), context)
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+    except OSError as e:
+        raise KubectlCommandError(f"Unexpected error executing kubectl: {str(e)}")
+
+    expired = threading.Event()
+    timer = None
+    if timeout is not None:
+        def kill():
+            expired.set()
+            process.kill()
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+
+    try:
+        with phase("kubectl", args=f"get {resource}") as span:
+            size = count = 0
+            for line in process.stdout:
+                if not line.strip():
+                    continue
+                size += len(line)
+                count += 1
+                yield projection.parse_template_line(line)
+            error = process.stderr.read()
+            if process.wait() != 0:
+                if expired.is_set():
+                    raise KubectlTimeoutError(f"kubectl did not finish within {timeout:g} seconds")
+                raise _kubectl_error(process.returncode, error, context)
+            span.set(bytes=size, **{resource: count})
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def _kubectl_command(args: List[str], context: Optional[str] = None) -> List[str]:
+    """Build a kubectl command line, adding the context if specified."""
+    command = ["kubectl"] + list(args)
     if context:
         command.extend(["--context", context])
+    return command
+
+
+def _kubectl_error(returncode: int, error: str, context: Optional[str] = None) -> KubectlCommandError:
+    """Build the error for a failed kubectl command."""
+    # Provide more specific error messages for common issues
+    if "context" in error.lower() and context:
+        return KubectlCommandError(
+            f"Context '{context}' not found. Use 'kubectl config get-contexts' to list available contexts.",
+            stderr=error
+        )
+    return KubectlCommandError(
+        f"kubectl command failed with return code {returncode}",
+        stderr=error
+    )
+
+
+def _run_kubectl(args: List[str], context: Optional[str] = None,
+                 timeout: Optional[float] = None) -> str:
+    """Run a kubectl command and return its standard output."""
+    command = _kubectl_command(args, context)
     
     try:
-        with subprocess.Popen(
+        with phase("kubectl", args=" ".join(args[:2])) as span, subprocess.Popen(
             command, 
             stdout=subprocess.PIPE, 
             stderr=subprocess.PIPE, 
             text=True
         ) as process:
-            output, error = process.communicate()
+            try:
+                output, error = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise KubectlTimeoutError(f"kubectl did not finish within {timeout:g} seconds")
             
             if process.returncode != 0:
-                # Provide more specific error messages for common issues
-                if "context" in error.lower() and context:
-                    raise KubectlCommandError(
-                        f"Context '{context}' not found. Use 'kubectl config get-contexts' to list available contexts.",
-                        stderr=error
-                    )
-                else:
-                    raise KubectlCommandError(
-                        f"kubectl command failed with return code {process.returncode}",
-                        stderr=error
-                    )
+                raise _kubectl_error(process.returncode, error, context)
             
-            return json.loads(output)
+            span.set(bytes=len(output))
+            return output
             
+    except KubectlCommandError:
+        raise
+    except Exception as e:
+        raise KubectlCommandError(f"Unexpected error executing kubectl: {str(e)}")
+
+
+def _run_kubectl_json(args: List[str], context: Optional[str] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Run a kubectl command and return its parsed JSON output."""
+    output = _run_kubectl(args, context=context, timeout=timeout)
+    try:
+        with phase("json_decode", bytes=len(output)):
+            return json.loads(output)
     except json.JSONDecodeError as e:
         raise JSONParseError(f"Failed to parse kubectl output as JSON: {str(e)}", raw_output=output)
-    except Exception as e:
+
+
+def _raw_path(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Build an API path with query string for ``kubectl get --raw``."""
+    if params:
+        query = {key: value for key, value in params.items() if value is not None}
+        if query:
+            return f"{path}?{urlencode(query)}"
+    return path
+
+
+def api_get(path: str, params: Optional[Dict[str, Any]] = None,
+            context: Optional[str] = None, transport: str = "kubectl",
+            timeout: Optional[float] = None) -> Dict[str, Any]:
+    """GET an API path and return the decoded JSON body.
+
+    The kubectl transport uses ``kubectl get --raw``, so the response is the
+    API server's own (e.g. lists keep their ``metadata.resourceVersion``).
+    ``timeout`` bounds the kubectl run, or each native network operation.
+    """
+    if transport == "native":
+        from .client import get_client
+        try:
+            return get_client(context).get_json(path, params, timeout=timeout)
+        except KubeconfigError:
+            pass
+
+    return _run_kubectl_json(["get", "--raw", _raw_path(path, params)], context=context,
+                             timeout=timeout)
+
+
+def api_stream(path: str, params: Optional[Dict[str, Any]] = None,
+               context: Optional[str] = None, transport: str = "kubectl") -> Iterator[str]:
+    """GET a streaming API path (e.g. a watch) and yield non-empty lines."""
+    if transport == "native":
+        from .client import get_client
+        try:
+            api = get_client(context)
+        except KubeconfigError:
+            api = None
+        if api is not None:
+            yield from api.stream_lines(path, params)
+            return
+
+    command = _kubectl_command(["get", "--raw", _raw_path(path, params)], context)
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+    except OSError as e:
         raise KubectlCommandError(f"Unexpected error executing kubectl: {str(e)}")
+    
+    try:
+        for line in process.stdout:
+            if line.strip():
+                yield line
+        error = process.stderr.read()
+        if process.wait() != 0:
+            raise _kubectl_error(process.returncode, error, context)
+    finally:
+        if process.poll() is None:
+            process.terminate()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
 
 
 def get_current_context() -> str:
-    """Get the current kubectl context."""
+    """Get the current kubectl context.
+
+    The kubeconfig is read in-process; ``kubectl config current-context``
+    is only run if it cannot be read natively.
+    """
+    from .kubeconfig import load_kubeconfig, current_context
+    try:
+        return current_context(load_kubeconfig()) or "unknown"
+    except KubeconfigError:
+        pass
+    
     try:
         with subprocess.Popen(
             ["kubectl", "config", "current-context"],
@@ -95,7 +530,17 @@ def get_current_context() -> str:
 
 
 def list_contexts() -> list:
-    """List available kubectl contexts."""
+    """List available kubectl contexts.
+
+    The kubeconfig is read in-process; ``kubectl config get-contexts`` is
+    only run if it cannot be read natively.
+    """
+    from .kubeconfig import load_kubeconfig, context_names
+    try:
+        return context_names(load_kubeconfig())
+    except KubeconfigError:
+        pass
+    
     try:
         with subprocess.Popen(
             ["kubectl", "config", "get-contexts", "-o", "name"],
@@ -113,21 +558,19 @@ def list_contexts() -> list:
         return []
 
 
-def get_node_status(node: Dict[str, Any]) -> str:
-    """Extract and format node status."""
-    status = node["status"]
-    spec = node["spec"]
+def get_node_status(node) -> str:
+    """Extract and format node status from a node record or object."""
+    node = as_record(node)
     
     # Get the Ready condition
     ready_status = "Unknown"
-    for condition in status.get("conditions", []):
-        if condition["type"] == "Ready":
-            ready_status = "Ready" if condition["status"] == "True" else "NotReady"
+    for condition_type, status, reason in node.conditions:
+        if condition_type == "Ready":
+            ready_status = "Ready" if status == "True" else "NotReady"
             break
     
     # Check if node is unschedulable
-    is_unschedulable = spec.get("unschedulable", False)
-    if is_unschedulable:
+    if node.unschedulable:
         if ready_status == "Ready":
             return "Ready,SchedulingDisabled"
         else:
@@ -136,29 +579,26 @@ def get_node_status(node: Dict[str, Any]) -> str:
     return ready_status
 
 
-def get_node_roles(node: Dict[str, Any]) -> str:
-    """Extract node roles from labels."""
-    labels = node["metadata"].get("labels", {})
+def get_node_roles(node) -> str:
+    """Extract node roles from labels of a node record or object."""
     roles = [
         key.split("/")[1]
-        for key in labels.keys()
+        for key in as_record(node).labels.keys()
         if key.startswith("node-role.kubernetes.io/")
     ]
     return ",".join(sorted(roles)) or "<none>"
 
 
-def get_node_addresses(node: Dict[str, Any]) -> Dict[str, str]:
-    """Extract internal and external IP addresses."""
-    addresses = node["status"].get("addresses", [])
-    
+def get_node_addresses(node) -> Dict[str, str]:
+    """Extract internal and external IP addresses of a node record or object."""
     internal_ip = "N/A"
     external_ip = "N/A"
     
-    for addr in addresses:
-        if addr["type"] == "InternalIP":
-            internal_ip = addr["address"]
-        elif addr["type"] == "ExternalIP":
-            external_ip = addr["address"]
+    for kind, address in as_record(node).addresses:
+        if kind == "InternalIP":
+            internal_ip = address
+        elif kind == "ExternalIP":
+            external_ip = address
     
     return {
         "INTERNAL-IP": internal_ip,
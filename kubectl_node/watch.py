@@ -0,0 +1,206 @@
+"""Incremental node watching for kubectl-node-cloud watch mode."""
+
+import json
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from .exceptions import APIError, KubectlCommandError, KubectlNodeError
+from .record import NodeRecord
+from .utils import NODES_PATH, api_stream, kubectl_get_nodes
+
+# Ask the server to end each watch after this long; we then resume from the
+# last resourceVersion, which also keeps idle connections from going stale
+WATCH_TIMEOUT_SECONDS = 300
+
+# Backoff between reconnect attempts after an error
+RETRY_DELAYS = [1, 2, 5, 10, 30]
+
+# Watches that end sooner than this are not restarted straight away, so a
+# server or proxy that keeps closing the stream cannot cause a busy loop
+MIN_WATCH_SECONDS = 1
+
+
+class ResourceVersionExpired(KubectlNodeError):
+    """Raised when the watch resourceVersion is too old (410 Gone)."""
+    pass
+
+
+def _is_gone(error: KubectlNodeError) -> bool:
+    """Check whether an error means the resourceVersion expired."""
+    if isinstance(error, APIError):
+        return error.status == 410
+    if isinstance(error, KubectlCommandError):
+        stderr = error.stderr or ""
+        return "(Gone)" in stderr or "(Expired)" in stderr or "410" in stderr
+    return False
+
+
+class NodeWatcher:
+    """Keep a local node map in sync with one list plus a watch stream.
+
+    Nodes are keyed by UID. The watch resumes from the last seen
+    resourceVersion (advanced by BOOKMARK events) after a disconnect, and
+    only re-lists when the server reports that version as gone (410). With
+    a ``projection`` every node is pruned to its fields on arrival, and
+    with ``records`` kept as a ``record.NodeRecord`` instead of an object.
+    With a ``selector`` the list and the watch only carry the selected
+    nodes; a node whose labels stop matching arrives as a DELETED event.
+    """
+
+    def __init__(self, context: Optional[str] = None, transport: str = "kubectl",
+                 timeout_seconds: int = WATCH_TIMEOUT_SECONDS, projection=None,
+                 selector=None, records: bool = False):
+        self.context = context
+        self.transport = transport
+        self.timeout_seconds = timeout_seconds
+        self.projection = projection
+        self.selector = selector
+        self.records = records
+        self.nodes = {}
+        self.resource_version = None
+        self.synced = threading.Event()
+        self.error = None
+        self.relists = 0
+        self.reconnects = 0
+        self.events = 0
+        self.version = 0
+        # time.monotonic() of the last list or event: how fresh the map is
+        self.updated = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def relist(self):
+        """Replace the local node map with a full list.
+        
+        The list is fetched projected, so with the kubectl transport only
+        the projected fields are printed and decoded.
+        """
+        data = kubectl_get_nodes(context=self.context, transport=self.transport,
+                                 projection=self.projection, selector=self.selector,
+                                 versioned=True)
+        nodes = {}
+        for node in data.get("items", []):
+            nodes[node["metadata"]["uid"]] = self.keep(node, pruned=True)
+        with self._lock:
+            self.nodes = nodes
+            self.resource_version = data.get("metadata", {}).get("resourceVersion") or None
+            self.relists += 1
+            self.version += 1
+            self.updated = time.monotonic()
+        self.synced.set()
+
+    def keep(self, node: Dict[str, Any], pruned: bool = False):
+        """Return what the node map holds for a node object."""
+        if self.projection is not None and not pruned:
+            node = self.projection.prune(node)
+        if self.records:
+            node = NodeRecord.from_node(node)
+        return node
+
+    def selector_params(self) -> Dict[str, str]:
+        """Return the selector query parameters of the list and the watch."""
+        return self.selector.params() if self.selector is not None else {}
+
+    def apply_event(self, event: Dict[str, Any]):
+        """Apply one watch event to the local node map."""
+        event_type = event.get("type")
+        obj = event.get("object") or {}
+
+        if event_type == "ERROR":
+            if obj.get("code") == 410:
+                raise ResourceVersionExpired(obj.get("message", "resourceVersion expired"))
+            raise APIError(obj.get("message", "watch error"), status=obj.get("code"))
+
+        metadata = obj.get("metadata", {})
+        if event_type in ("ADDED", "MODIFIED"):
+            obj = self.keep(obj)
+        with self._lock:
+            if event_type in ("ADDED", "MODIFIED"):
+                self.nodes[metadata["uid"]] = obj
+                self.version += 1
+            elif event_type == "DELETED":
+                self.nodes.pop(metadata.get("uid"), None)
+                self.version += 1
+            # BOOKMARK events only carry a newer resourceVersion
+            if metadata.get("resourceVersion"):
+                self.resource_version = metadata["resourceVersion"]
+            self.events += 1
+            self.updated = time.monotonic()
+
+    def watch_once(self):
+        """Consume one watch stream from the current resourceVersion until it ends."""
+        params = {
+            "watch": "1",
+            "resourceVersion": self.resource_version,
+            "allowWatchBookmarks": "true",
+            "timeoutSeconds": self.timeout_seconds,
+            **self.selector_params(),
+        }
+        stream = api_stream(NODES_PATH, params, context=self.context, transport=self.transport)
+        try:
+            for line in stream:
+                if self._stop.is_set():
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    raise APIError(f"Invalid watch event: {line[:200]}")
+                self.apply_event(event)
+        finally:
+            stream.close()
+
+    def sync(self):
+        """List if needed, then watch once; re-list only on 410 Gone."""
+        if self.resource_version is None:
+            self.relist()
+        try:
+            self.watch_once()
+        except ResourceVersionExpired:
+            self.resource_version = None
+        except KubectlNodeError as e:
+            if not _is_gone(e):
+                raise
+            self.resource_version = None
+
+    def run(self):
+        """Keep the node map in sync until ``stop`` is called.
+
+        Any error, not only API errors but also e.g. a malformed event, is
+        kept in ``error`` for the display to show and retried with backoff,
+        so the thread never ends with the node map silently frozen.
+        """
+        failures = 0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sync()
+                self.error = None
+                failures = 0
+                self._stop.wait(MIN_WATCH_SECONDS - (time.monotonic() - started))
+            except Exception as e:
+                self.error = e
+                delay = RETRY_DELAYS[min(failures, len(RETRY_DELAYS) - 1)]
+                failures += 1
+                self._stop.wait(delay)
+            if not self._stop.is_set():
+                self.reconnects += 1
+
+    def start(self) -> "NodeWatcher":
+        """Run the watcher in a background thread."""
+        self._thread = threading.Thread(target=self.run, name="node-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the watcher to stop after the current event."""
+        self._stop.set()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return the current nodes, ordered by name like a list call."""
+        with self._lock:
+            nodes = list(self.nodes.values())
+        if self.records:
+            return sorted(nodes, key=lambda node: node.name or "")
+        return sorted(nodes, key=lambda node: node["metadata"].get("name", ""))
@@ -9,7 +9,13 @@ setup(
     packages=find_packages(),
     install_requires=[
         "tabulate",
+        # The kubeconfig is read in-process, and most kubeconfigs are YAML
+        "PyYAML",
     ],
+    extras_require={
+        # Kept so existing "[native]" installs still resolve; PyYAML is required now
+        "native": [],
+    },
     entry_points={
         "console_scripts": [
             "kubectl-node=kubectl_node:main",
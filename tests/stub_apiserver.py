@@ -0,0 +1,260 @@
+"""Stub Kubernetes API server used by the native transport tests."""
+
+import base64
+import gzip
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+def make_node(name, labels=None, uid=None, resource_version="1"):
+    """Build a minimal node object as served by the API server."""
+    return {
+        "metadata": {
+            "name": name,
+            "uid": uid or f"uid-{name}",
+            "resourceVersion": resource_version,
+            "creationTimestamp": "2023-01-01T12:00:00Z",
+            "labels": labels or {},
+        },
+        "spec": {},
+        "status": {
+            "conditions": [{"type": "Ready", "status": "True"}],
+            "addresses": [{"type": "InternalIP", "address": "10.0.0.1"}],
+            "nodeInfo": {"kubeletVersion": "v1.28.0"},
+        },
+    }
+
+
+def make_pod(name, node_name, cpu="100m", memory="128Mi", phase="Running", namespace="default"):
+    """Build a minimal pod object with one container's requests."""
+    return {
+        "metadata": {"name": name, "namespace": namespace},
+        "spec": {
+            "nodeName": node_name,
+            "containers": [{"name": "main", "resources": {"requests": {"cpu": cpu, "memory": memory}}}],
+        },
+        "status": {"phase": phase},
+    }
+
+
+def selects(obj, query):
+    """Evaluate the equality-based label and metadata.name field selectors."""
+    labels = obj["metadata"].get("labels") or {}
+    for requirement in filter(None, query.get("labelSelector", "").split(",")):
+        if "!=" in requirement:
+            key, value = requirement.split("!=", 1)
+            if labels.get(key) == value:
+                return False
+        elif "=" in requirement:
+            key, value = requirement.replace("==", "=").split("=", 1)
+            if labels.get(key) != value:
+                return False
+        elif requirement.startswith("!"):
+            if requirement[1:] in labels:
+                return False
+        elif requirement not in labels:
+            return False
+    for requirement in filter(None, query.get("fieldSelector", "").split(",")):
+        field, value = requirement.split("=", 1)
+        if field == "metadata.name" and obj["metadata"]["name"] != value:
+            return False
+    return True
+
+
+def generate_certificate(directory):
+    """Generate a self-signed certificate for 127.0.0.1, or None without openssl."""
+    if shutil.which("openssl") is None:
+        return None
+    cert = os.path.join(directory, "server.crt")
+    key = os.path.join(directory, "server.key")
+    result = subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+         "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    if result.returncode != 0:
+        return None
+    return cert, key
+
+
+class WatchStream:
+    """Marks a route response as a newline-delimited watch stream."""
+
+    def __init__(self, events):
+        self.events = events
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def do_GET(self):
+        stub = self.server.stub
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        with stub.lock:
+            stub.requests.append((parts.path, query, dict(self.headers)))
+
+        if stub.token and self.headers.get("Authorization") != f"Bearer {stub.token}":
+            self.send_json(401, {"kind": "Status", "message": "Unauthorized"})
+            return
+
+        route = stub.routes.get(parts.path)
+        if route is None:
+            self.send_json(404, {"kind": "Status", "message": "the server could not find the requested resource"})
+            return
+        status, body = route(query)
+        if isinstance(body, WatchStream):
+            self.send_stream(status, body.events)
+        else:
+            self.send_json(status, body)
+
+    def send_stream(self, status, events):
+        # Close-delimited body, one JSON event per line like a real watch
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for event in events:
+            self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        self.close_connection = True
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.server.stub.lock:
+            self.server.stub.bytes_sent += len(payload)
+
+
+class StubAPIServer:
+    """A tiny threaded API server that serves a fixed node (and pod) list."""
+
+    def __init__(self, nodes=None, token=None, tls=False, watches=None, pods=None):
+        self.nodes = list(nodes or [])
+        self.pods = list(pods or [])
+        # Each watch request consumes the next entry: a list of events, or
+        # an HTTP status code to fail with (e.g. 410)
+        self.watches = list(watches or [])
+        self.resource_version = "100"
+        self.token = token
+        self.tls = tls
+        self.requests = []
+        self.connections = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self.routes = {"/api/v1/nodes": self.list_nodes, "/api/v1/pods": self.list_pods}
+        self.tmp_dir = tempfile.mkdtemp(prefix="stub-apiserver-")
+        self.ca_file = None
+        self._server = None
+        self._thread = None
+
+    def list_nodes(self, query):
+        if query.get("watch") in ("1", "true"):
+            return self.watch_nodes(query)
+        nodes = [node for node in self.nodes if selects(node, query)]
+        return 200, self.list_page("NodeList", nodes, query)
+
+    def list_pods(self, query):
+        # Field selectors are not evaluated; clients must filter themselves
+        return 200, self.list_page("PodList", self.pods, query)
+
+    def list_page(self, kind, objects, query):
+        metadata = {"resourceVersion": self.resource_version}
+        items = objects
+        if query.get("limit"):
+            # Serve one page; the continue token is simply the next offset
+            start = int(query.get("continue") or 0)
+            end = start + int(query["limit"])
+            items = objects[start:end]
+            if end < len(objects):
+                metadata["continue"] = str(end)
+                metadata["remainingItemCount"] = len(objects) - end
+        return {"kind": kind, "apiVersion": "v1", "metadata": metadata, "items": items}
+
+    def watch_nodes(self, query):
+        with self.lock:
+            batch = self.watches.pop(0) if self.watches else []
+        if isinstance(batch, int):
+            return batch, {"kind": "Status", "code": batch, "message": "watch failed"}
+        return 200, WatchStream(batch)
+
+    def watch_requests(self):
+        """Return the query of every watch request received so far."""
+        return [query for path, query, headers in self.requests if query.get("watch")]
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        if self.tls:
+            cert = generate_certificate(self.tmp_dir)
+            if cert is None:
+                raise RuntimeError("openssl is required for the TLS stub server")
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*cert)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+            self.ca_file = cert[0]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self):
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://127.0.0.1:{self._server.server_address[1]}"
+
+    def write_kubeconfig(self, context="stub", user=None):
+        """Write a kubeconfig pointing at this server and return its path."""
+        cluster = {"server": self.url}
+        if self.ca_file:
+            with open(self.ca_file, "rb") as handle:
+                cluster["certificate-authority-data"] = base64.b64encode(handle.read()).decode("ascii")
+        if user is None:
+            user = {"token": self.token} if self.token else {}
+        config = {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "current-context": context,
+            "clusters": [{"name": "stub-cluster", "cluster": cluster}],
+            "users": [{"name": "stub-user", "user": user}],
+            "contexts": [{"name": context, "context": {"cluster": "stub-cluster", "user": "stub-user"}}],
+        }
+        path = os.path.join(self.tmp_dir, "kubeconfig")
+        with open(path, "w") as handle:
+            json.dump(config, handle)
+        return path
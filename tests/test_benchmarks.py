@@ -0,0 +1,67 @@
+"""Tests for the stage benchmark suite and its synthetic nodes."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "benchmarks"))
+
+import bench_memory  # noqa: E402
+import bench_stages  # noqa: E402
+from synthetic import make_nodes  # noqa: E402
+
+from kubectl_node.providers import ProviderManager  # noqa: E402
+
+
+class TestSyntheticNodes(unittest.TestCase):
+    """Test the generated nodes look like real ones to the providers."""
+
+    def test_every_provider_is_detected(self):
+        """Test nodes are spread over and detected as each provider."""
+        manager = ProviderManager()
+        nodes = make_nodes(8, labels=3, images=2, taints=2)
+        self.assertEqual([manager.detect_provider(node).name for node in nodes[:4]],
+                         ["aws", "azure", "gcp", "generic"])
+        self.assertEqual(len(nodes[0]["status"]["images"]), 2)
+        self.assertEqual(len(nodes[0]["spec"]["taints"]), 2)
+        self.assertIn("example.com/label-2", nodes[0]["metadata"]["labels"])
+
+
+class TestStageBenchmark(unittest.TestCase):
+    """Test running and comparing benchmark results."""
+
+    def test_run_times_every_stage(self):
+        """Test a small run records a timing for every stage and size."""
+        results = bench_stages.run([10, 20], repeat=1)
+        self.assertEqual(sorted(results["results"]), ["10", "20"])
+        for timings in results["results"].values():
+            self.assertEqual(list(timings), bench_stages.STAGES)
+            self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_compare_flags_slowdowns_over_threshold(self):
+        """Test only slowdowns past both the threshold and the noise floor count."""
+        baseline = {"results": {"1000": {"render": 0.010, "get_node_info": 0.0001,
+                                         "json_decode": 0.050}}}
+        current = {"results": {"1000": {"render": 0.013, "get_node_info": 0.0005,
+                                        "json_decode": 0.055, "new_stage": 1.0},
+                               "50000": {"render": 1.0}}}
+
+        self.assertEqual(bench_stages.compare(baseline, current, threshold=0.2),
+                         [("1000", "render", 0.010, 0.013)])
+        self.assertEqual(bench_stages.compare(baseline, current, threshold=0.5), [])
+
+
+class TestMemoryBenchmark(unittest.TestCase):
+    """Test the node record memory benchmark."""
+
+    def test_records_hold_less(self):
+        """Test records retain less than node objects in both scenarios."""
+        results = bench_memory.run_size(50, labels=3, images=20, taints=1)
+        for scenario in ("list", "watch"):
+            self.assertLess(results[f"{scenario}_records"]["retained"],
+                            results[f"{scenario}_objects"]["retained"])
+
+
+if __name__ == '__main__':
+    unittest.main()
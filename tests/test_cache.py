@@ -0,0 +1,173 @@
+"""Tests for the on-disk node list cache."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from kubectl_node import client
+from kubectl_node.cache import NodeCache, cached_get_nodes
+from kubectl_node.exceptions import KubectlCommandError
+from kubectl_node.main import display_nodes, parse_args
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+
+def _names(node_list):
+    return [node["metadata"]["name"] for node in node_list["items"]]
+
+
+class TestNodeCache(unittest.TestCase):
+    """Test cache entries on disk."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache = NodeCache(os.path.join(self.tmp_dir, "cache"))
+
+    def test_store_and_load(self):
+        """Test entries round-trip and are keyed by context and server."""
+        self.cache.store("dev", "https://a", [make_node("node-1")], "100")
+
+        entry = self.cache.load("dev", "https://a")
+        self.assertEqual(entry["resourceVersion"], "100")
+        self.assertIsNone(self.cache.load("dev", "https://b"))
+        self.assertIsNone(self.cache.load("prod", "https://a"))
+
+    def test_store_leaves_no_temporary_files(self):
+        """Test atomic writes replace the entry and clean up after themselves."""
+        self.cache.store("dev", "https://a", [], "1")
+        self.cache.store("dev", "https://a", [], "2")
+
+        self.assertEqual(os.listdir(self.cache.directory),
+                         [os.path.basename(self.cache.path_for("dev", "https://a"))])
+        self.assertEqual(self.cache.load("dev", "https://a")["resourceVersion"], "2")
+
+    def test_corrupt_entry_is_ignored(self):
+        """Test unreadable entries are treated as missing."""
+        os.makedirs(self.cache.directory)
+        with open(self.cache.path_for("dev", "https://a"), "w") as handle:
+            handle.write('{"format": 1, "items": [')
+        self.assertIsNone(self.cache.load("dev", "https://a"))
+
+
+class TestCachedGetNodes(unittest.TestCase):
+    """Test TTL and resourceVersion revalidation against the stub API server."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache = NodeCache(self.tmp_dir)
+
+    def _get(self, server, ttl):
+        with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}):
+            return cached_get_nodes(transport="native", ttl=ttl, cache=self.cache)
+
+    def test_fresh_entry_skips_the_api_server(self):
+        """Test a second call within the TTL sends no requests."""
+        with StubAPIServer(nodes=[make_node("node-1")]) as server:
+            first = self._get(server, ttl=60)
+            second = self._get(server, ttl=60)
+            requests = len(server.requests)
+
+        self.assertEqual(requests, 1)
+        self.assertEqual(_names(first), _names(second))
+
+    def test_stale_entry_is_revalidated_by_watch(self):
+        """Test stale entries only receive what changed since their resourceVersion."""
+        added = {"type": "ADDED", "object": make_node("node-2", resource_version="101")}
+        with StubAPIServer(nodes=[make_node("node-1")], watches=[[added]]) as server:
+            self._get(server, ttl=60)
+            result = self._get(server, ttl=0)
+            lists = [q for p, q, h in server.requests if not q.get("watch")]
+            watches = server.watch_requests()
+
+        self.assertEqual(len(lists), 1)
+        self.assertEqual(watches[0]["resourceVersion"], "100")
+        self.assertEqual(_names(result), ["node-1", "node-2"])
+        self.assertEqual(result["metadata"]["resourceVersion"], "101")
+        self.assertEqual(self.cache.load("stub", server.url)["resourceVersion"], "101")
+
+    def test_expired_resource_version_refetches(self):
+        """Test a 410 Gone during revalidation falls back to a full list."""
+        with StubAPIServer(nodes=[make_node("node-1")], watches=[410]) as server:
+            self._get(server, ttl=60)
+            server.nodes.append(make_node("node-3"))
+            result = self._get(server, ttl=0)
+            lists = [q for p, q, h in server.requests if not q.get("watch")]
+
+        self.assertEqual(len(lists), 2)
+        self.assertEqual(_names(result), ["node-1", "node-3"])
+
+    def test_kubectl_transport_refetches(self):
+        """Test stale entries are listed again rather than watched through kubectl."""
+        with StubAPIServer(nodes=[make_node("node-1")]) as server:
+            self._get(server, ttl=60)
+            server.nodes.append(make_node("node-2"))
+            with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}), \
+                    patch('kubectl_node.cache.NodeWatcher.watch_once') as mock_watch, \
+                    patch('kubectl_node.watch.kubectl_get_nodes',
+                          return_value={"metadata": {"resourceVersion": "200"},
+                                        "items": server.nodes}) as mock_list:
+                result = cached_get_nodes(transport="kubectl", ttl=0, cache=self.cache)
+
+        mock_watch.assert_not_called()
+        self.assertEqual(mock_list.call_args[1]["transport"], "kubectl")
+        self.assertEqual(_names(result), ["node-1", "node-2"])
+        self.assertEqual(self.cache.load("stub", server.url)["resourceVersion"], "200")
+
+    @patch('kubectl_node.cache._run_kubectl_json')
+    @patch('kubectl_node.watch.kubectl_get_nodes', return_value={"items": []})
+    def test_kubectl_resolves_unreadable_kubeconfig(self, mock_get_nodes, mock_view):
+        """Test kubeconfigs that cannot be read natively are resolved by kubectl."""
+        mock_view.return_value = {
+            "current-context": "dev",
+            "contexts": [{"name": "dev", "context": {"cluster": "dev"}}],
+            "clusters": [{"name": "dev", "cluster": {"server": "https://dev/"}}],
+        }
+        with patch.dict(os.environ, {"KUBECONFIG": "/nonexistent/kubeconfig"}):
+            cached_get_nodes(context="dev", cache=self.cache)
+
+        self.assertEqual(mock_view.call_args[0][0], ["config", "view", "--minify", "-o", "json"])
+        self.assertEqual(mock_view.call_args[1]["context"], "dev")
+        self.assertIsNotNone(self.cache.load("dev", "https://dev"))
+
+    @patch('kubectl_node.cache._run_kubectl_json',
+           side_effect=KubectlCommandError("context dev not found"))
+    @patch('kubectl_node.cache.kubectl_get_nodes', return_value={"items": []})
+    def test_unknown_context_is_not_cached(self, mock_get_nodes, mock_view):
+        """Test contexts missing from the kubeconfig bypass the cache."""
+        with patch.dict(os.environ, {"KUBECONFIG": "/nonexistent/kubeconfig"}):
+            cached_get_nodes(context="dev", cache=self.cache)
+
+        mock_get_nodes.assert_called_once_with(context="dev", transport="kubectl",
+                                               projection=None, selector=None)
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+
+class TestCacheOption(unittest.TestCase):
+    """Test the cache is only used when asked for."""
+
+    def test_off_by_default(self):
+        """Test --cache turns the cache on and a later --no-cache off again."""
+        self.assertFalse(parse_args([]).cache)
+        self.assertTrue(parse_args(["--cache"]).cache)
+        self.assertFalse(parse_args(["--cache", "--no-cache"]).cache)
+
+    @patch('kubectl_node.cache.cached_get_nodes')
+    @patch('kubectl_node.utils.kubectl_get_nodes', return_value={"items": []})
+    def test_plain_run_asks_the_api_server(self, mock_get_nodes, mock_cached):
+        """Test a run without --cache never reads the cache."""
+        with patch('sys.stdout', new_callable=io.StringIO):
+            display_nodes(context="dev", options=parse_args(["--no-daemon"]))
+
+        mock_get_nodes.assert_called_once()
+        mock_cached.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
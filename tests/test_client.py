@@ -0,0 +1,189 @@
+"""Tests for the native kubeconfig reader and API client."""
+
+import base64
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from kubectl_node import client
+from kubectl_node.client import APIClient, get_client, list_nodes, list_node_pages
+from kubectl_node.kubeconfig import load_kubeconfig, resolve_context
+from kubectl_node.utils import kubectl_get_nodes
+from kubectl_node.exceptions import APIError, KubeconfigError
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+
+def _write_config(directory, config):
+    path = os.path.join(directory, "config")
+    with open(path, "w") as handle:
+        json.dump(config, handle)
+    return path
+
+
+class TestKubeconfig(unittest.TestCase):
+    """Test kubeconfig parsing and context resolution."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def _config(self, user):
+        return {
+            "current-context": "dev",
+            "clusters": [{"name": "c", "cluster": {
+                "server": "https://10.0.0.1:6443/",
+                "certificate-authority": "ca.crt"
+            }}],
+            "users": [{"name": "u", "user": user}],
+            "contexts": [
+                {"name": "dev", "context": {"cluster": "c", "user": "u"}},
+                {"name": "other", "context": {"cluster": "missing", "user": "u"}},
+            ],
+        }
+
+    def test_resolve_current_context_with_token(self):
+        """Test resolving the current context with a bearer token."""
+        path = _write_config(self.tmp_dir, self._config({"token": "secret"}))
+        settings = resolve_context(load_kubeconfig(path))
+
+        self.assertEqual(settings["context"], "dev")
+        self.assertEqual(settings["server"], "https://10.0.0.1:6443")
+        self.assertEqual(settings["token"], "secret")
+        # Relative file references resolve against the kubeconfig directory
+        self.assertEqual(settings["ca_file"], os.path.join(self.tmp_dir, "ca.crt"))
+
+    def test_resolve_token_file_and_cert_data(self):
+        """Test token files and base64 client certificate data."""
+        with open(os.path.join(self.tmp_dir, "token"), "w") as handle:
+            handle.write("from-file\n")
+        user = {
+            "tokenFile": "token",
+            "client-certificate-data": base64.b64encode(b"CERT").decode(),
+        }
+        path = _write_config(self.tmp_dir, self._config(user))
+        settings = resolve_context(load_kubeconfig(path))
+
+        self.assertEqual(settings["token"], "from-file")
+        self.assertEqual(settings["cert_data"], b"CERT")
+
+    def test_exec_plugin_not_supported(self):
+        """Test exec credential plugins are rejected for kubectl fallback."""
+        path = _write_config(self.tmp_dir, self._config({"exec": {"command": "aws"}}))
+        with self.assertRaises(KubeconfigError):
+            resolve_context(load_kubeconfig(path))
+
+    def test_missing_cluster(self):
+        """Test a context that references an unknown cluster."""
+        path = _write_config(self.tmp_dir, self._config({}))
+        with self.assertRaises(KubeconfigError):
+            resolve_context(load_kubeconfig(path), "other")
+
+    def test_missing_file(self):
+        """Test reading a kubeconfig that does not exist."""
+        with self.assertRaises(KubeconfigError):
+            load_kubeconfig(os.path.join(self.tmp_dir, "nope"))
+
+
+class TestAPIClient(unittest.TestCase):
+    """Test the native API client against a stub API server."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+
+    def test_list_nodes_over_https(self):
+        """Test listing nodes over TLS with CA verification and a token."""
+        if shutil.which("openssl") is None:
+            self.skipTest("openssl is required to generate a test certificate")
+
+        with StubAPIServer(nodes=[make_node("node-1")], token="t0k3n", tls=True) as server:
+            kubeconfig = server.write_kubeconfig()
+            result = list_nodes(kubeconfig=kubeconfig)
+
+        self.assertEqual([n["metadata"]["name"] for n in result["items"]], ["node-1"])
+
+    def test_connection_is_reused(self):
+        """Test requests share one keep-alive connection."""
+        with StubAPIServer(nodes=[make_node("node-1")]) as server:
+            api = get_client(kubeconfig=server.write_kubeconfig())
+            for _ in range(3):
+                api.get_json("/api/v1/nodes")
+
+            self.assertEqual(api.connections_opened, 1)
+            self.assertEqual(server.connections, 1)
+            self.assertEqual(len(server.requests), 3)
+
+    def test_client_is_cached_per_context(self):
+        """Test repeated lookups return the same pooled client."""
+        with StubAPIServer() as server:
+            kubeconfig = server.write_kubeconfig()
+            self.assertIs(get_client(kubeconfig=kubeconfig), get_client(kubeconfig=kubeconfig))
+
+    def test_list_node_pages(self):
+        """Test paging through nodes with limit and continue."""
+        nodes = [make_node(f"node-{i}") for i in range(5)]
+        with StubAPIServer(nodes=nodes) as server:
+            pages = list(list_node_pages(page_size=2, kubeconfig=server.write_kubeconfig()))
+            queries = [query for path, query, headers in server.requests]
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([q.get("continue") for q in queries], [None, "2", "4"])
+        self.assertTrue(all(q["limit"] == "2" for q in queries))
+        self.assertEqual(pages[2][0]["metadata"]["name"], "node-4")
+
+    def test_unauthorized(self):
+        """Test API errors carry the status code and server message."""
+        with StubAPIServer(token="right") as server:
+            api = APIClient(server.url, headers={"Authorization": "Bearer wrong"})
+            with self.assertRaises(APIError) as cm:
+                api.get_json("/api/v1/nodes")
+
+        self.assertEqual(cm.exception.status, 401)
+        self.assertIn("Unauthorized", str(cm.exception))
+
+    def test_connection_refused(self):
+        """Test connection failures raise APIError."""
+        with StubAPIServer() as server:
+            url = server.url
+        with self.assertRaises(APIError):
+            APIClient(url).get_json("/api/v1/nodes")
+
+
+class TestNativeTransport(unittest.TestCase):
+    """Test transport selection in kubectl_get_nodes."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+
+    def test_native_transport(self):
+        """Test the native transport bypasses kubectl."""
+        with StubAPIServer(nodes=[make_node("node-1")]) as server:
+            with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}):
+                with patch('kubectl_node.utils.subprocess.Popen') as mock_popen:
+                    result = kubectl_get_nodes(transport="native")
+
+        mock_popen.assert_not_called()
+        self.assertEqual(len(result["items"]), 1)
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_native_falls_back_to_kubectl(self, mock_popen):
+        """Test unsupported kubeconfigs fall back to the kubectl subprocess."""
+        mock_process = MagicMock()
+        mock_process.communicate.return_value = ('{"items": []}', '')
+        mock_process.returncode = 0
+        mock_popen.return_value.__enter__.return_value = mock_process
+
+        with patch.dict(os.environ, {"KUBECONFIG": "/nonexistent/kubeconfig"}):
+            result = kubectl_get_nodes(transport="native")
+
+        mock_popen.assert_called_once()
+        self.assertEqual(result, {"items": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests for column extractors and compiled extraction plans."""
+
+import unittest
+from unittest.mock import patch
+
+from kubectl_node.columns import ExtractionPlan, BASE_COLUMNS
+from kubectl_node.providers.aws import AWSProvider
+from kubectl_node.providers.base import BaseProvider
+from kubectl_node.providers.generic import GenericProvider
+from kubectl_node.providers.manager import ProviderManager
+
+
+NODE = {
+    "metadata": {
+        "name": "node-1",
+        "creationTimestamp": "2023-01-01T12:00:00Z",
+        "labels": {
+            "k8s.io/cloud-provider-aws": "true",
+            "node.kubernetes.io/instance-type": "m5.large",
+            "topology.kubernetes.io/zone": "us-west-2a"
+        }
+    },
+    "spec": {"providerID": "aws:///us-west-2a/i-0123"},
+    "status": {
+        "conditions": [{"type": "Ready", "status": "True"}],
+        "addresses": [
+            {"type": "InternalIP", "address": "10.0.0.1"},
+            {"type": "ExternalIP", "address": "203.0.113.1"}
+        ],
+        "nodeInfo": {"kubeletVersion": "v1.28.0", "osImage": "Ubuntu"}
+    }
+}
+
+
+class TestExtractionPlan(unittest.TestCase):
+    """Test compiled extraction plans."""
+
+    def test_extracts_requested_columns_in_order(self):
+        """Test a plan extracts exactly the requested headers."""
+        plan = ExtractionPlan(["AWS-ZONE", "NAME", "INTERNAL-IP", "VERSION", "INSTANCE-TYPE"])
+        row = plan.extract(NODE, AWSProvider())
+        self.assertEqual(row, ["us-west-2a", "node-1", "10.0.0.1", "v1.28.0", "m5.large"])
+
+    def test_unknown_columns_are_na(self):
+        """Test columns no extractor knows about extract as N/A."""
+        plan = ExtractionPlan(["NAME", "AWS-ZONE", "NOPE"])
+        self.assertEqual(plan.extract(NODE, GenericProvider()), ["node-1", "N/A", "N/A"])
+
+    def test_only_requested_columns_are_computed(self):
+        """Test columns that are not requested are never computed."""
+        plan = ExtractionPlan(["NAME"])
+        with patch.dict(BASE_COLUMNS, {"AGE": lambda node: self.fail("AGE computed")}):
+            self.assertEqual(plan.extract(NODE, AWSProvider()), ["node-1"])
+
+    def test_compiled_once_per_provider(self):
+        """Test the extractor tuple is compiled once per provider."""
+        plan = ExtractionPlan(["NAME", "AWS-ZONE"])
+        provider = AWSProvider()
+        with patch.object(provider, 'get_field_extractors',
+                          wraps=provider.get_field_extractors) as extractors:
+            plan.extract(NODE, provider)
+            plan.extract(NODE, provider)
+        self.assertEqual(extractors.call_count, 1)
+
+    def test_extractors_are_required(self):
+        """Test providers must implement get_field_extractors."""
+        class FieldsOnlyProvider(BaseProvider):
+            def get_provider_fields(self, node):
+                return {"X-ONE": "1"}
+
+            def get_additional_headers(self):
+                return ["X-ONE"]
+
+        with self.assertRaises(TypeError):
+            FieldsOnlyProvider("fields-only")
+
+    def test_provider_fields_from_extractors(self):
+        """Test get_provider_fields is built from the extractors."""
+        self.assertEqual(AWSProvider().get_provider_fields(NODE)["AWS-ZONE"], "us-west-2a")
+
+    def test_manager_node_info_uses_plan(self):
+        """Test get_node_info and get_node_fields agree on every column."""
+        manager = ProviderManager()
+        headers = manager.get_all_headers([NODE])
+        fields = manager.get_node_fields(NODE)
+        self.assertEqual(manager.get_node_info(NODE, headers), [fields[h] for h in headers])
+        self.assertEqual(fields["AWS-INSTANCE-ID"], "i-0123")
+        self.assertEqual(fields["EXTERNAL-IP"], "203.0.113.1")
+        self.assertEqual(fields["KERNEL-VERSION"], "N/A")
+
+
+if __name__ == '__main__':
+    unittest.main()
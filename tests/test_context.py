@@ -10,6 +10,13 @@ from kubectl_node.exceptions import KubectlCommandError
 class TestContext(unittest.TestCase):
     """Test context functionality."""
     
+    def setUp(self):
+        # Keep the in-process kubeconfig reader away from any real
+        # kubeconfig, so context lookups fall back to the mocked kubectl
+        patcher = patch.dict('os.environ', {'KUBECONFIG': '/nonexistent/kubeconfig'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
     @patch('kubectl_node.utils.subprocess.Popen')
     def test_kubectl_get_nodes_with_context(self, mock_popen):
         """Test kubectl command with specific context."""
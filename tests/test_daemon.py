@@ -0,0 +1,165 @@
+"""Tests for the node cache daemon and its Unix socket protocol."""
+
+import io
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from kubectl_node import client
+from kubectl_node.daemon import NodeDaemon, daemon_get_nodes, query_daemon
+from kubectl_node.exceptions import APIError, DaemonError
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.projection import Projection
+from kubectl_node.selector import NodeSelector
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+
+class TestDaemon(unittest.TestCase):
+    """Test the daemon against a stub API server."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.socket_path = os.path.join(self.tmp_dir, "daemon.sock")
+
+        self.server = StubAPIServer(nodes=[make_node("node-1"), make_node("node-2")]).start()
+        self.addCleanup(self.server.stop)
+        env = patch.dict(os.environ, {"KUBECONFIG": self.server.write_kubeconfig()})
+        env.start()
+        self.addCleanup(env.stop)
+        # Keep the stub's empty watch from being reopened during a test
+        min_watch = patch('kubectl_node.watch.MIN_WATCH_SECONDS', 60)
+        min_watch.start()
+        self.addCleanup(min_watch.stop)
+
+        self.daemon = NodeDaemon(self.socket_path, transport="native").start()
+        self.addCleanup(self.daemon.shutdown)
+
+    def upstream_requests(self):
+        paths = [(path, query) for path, query, headers in self.server.requests]
+        lists = [query for path, query in paths if path == "/api/v1/nodes" and not query.get("watch")]
+        return len(lists), len(self.server.watch_requests())
+
+    def wait_for_watch(self, timeout=2.0):
+        # The watch opens in the background right after the initial list
+        deadline = time.monotonic() + timeout
+        while not self.server.watch_requests() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_many_clients_share_one_watch(self):
+        """Test N concurrent and repeated clients cause a single list and watch."""
+        results = []
+
+        def query():
+            results.append(daemon_get_nodes("stub", self.socket_path))
+
+        threads = [threading.Thread(target=query) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for _ in range(5):
+            query()
+
+        self.assertEqual(len(results), 13)
+        self.wait_for_watch()
+        for result in results:
+            self.assertEqual([node["metadata"]["name"] for node in result["items"]],
+                             ["node-1", "node-2"])
+        self.assertEqual(self.upstream_requests(), (1, 1))
+
+        stats = query_daemon({"op": "stats"}, self.socket_path)["contexts"]["stub"]
+        self.assertEqual(stats["hits"] + stats["misses"], 13)
+        self.assertGreaterEqual(stats["hits"], 5)
+        self.assertEqual(stats["nodes"], 2)
+        self.assertIsNotNone(stats["age"])
+
+    def test_projected_query(self):
+        """Test the daemon only sends the fields a projection asks for."""
+        result = daemon_get_nodes("stub", self.socket_path,
+                                  projection=Projection(["metadata.labels"]))
+        node = result["items"][0]
+        self.assertEqual(node["status"], {})
+        self.assertEqual(set(node["metadata"]), {"name", "uid", "resourceVersion", "labels"})
+
+    def test_selected_query(self):
+        """Test each selection is cached apart, behind its own filtered watch."""
+        result = daemon_get_nodes("stub", self.socket_path,
+                                  selector=NodeSelector(fields="metadata.name=node-2"))
+        self.assertEqual([node["metadata"]["name"] for node in result["items"]], ["node-2"])
+        self.assertEqual(len(daemon_get_nodes("stub", self.socket_path)["items"]), 2)
+
+        contexts = query_daemon({"op": "stats"}, self.socket_path)["contexts"]
+        self.assertEqual(sorted(contexts), ["stub", "stub [metadata.name=node-2]"])
+        # The watches open right after each initial list, so only lists are counted
+        self.assertEqual(self.upstream_requests()[0], 2)
+
+    def test_display_renders_from_daemon(self):
+        """Test a normal invocation finds the socket and skips listing the cluster."""
+        daemon_get_nodes("stub", self.socket_path)
+        argv = ["--daemon-socket", self.socket_path, "--transport", "native", "--no-cache"]
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            display_nodes(options=parse_args(argv))
+
+        self.assertIn("node-2", stdout.getvalue())
+        self.assertEqual(self.upstream_requests()[0], 1)
+
+    def test_failed_watch_is_not_served(self):
+        """Test clients list the cluster themselves while the watch is failing."""
+        daemon_get_nodes("stub", self.socket_path)
+        watcher = self.daemon.caches["stub"].watcher
+        # Stop the watcher so a finishing sync cannot clear the error
+        watcher.stop()
+        watcher._thread.join(5)
+        watcher.error = APIError("connection refused")
+
+        response = query_daemon({"op": "nodes", "context": "stub",
+                                 "kubeconfig": os.environ["KUBECONFIG"]}, self.socket_path)
+        self.assertFalse(response["ok"])
+        self.assertIn("connection refused", response["error"])
+        self.assertIsNone(daemon_get_nodes("stub", self.socket_path))
+
+    def test_other_kubeconfig_is_not_served(self):
+        """Test clients using another kubeconfig fall back to listing themselves."""
+        with patch.dict(os.environ, {"KUBECONFIG": "/elsewhere/config"}):
+            self.assertIsNone(daemon_get_nodes("stub", self.socket_path))
+
+    def test_second_daemon_refuses_to_start(self):
+        """Test a live socket is not taken over by another daemon."""
+        with self.assertRaises(DaemonError):
+            NodeDaemon(self.socket_path).bind()
+
+
+class TestDaemonClient(unittest.TestCase):
+    """Test the client side without a daemon."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+    def test_no_daemon(self):
+        """Test a missing or dead socket means no daemon."""
+        path = os.path.join(self.tmp_dir, "daemon.sock")
+        self.assertIsNone(daemon_get_nodes("stub", path))
+
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        self.assertIsNone(query_daemon({"op": "stats"}, path))
+
+        # A daemon replaces the stale socket
+        daemon = NodeDaemon(path).start()
+        self.addCleanup(daemon.shutdown)
+        self.assertEqual(query_daemon({"op": "stats"}, path)["contexts"], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
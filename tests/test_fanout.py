@@ -0,0 +1,209 @@
+"""Tests for concurrent multi-context node listing."""
+
+import io
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from kubectl_node.exceptions import KubectlCommandError, KubectlTimeoutError
+from kubectl_node.fanout import fetch_contexts, merge_results, context_errors
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.selector import NodeSelector
+
+
+def _node(name, labels=None):
+    return {
+        "metadata": {
+            "name": name,
+            "creationTimestamp": "2023-01-01T12:00:00Z",
+            "labels": labels or {}
+        },
+        "spec": {},
+        "status": {
+            "conditions": [{"type": "Ready", "status": "True"}],
+            "addresses": [{"type": "InternalIP", "address": "10.0.0.1"}],
+            "nodeInfo": {"kubeletVersion": "v1.28.0"}
+        }
+    }
+
+
+CLUSTERS = {
+    "aws": {"items": [_node("aws-1", {"k8s.io/cloud-provider-aws": "true",
+                                      "topology.kubernetes.io/zone": "us-west-2a"})]},
+    "plain": {"items": [_node("plain-1"), _node("plain-2")]},
+}
+
+
+def fake_get_nodes(context=None, transport="kubectl", timeout=None, projection=None,
+                   selector=None):
+    if context == "slow":
+        raise KubectlTimeoutError(f"kubectl timed out after {timeout} seconds")
+    if context == "broken":
+        raise KubectlCommandError("kubectl command failed", stderr="Unable to connect")
+    return CLUSTERS[context]
+
+
+@patch('kubectl_node.fanout.kubectl_get_nodes', side_effect=fake_get_nodes)
+class TestFanout(unittest.TestCase):
+    """Test fetching and merging several contexts."""
+
+    def test_results_keep_input_order(self, mock_get_nodes):
+        """Test results come back in the order the contexts were given."""
+        results = fetch_contexts(["plain", "broken", "aws"], timeout=5)
+
+        self.assertEqual([r.context for r in results], ["plain", "broken", "aws"])
+        self.assertEqual(set(context_errors(results)), {"broken"})
+        for call in mock_get_nodes.call_args_list:
+            self.assertTrue(0 < call.kwargs["timeout"] <= 5)
+
+    def test_merged_table(self, mock_get_nodes):
+        """Test merged tables have a CONTEXT column and the union of columns."""
+        headers, rows = merge_results(fetch_contexts(["plain", "aws", "slow", "broken"]))
+
+        self.assertEqual(headers[:3], ["CONTEXT", "NAME", "STATUS"])
+        self.assertIn("AWS-ZONE", headers)
+        zone = headers.index("AWS-ZONE")
+        by_name = {(row[0], row[1]): row for row in rows}
+        self.assertEqual(by_name[("aws", "aws-1")][zone], "us-west-2a")
+        self.assertEqual(by_name[("plain", "plain-1")][zone], "N/A")
+        self.assertEqual(by_name[("slow", "<unavailable>")][2], "Timeout")
+        self.assertEqual(by_name[("broken", "<unavailable>")][2], "Error")
+        self.assertEqual([row[0] for row in rows], ["plain", "plain", "aws", "slow", "broken"])
+
+    def test_worker_pool_is_bounded(self, mock_get_nodes):
+        """Test no more than max_workers contexts are fetched at once."""
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def tracked(context=None, transport="kubectl", timeout=None, projection=None):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return {"items": []}
+
+        mock_get_nodes.side_effect = tracked
+        results = fetch_contexts([f"ctx-{i}" for i in range(6)], max_workers=2)
+
+        self.assertEqual(len(results), 6)
+        self.assertLessEqual(active[1], 2)
+
+    def test_display_reports_failures_inline(self, mock_get_nodes):
+        """Test failed contexts are shown in the table and exit non-zero."""
+        options = parse_args(['--contexts', 'plain,broken'])
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout, \
+             patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            with self.assertRaises(SystemExit) as cm:
+                display_nodes(options=options)
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("plain-2", stdout.getvalue())
+        self.assertIn("<unavailable>", stdout.getvalue())
+        self.assertIn("Error in context 'broken'", stderr.getvalue())
+        self.assertIn("Unable to connect", stderr.getvalue())
+
+    def test_display_records(self, mock_get_nodes):
+        """Test record output of several contexts carries a CONTEXT field."""
+        options = parse_args(['--contexts', 'plain,aws', '-o', 'csv'])
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            display_nodes(options=options)
+
+        lines = stdout.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("CONTEXT,NAME,"))
+        self.assertEqual([line.split(",")[:2] for line in lines[1:]],
+                         [["plain", "plain-1"], ["plain", "plain-2"], ["aws", "aws-1"]])
+
+    def test_requests_per_context(self, mock_get_nodes):
+        """Test pods are counted in each context for the request columns."""
+        def pods(resource, projection, args, context=None, timeout=None):
+            if context == "aws":
+                raise KubectlCommandError("pods is forbidden")
+            yield {"spec": {"nodeName": "plain-1", "containers": []},
+                   "status": {"phase": "Running"}}
+
+        with patch('kubectl_node.pods.kubectl_stream_projected', side_effect=pods):
+            results = fetch_contexts(["plain", "aws"], base_fields=["NAME", "PODS"], requests=True)
+        headers, rows = merge_results(results, ["NAME", "PODS"])
+
+        self.assertEqual(headers[:3], ["CONTEXT", "NAME", "PODS"])
+        self.assertEqual([row[:3] for row in rows],
+                         [["plain", "plain-1", "1"], ["plain", "plain-2", "0"],
+                          ["aws", "aws-1", "N/A"]])
+
+    def test_deadline_covers_selector_and_sources(self, mock_get_nodes):
+        """Test the selector probe and the sources share the context's deadline."""
+        timeouts = {}
+
+        def api_get(path, params, context=None, transport="kubectl", timeout=None):
+            timeouts[path] = timeout
+            return CLUSTERS["aws"]
+
+        def pods(resource, projection, args, context=None, timeout=None):
+            timeouts["/api/v1/pods"] = timeout
+            return iter([])
+
+        with patch('kubectl_node.selector.api_get', side_effect=api_get), \
+             patch('kubectl_node.pods.kubectl_stream_projected', side_effect=pods):
+            fetch_contexts(["aws"], timeout=5, requests=True,
+                           selector=NodeSelector(nodepool="batch"))
+
+        self.assertTrue(0 < timeouts["/api/v1/nodes"] <= 5)
+        self.assertTrue(0 < timeouts["/api/v1/pods"] <= 5)
+
+    def test_overrunning_context_is_not_waited_for(self, mock_get_nodes):
+        """Test a context ignoring its timeout is reported as timed out."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def hang(context=None, timeout=None, **kwargs):
+            if context == "hung":
+                release.wait(10)
+            return CLUSTERS["plain"]
+
+        mock_get_nodes.side_effect = hang
+        started = time.monotonic()
+        with patch('kubectl_node.fanout.DEADLINE_GRACE_SECONDS', 0):
+            results = fetch_contexts(["plain", "hung"], timeout=0.2)
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertIsNone(results[0].error)
+        self.assertTrue(results[1].timed_out)
+
+    def test_hung_context_does_not_block_exit(self, mock_get_nodes):
+        """Test the process exits once the deadline passed, with a fetch still hanging."""
+        script = "\n".join([
+            "import threading",
+            "from unittest.mock import patch",
+            "from kubectl_node.fanout import fetch_contexts",
+            "with patch('kubectl_node.fanout.kubectl_get_nodes',",
+            "           side_effect=lambda **kwargs: threading.Event().wait()), \\",
+            "     patch('kubectl_node.fanout.DEADLINE_GRACE_SECONDS', 0):",
+            "    print(fetch_contexts(['hung'], timeout=0.2)[0].timed_out)",
+        ])
+        process = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                                 text=True, timeout=20)
+
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertEqual(process.stdout.strip(), "True")
+
+    def test_display_reports_source_warnings(self, mock_get_nodes):
+        """Test columns a context could not fill are reported next to its errors."""
+        options = parse_args(['--contexts', 'plain,aws', '--requests'])
+        with patch('kubectl_node.pods.kubectl_stream_projected',
+                   side_effect=KubectlCommandError("pods is forbidden")), \
+             patch('sys.stdout', new_callable=io.StringIO), \
+             patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            display_nodes(options=options)
+
+        self.assertIn("Warning in context 'plain': Pod requests unavailable: pods is forbidden",
+                      stderr.getvalue())
+        self.assertIn("Warning in context 'aws'", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
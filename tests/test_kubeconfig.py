@@ -0,0 +1,116 @@
+"""Tests for merged kubeconfig loading and in-process context lookups."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from kubectl_node import kubeconfig
+from kubectl_node.exceptions import KubeconfigError
+from kubectl_node.kubeconfig import load_kubeconfig, resolve_context, context_names
+from kubectl_node.utils import get_current_context, list_contexts
+
+
+def _context(name, cluster):
+    return {"name": name, "context": {"cluster": cluster, "user": "u"}}
+
+
+class TestMergedKubeconfig(unittest.TestCase):
+    """Test KUBECONFIG with several files."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        kubeconfig._CACHE.clear()
+        self.addCleanup(kubeconfig._CACHE.clear)
+
+        self.first = self._write("first/config", {
+            "current-context": "dev",
+            "clusters": [{"name": "c", "cluster": {"server": "https://first",
+                                                   "certificate-authority": "ca.crt"}}],
+            "users": [{"name": "u", "user": {"token": "first"}}],
+            "contexts": [_context("dev", "c")],
+        })
+        self.second = self._write("second/config", {
+            "current-context": "prod",
+            "clusters": [
+                {"name": "c", "cluster": {"server": "https://second"}},
+                {"name": "p", "cluster": {"server": "https://prod",
+                                          "certificate-authority": "ca.crt"}},
+            ],
+            "contexts": [_context("prod", "p"), _context("dev", "p")],
+        })
+        missing = os.path.join(self.tmp_dir, "missing")
+        self.env = {"KUBECONFIG": os.pathsep.join([self.first, missing, self.second])}
+
+    def _write(self, name, config):
+        path = os.path.join(self.tmp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as handle:
+            json.dump(config, handle)
+        return path
+
+    def test_first_definition_wins(self):
+        """Test merging follows kubectl: the first file to define something wins."""
+        with patch.dict(os.environ, self.env):
+            config = load_kubeconfig()
+
+        self.assertEqual(config["current-context"], "dev")
+        self.assertEqual(resolve_context(config)["server"], "https://first")
+        self.assertEqual(resolve_context(config, "prod")["server"], "https://prod")
+        self.assertEqual(context_names(config), ["dev", "prod"])
+
+    def test_relative_paths_follow_their_file(self):
+        """Test file references resolve against the file that defined them."""
+        with patch.dict(os.environ, self.env):
+            config = load_kubeconfig()
+
+        self.assertEqual(resolve_context(config)["ca_file"],
+                         os.path.join(os.path.dirname(self.first), "ca.crt"))
+        self.assertEqual(resolve_context(config, "prod")["ca_file"],
+                         os.path.join(os.path.dirname(self.second), "ca.crt"))
+
+    def test_parsed_once_until_a_file_changes(self):
+        """Test the parsed result is cached by file mtime."""
+        with patch.dict(os.environ, self.env):
+            with patch.object(kubeconfig, '_read_kubeconfig',
+                              wraps=kubeconfig._read_kubeconfig) as read:
+                config = load_kubeconfig()
+                self.assertIs(load_kubeconfig(), config)
+                self.assertEqual(read.call_count, 2)
+
+                stat = os.stat(self.second)
+                os.utime(self.second, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+                self.assertIsNot(load_kubeconfig(), config)
+                self.assertEqual(read.call_count, 4)
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_context_lookups_do_not_fork(self, mock_popen):
+        """Test current and listed contexts come from the file, not kubectl."""
+        with patch.dict(os.environ, self.env):
+            self.assertEqual(get_current_context(), "dev")
+            self.assertEqual(list_contexts(), ["dev", "prod"])
+        mock_popen.assert_not_called()
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_unset_current_context(self, mock_popen):
+        """Test a kubeconfig without current-context reports unknown."""
+        path = self._write("empty/config", {"contexts": [_context("a", "c")]})
+        with patch.dict(os.environ, {"KUBECONFIG": path}):
+            self.assertEqual(get_current_context(), "unknown")
+        mock_popen.assert_not_called()
+
+    def test_yaml_without_pyyaml_names_it(self):
+        """Test a YAML kubeconfig that cannot be parsed says PyYAML is missing."""
+        path = os.path.join(self.tmp_dir, "config.yaml")
+        with open(path, "w") as handle:
+            handle.write("current-context: dev\n")
+        with patch('kubectl_node.kubeconfig._yaml', return_value=None):
+            with self.assertRaisesRegex(KubeconfigError, "without PyYAML"):
+                load_kubeconfig(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
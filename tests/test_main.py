@@ -63,6 +63,45 @@ class TestMain(unittest.TestCase):
             self.assertEqual(args.context, 'prod')
             self.assertEqual(args.watch_interval, 10)
     
+    def test_parse_args_transport(self):
+        """Test transport argument parsing."""
+        with patch('sys.argv', ['kubectl-node', '--transport', 'native']):
+            args = parse_args()
+            self.assertEqual(args.transport, 'native')
+        
+        with patch.dict('os.environ', {}, clear=True):
+            self.assertEqual(parse_args([]).transport, 'kubectl')
+    
+    def test_parse_args_page_size(self):
+        """Test page size argument parsing."""
+        self.assertEqual(parse_args([]).page_size, 0)
+        self.assertEqual(parse_args(['--page-size', '500']).page_size, 500)
+    
+    def test_parse_args_contexts(self):
+        """Test multi-context argument parsing and validation."""
+        args = parse_args(['--contexts', 'a,b', '--max-workers', '2', '--context-timeout', '5'])
+        self.assertEqual(args.contexts, 'a,b')
+        self.assertEqual(args.max_workers, 2)
+        self.assertEqual(args.context_timeout, 5)
+        self.assertTrue(parse_args(['--all-contexts']).all_contexts)
+        
+        for argv in (['--contexts', 'a', '--context', 'b'],
+                     ['--contexts', 'a', '--all-contexts'],
+                     ['--all-contexts', '-w']):
+            with patch('sys.stderr'):
+                with self.assertRaises(SystemExit) as cm:
+                    parse_args(argv)
+            self.assertEqual(cm.exception.code, 2)
+    
+    def test_parse_args_table_format(self):
+        """Test table formats are checked against tabulate's."""
+        self.assertEqual(parse_args([]).table_format, 'plain')
+        self.assertEqual(parse_args(['--table-format', 'github']).table_format, 'github')
+        with patch('sys.stderr'):
+            with self.assertRaises(SystemExit) as cm:
+                parse_args(['--table-format', 'nonsense'])
+        self.assertEqual(cm.exception.code, 2)
+    
     def test_parse_args_version(self):
         """Test version argument parsing."""
         with patch('sys.argv', ['kubectl-node', '--version']):
@@ -85,11 +124,15 @@ class TestMain(unittest.TestCase):
         mock_args.watch = False
         mock_args.context = None
         mock_args.list_contexts = False
+        mock_args.timings = False
+        mock_args.daemon = False
+        mock_args.daemon_status = False
+        mock_args.trace = None
         mock_parse_args.return_value = mock_args
         
         main()
         
-        mock_display_nodes.assert_called_once_with(context=None)
+        mock_display_nodes.assert_called_once_with(context=None, options=mock_args)
     
     @patch('kubectl_node.main.display_nodes')
     @patch('kubectl_node.main.parse_args')
@@ -99,11 +142,15 @@ class TestMain(unittest.TestCase):
         mock_args.watch = False
         mock_args.context = 'test-context'
         mock_args.list_contexts = False
+        mock_args.timings = False
+        mock_args.daemon = False
+        mock_args.daemon_status = False
+        mock_args.trace = None
         mock_parse_args.return_value = mock_args
         
         main()
         
-        mock_display_nodes.assert_called_once_with(context='test-context')
+        mock_display_nodes.assert_called_once_with(context='test-context', options=mock_args)
     
     @patch('kubectl_node.main.watch_nodes')
     @patch('kubectl_node.main.parse_args')
@@ -114,11 +161,15 @@ class TestMain(unittest.TestCase):
         mock_args.watch_interval = 3
         mock_args.context = 'prod'
         mock_args.list_contexts = False
+        mock_args.timings = False
+        mock_args.daemon = False
+        mock_args.daemon_status = False
+        mock_args.trace = None
         mock_parse_args.return_value = mock_args
         
         main()
         
-        mock_watch_nodes.assert_called_once_with(context='prod', interval=3)
+        mock_watch_nodes.assert_called_once_with(context='prod', interval=3, options=mock_args)
     
     @patch('kubectl_node.main.list_available_contexts')
     @patch('kubectl_node.main.parse_args')
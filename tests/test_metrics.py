@@ -0,0 +1,117 @@
+"""Tests for the CPU% and MEM% columns from the metrics API."""
+
+import io
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from kubectl_node import client
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.metrics import NODE_METRICS_PATH, NodeMetrics, parse_node_metrics
+from kubectl_node.record import NodeRecord
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+
+def _node(name):
+    node = make_node(name)
+    node["status"]["allocatable"] = {"cpu": "4", "memory": "16Gi", "pods": "110"}
+    return node
+
+
+def _metrics(*usages):
+    return {"kind": "NodeMetricsList", "apiVersion": "metrics.k8s.io/v1beta1", "items": [
+        {"metadata": {"name": name}, "usage": {"cpu": cpu, "memory": memory}}
+        for name, cpu, memory in usages
+    ]}
+
+
+def _delayed(route, seconds):
+    def delayed(query):
+        time.sleep(seconds)
+        return route(query)
+    return delayed
+
+
+class TestNodeMetrics(unittest.TestCase):
+    """Test parsing node metrics and the usage columns."""
+
+    def test_parse_node_metrics(self):
+        """Test usage is keyed by node name; malformed entries are skipped."""
+        metrics = _metrics(("node-1", "1500000000n", "4194304Ki"), ("node-2", "bad", "1Gi"))
+        self.assertEqual(parse_node_metrics(metrics), {"node-1": (1500, 4 * 2 ** 30)})
+
+    def test_late_result_is_discarded(self):
+        """Test a fetch that missed its deadline does not fill the columns later."""
+        metrics = NodeMetrics(deadline=0.05)
+
+        def slow_fetch(context, transport, timeout):
+            time.sleep(0.2)
+            return {"node-1": (1000, 2 ** 30)}
+
+        with patch.object(metrics, "fetch", side_effect=slow_fetch):
+            metrics.start()
+            self.assertFalse(metrics.wait())
+            time.sleep(0.3)
+
+        self.assertEqual(metrics.usage, {})
+        self.assertIn("no response within", str(metrics.error))
+        self.assertEqual(metrics.columns()["CPU%"](NodeRecord.from_node(_node("node-1"))), "N/A")
+
+
+class TestMetricsOption(unittest.TestCase):
+    """Test --metrics against a stub API server."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+
+    def run_display(self, server, *argv):
+        argv = ["--metrics", "--transport", "native", "--no-cache"] + list(argv)
+        with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}), \
+             patch('sys.stdout', new_callable=io.StringIO) as stdout, \
+             patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            started = time.monotonic()
+            display_nodes(options=parse_args(argv))
+            elapsed = time.monotonic() - started
+        return stdout.getvalue().splitlines(), stderr.getvalue(), elapsed
+
+    def test_fetched_concurrently_with_nodes(self):
+        """Test the metrics add no time beyond the slower of the two calls."""
+        with StubAPIServer(nodes=[_node("node-1"), _node("node-2")]) as server:
+            server.routes["/api/v1/nodes"] = _delayed(server.list_nodes, 0.4)
+            server.routes[NODE_METRICS_PATH] = _delayed(
+                lambda query: (200, _metrics(("node-1", "1", "4Gi"))), 0.4)
+            lines, errors, elapsed = self.run_display(server)
+
+        self.assertLess(elapsed, 0.75)
+        self.assertEqual(lines[2].split()[-2:], ["CPU%", "MEM%"])
+        self.assertEqual(lines[3].split()[-2:], ["25%", "25%"])
+        # Nodes missing from the metrics list degrade on their own
+        self.assertEqual(lines[4].split()[-2:], ["N/A", "N/A"])
+        self.assertEqual(errors, "")
+
+    def test_slow_metrics_degrade_after_deadline(self):
+        """Test slow metrics give N/A cells instead of blocking the table."""
+        with StubAPIServer(nodes=[_node("node-1")]) as server:
+            server.routes[NODE_METRICS_PATH] = _delayed(
+                lambda query: (200, _metrics(("node-1", "1", "4Gi"))), 2)
+            lines, errors, elapsed = self.run_display(server, "--metrics-timeout", "0.2")
+
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(lines[3].split()[-2:], ["N/A", "N/A"])
+        self.assertIn("Node metrics unavailable", errors)
+
+    def test_missing_metrics_server(self):
+        """Test a cluster without metrics-server still lists its nodes."""
+        with StubAPIServer(nodes=[_node("node-1")]) as server:
+            lines, errors, elapsed = self.run_display(server)
+
+        self.assertIn("node-1", lines[3])
+        self.assertEqual(lines[3].split()[-2:], ["N/A", "N/A"])
+        self.assertIn("Node metrics unavailable", errors)
+
+
+if __name__ == '__main__':
+    unittest.main()
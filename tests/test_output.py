@@ -0,0 +1,159 @@
+"""Tests for machine-readable output formats."""
+
+import csv
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from kubectl_node.config import DEFAULT_FIELDS, WIDE_FIELDS
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.output import write_keyed_records, write_records
+from kubectl_node.providers import ProviderManager
+
+from tests.stub_apiserver import make_node
+
+AWS_LABELS = {"k8s.io/cloud-provider-aws": "true", "topology.kubernetes.io/zone": "us-west-2a"}
+
+HEADERS = ["NAME", "STATUS", "ROLES"]
+ROWS = [["node-1", "Ready", "<none>"], ["node,2", "Ready", "tab\there"]]
+
+
+def _render(output, headers=HEADERS, rows=ROWS):
+    stream = io.StringIO()
+    count = write_records(headers, iter(rows), output, stream=stream)
+    return stream.getvalue(), count
+
+
+class TestWriters(unittest.TestCase):
+    """Test each record format."""
+
+    def test_json(self):
+        """Test JSON output is one array of objects keyed by the headers."""
+        text, count = _render("json")
+        self.assertEqual(count, 2)
+        self.assertEqual(json.loads(text), [dict(zip(HEADERS, row)) for row in ROWS])
+        self.assertEqual(_render("json", rows=[])[0], "[]\n")
+
+    def test_ndjson(self):
+        """Test NDJSON output is one object per line."""
+        text, _ = _render("ndjson")
+        self.assertEqual([json.loads(line) for line in text.splitlines()],
+                         [dict(zip(HEADERS, row)) for row in ROWS])
+
+    def test_csv_and_tsv(self):
+        """Test delimited output has a header line and quotes where needed."""
+        for output, delimiter in (("csv", ","), ("tsv", "\t")):
+            text, _ = _render(output)
+            self.assertEqual(list(csv.reader(io.StringIO(text), delimiter=delimiter)),
+                             [HEADERS] + ROWS)
+        self.assertEqual(_render("tsv")[0].splitlines()[1], "node-1\tReady\t<none>")
+
+    def test_keyed_records(self):
+        """Test JSON records may each have their own keys."""
+        records = [{"NAME": "node-1"}, {"NAME": "node-2", "AWS-ZONE": "us-west-2a"}]
+        for output in ("json", "ndjson"):
+            stream = io.StringIO()
+            self.assertEqual(write_keyed_records(iter(records), output, stream=stream), 2)
+            text = stream.getvalue()
+            parsed = json.loads(text) if output == "json" else [
+                json.loads(line) for line in text.splitlines()]
+            self.assertEqual(parsed, records)
+
+    def test_records_are_written_as_rows_arrive(self):
+        """Test each record reaches the stream before the next row is extracted."""
+        stream = io.StringIO()
+        seen = []
+
+        def rows():
+            for row in ROWS:
+                seen.append(stream.getvalue().count("\n"))
+                yield row
+
+        write_records(HEADERS, rows(), "ndjson", stream=stream)
+        self.assertEqual(seen, [0, 1])
+
+
+class TestStreamRows(unittest.TestCase):
+    """Test extracting rows lazily."""
+
+    def test_headers_up_front_rows_on_demand(self):
+        """Test headers come from the first page and rows are extracted lazily."""
+        manager = ProviderManager()
+        nodes = [make_node("aws-1", AWS_LABELS), make_node("plain-1")]
+        headers, rows = manager.stream_rows(iter([nodes]))
+
+        self.assertEqual(headers, manager.get_all_headers(nodes))
+        with patch.object(manager, 'classify', wraps=manager.classify) as classify:
+            first = next(rows)
+            self.assertEqual(classify.call_count, 1)
+        self.assertEqual([first] + list(rows), manager.collect_rows([nodes])[1])
+
+    def test_records_keep_later_page_columns(self):
+        """Test provider columns of nodes on later pages are kept in records."""
+        manager = ProviderManager()
+        pages = [[make_node("plain-1")], [make_node("aws-1", AWS_LABELS)]]
+        records = list(manager.stream_records(iter(pages)))
+
+        self.assertEqual(list(records[0]), DEFAULT_FIELDS)
+        self.assertEqual(records[1]["NAME"], "aws-1")
+        self.assertEqual(records[1]["AWS-ZONE"], "us-west-2a")
+
+    def test_no_nodes(self):
+        """Test an empty list still has the default headers."""
+        headers, rows = ProviderManager().stream_rows([])
+        self.assertEqual(headers, DEFAULT_FIELDS)
+        self.assertEqual(list(rows), [])
+
+    def test_wide_columns(self):
+        """Test wide output adds the provider, zone and provider ID columns."""
+        manager = ProviderManager(base_fields=DEFAULT_FIELDS + WIDE_FIELDS)
+        node = make_node("aws-1", AWS_LABELS)
+        node["spec"]["providerID"] = "aws:///us-west-2a/i-0123"
+        fields = manager.get_node_fields(node)
+
+        self.assertEqual(fields["PROVIDER"], "aws")
+        self.assertEqual(fields["ZONE"], "us-west-2a")
+        self.assertEqual(fields["PROVIDER-ID"], "aws:///us-west-2a/i-0123")
+        self.assertIn("spec.providerID", manager.projection().paths)
+
+
+class TestDisplayOutput(unittest.TestCase):
+    """Test the -o option end to end."""
+
+    @patch('kubectl_node.utils.kubectl_get_nodes')
+    def test_display_ndjson(self, mock_get_nodes):
+        """Test -o ndjson prints only records, without the context header."""
+        mock_get_nodes.return_value = {"items": [make_node("node-1"), make_node("node-2")]}
+        options = parse_args(['-o', 'ndjson', '--no-cache'])
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            display_nodes(options=options)
+
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r["NAME"] for r in records], ["node-1", "node-2"])
+        self.assertEqual(list(records[0]), DEFAULT_FIELDS)
+
+    @patch('kubectl_node.utils.kubectl_get_node_pages')
+    def test_display_paged_json(self, mock_get_pages):
+        """Test paged -o json keeps provider columns first seen on a later page."""
+        mock_get_pages.return_value = iter([[make_node("plain-1")],
+                                            [make_node("aws-1", AWS_LABELS)]])
+        options = parse_args(['-o', 'json', '--page-size', '1', '--no-cache', '--no-daemon'])
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            display_nodes(options=options)
+
+        records = json.loads(stdout.getvalue())
+        self.assertNotIn("AWS-ZONE", records[0])
+        self.assertEqual(records[1]["AWS-ZONE"], "us-west-2a")
+
+    def test_watch_needs_a_table(self):
+        """Test record formats cannot be combined with watch mode."""
+        self.assertEqual(parse_args(['-w', '-o', 'wide']).output, 'wide')
+        with patch('sys.stderr'):
+            with self.assertRaises(SystemExit) as cm:
+                parse_args(['-w', '-o', 'json'])
+        self.assertEqual(cm.exception.code, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
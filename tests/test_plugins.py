@@ -0,0 +1,162 @@
+"""Tests for provider plugins discovered through entry points."""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import textwrap
+import unittest
+from unittest.mock import patch
+
+from kubectl_node.exceptions import ProviderDetectionError
+from kubectl_node.providers import manager as provider_manager
+from kubectl_node.providers import DetectionRules, ProviderManager, ProviderSpec
+
+from tests.test_startup import run_python
+
+SPECS_MODULE = '''
+from kubectl_node.providers import DetectionRules, ProviderSpec
+
+VSPHERE = ProviderSpec(
+    "vsphere", "acme_vsphere", "VSphereProvider",
+    fields=("spec.providerID",),
+    detection=DetectionRules(provider_ids=["vsphere://"]),
+    headers=["VSPHERE-UUID"],
+)
+'''
+
+PROVIDER_MODULE = '''
+from kubectl_node.providers.base import BaseProvider
+
+
+class VSphereProvider(BaseProvider):
+    def __init__(self):
+        super().__init__("vsphere")
+
+    def get_field_extractors(self):
+        return {"VSPHERE-UUID": self.get_provider_id}
+
+    def get_additional_headers(self):
+        return ["VSPHERE-UUID"]
+'''
+
+ENTRY_POINTS = '''
+[kubectl_node.providers]
+vsphere = acme_specs:VSPHERE
+'''
+
+
+class FakeEntryPoint:
+    """An entry point loading a given object."""
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+class TestPluginDiscovery(unittest.TestCase):
+    """Test provider specs registered by installed packages."""
+
+    def setUp(self):
+        provider_manager.plugin_specs.cache_clear()
+        self.addCleanup(provider_manager.plugin_specs.cache_clear)
+
+    def discover(self, *entry_points):
+        with patch.object(provider_manager, "_entry_points", return_value=list(entry_points)):
+            return provider_manager.default_specs()
+
+    def test_plugins_follow_builtin_providers(self):
+        """Test plugins come after the built-in providers, by name."""
+        vsphere = ProviderSpec("vsphere", "acme.vsphere", "VSphereProvider",
+                               detection=DetectionRules(provider_ids=["vsphere://"]))
+        equinix = ProviderSpec("equinix", "acme.equinix", "EquinixProvider",
+                               detection=DetectionRules(provider_ids=["equinixmetal://"]))
+        aws = ProviderSpec("aws", "acme.aws", "AWSProvider")
+        specs = self.discover(FakeEntryPoint("vsphere", vsphere),
+                              FakeEntryPoint("aws", aws), FakeEntryPoint("equinix", equinix))
+        self.assertEqual([spec.name for spec in specs][-2:], ["equinix", "vsphere"])
+        self.assertEqual(len(specs), len(provider_manager.PROVIDER_SPECS) + 2)
+        self.assertIsNot(specs[0], aws)
+
+    def test_broken_plugins(self):
+        """Test plugins that fail to load or are not specs are skipped with a warning."""
+        vsphere = ProviderSpec("vsphere", "acme.vsphere", "VSphereProvider")
+        for value in (ImportError("No module named 'acme'"), object()):
+            provider_manager.plugin_specs.cache_clear()
+            with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                specs = self.discover(FakeEntryPoint("broken", value),
+                                      FakeEntryPoint("vsphere", vsphere))
+            self.assertIn("Warning:", stderr.getvalue())
+            self.assertIn("'broken'", stderr.getvalue())
+            self.assertEqual(specs, provider_manager.PROVIDER_SPECS + [vsphere])
+
+        spec = ProviderSpec("missing", "acme_missing_module", "MissingProvider",
+                            detection=DetectionRules(labels=["acme.example.com/node"]))
+        manager = ProviderManager(specs=[spec])
+        with self.assertRaises(ProviderDetectionError):
+            manager.detect_provider({"metadata": {"labels": {"acme.example.com/node": ""}}})
+
+    def test_spec_headers(self):
+        """Test built-in specs list the headers in config.PROVIDER_FIELDS."""
+        specs = self.discover()
+        self.assertEqual(specs[0].headers,
+                         ("AWS-INSTANCE-ID", "AWS-REGION", "AWS-ZONE", "AWS-ASG"))
+
+
+class TestInstalledPlugin(unittest.TestCase):
+    """Test an installed plugin end to end in a fresh interpreter."""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        dist_info = os.path.join(self.path, "acme_nodes-1.0.dist-info")
+        os.mkdir(dist_info)
+        files = {
+            os.path.join(dist_info, "METADATA"):
+                "Metadata-Version: 2.1\nName: acme-nodes\nVersion: 1.0\n",
+            os.path.join(dist_info, "entry_points.txt"): ENTRY_POINTS,
+            os.path.join(self.path, "acme_specs.py"): SPECS_MODULE,
+            os.path.join(self.path, "acme_vsphere.py"): PROVIDER_MODULE,
+        }
+        for path, content in files.items():
+            with open(path, "w") as handle:
+                handle.write(textwrap.dedent(content))
+
+    def test_provider_module_imported_on_match(self):
+        """Test only the spec module loads until a node matches the plugin."""
+        code = (
+            "import json, sys\n"
+            f"sys.path.insert(0, {self.path!r})\n"
+            "from kubectl_node.providers import ProviderManager\n"
+            "def node(provider_id):\n"
+            "    return {'metadata': {'name': 'n', 'uid': provider_id, 'labels': {},\n"
+            "                         'creationTimestamp': '2023-01-01T12:00:00Z'},\n"
+            "            'spec': {'providerID': provider_id}, 'status': {}}\n"
+            "def loaded():\n"
+            "    return sorted(m for m in sys.modules if m.startswith('acme_'))\n"
+            "manager = ProviderManager()\n"
+            "steps = [loaded()]\n"
+            "steps.append(manager.detect_provider(node('kind://docker/kind/n')).name)\n"
+            "steps.append(loaded())\n"
+            "fields = manager.get_node_fields(node('vsphere://4f0e-9a1c'))\n"
+            "steps.append(fields['VSPHERE-UUID'])\n"
+            "steps.append(loaded())\n"
+            "steps.append('spec.providerID' in manager.projection().paths)\n"
+            "print(json.dumps(steps))\n"
+        )
+        result = run_python(code)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), [
+            ["acme_specs"], "generic", ["acme_specs"],
+            "4f0e-9a1c", ["acme_specs", "acme_vsphere"], True,
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,289 @@
+"""Tests for the per-node pod count and resource request columns."""
+
+import io
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+from kubectl_node import client
+from kubectl_node.exceptions import KubectlCommandError, KubectlTimeoutError
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.pods import POD_PROJECTION, NodeRequests, pod_requests
+from kubectl_node.providers import ProviderManager
+from kubectl_node.record import NodeRecord
+from kubectl_node.sources import wait_for_sources
+from kubectl_node.utils import (
+    kubectl_stream_projected, parse_cpu_millis, parse_memory_bytes, format_cpu_millis, format_memory_bytes, format_usage
+)
+
+from tests.stub_apiserver import StubAPIServer, make_node, make_pod
+
+
+def _node(name, cpu="4", memory="16Gi", pods="110"):
+    node = make_node(name)
+    node["status"]["allocatable"] = {"cpu": cpu, "memory": memory, "pods": pods}
+    return node
+
+
+def _container(cpu=None, memory=None, **extra):
+    requests = {}
+    if cpu:
+        requests["cpu"] = cpu
+    if memory:
+        requests["memory"] = memory
+    return dict({"name": "c", "resources": {"requests": requests}}, **extra)
+
+
+class TestQuantities(unittest.TestCase):
+    """Test parsing and formatting resource quantities."""
+
+    def test_parse_cpu(self):
+        """Test CPU quantities in cores, millicores and exponent notation."""
+        self.assertEqual(parse_cpu_millis("7m"), 7)
+        self.assertEqual(parse_cpu_millis("1.5"), 1500)
+        self.assertEqual(parse_cpu_millis("2"), 2000)
+        self.assertEqual(parse_cpu_millis("1e-1"), 100)
+        self.assertEqual(parse_cpu_millis("100000n"), 1)  # rounded up
+
+    def test_parse_memory(self):
+        """Test binary, decimal and exponent memory quantities."""
+        self.assertEqual(parse_memory_bytes("128Mi"), 128 * 2 ** 20)
+        self.assertEqual(parse_memory_bytes("1.5Gi"), 3 * 2 ** 29)
+        self.assertEqual(parse_memory_bytes("100M"), 10 ** 8)
+        self.assertEqual(parse_memory_bytes("129e6"), 129 * 10 ** 6)
+        self.assertEqual(parse_memory_bytes("1k"), 1000)
+        self.assertEqual(parse_memory_bytes("4Ki"), 4096)
+        for invalid in ("", "abc", "1Xi", "1.2.3"):
+            with self.assertRaises(ValueError):
+                parse_memory_bytes(invalid)
+
+    def test_format(self):
+        """Test formatting like kubectl describe node."""
+        self.assertEqual(format_cpu_millis(2000), "2")
+        self.assertEqual(format_cpu_millis(1250), "1250m")
+        self.assertEqual(format_memory_bytes(1536 * 2 ** 20), "1536Mi")
+        self.assertEqual(format_memory_bytes(12 * 2 ** 30 + 2 ** 29), "12.5Gi")
+        self.assertEqual(format_usage("1250m", 1250, 4000), "1250m (31%)")
+        self.assertEqual(format_usage("1250m", 1250, None), "1250m")
+
+
+class TestPodRequests(unittest.TestCase):
+    """Test the effective requests of a single pod."""
+
+    def test_containers_add_up(self):
+        """Test container requests are summed, missing ones counting as zero."""
+        spec = {"containers": [_container("250m", "64Mi"), _container("1"), _container()]}
+        self.assertEqual(pod_requests(spec), (1250, 64 * 2 ** 20))
+
+    def test_init_containers_take_the_max(self):
+        """Test a large init container raises the pod's requests."""
+        spec = {"containers": [_container("100m", "64Mi")],
+                "initContainers": [_container("2", "32Mi"), _container("500m", "1Gi")]}
+        self.assertEqual(pod_requests(spec), (2000, 2 ** 30))
+
+    def test_sidecars_and_overhead(self):
+        """Test sidecars count with the containers, and overhead is added."""
+        spec = {"containers": [_container("100m", "64Mi")],
+                "initContainers": [_container("200m", "64Mi", restartPolicy="Always"),
+                                   _container("250m", "64Mi")],
+                "overhead": {"cpu": "50m", "memory": "16Mi"}}
+        # max(100m + 200m, 200m + 250m) + 50m; max(128Mi, 128Mi) + 16Mi
+        self.assertEqual(pod_requests(spec), (500, 144 * 2 ** 20))
+
+
+class TestNodeRequests(unittest.TestCase):
+    """Test folding pods into per-node counters and the request columns."""
+
+    def test_counters_per_node(self):
+        """Test only bound, non-terminated pods are counted, keyed by node."""
+        requests = NodeRequests()
+        requests.add_pods([
+            make_pod("a", "node-1", cpu="500m", memory="1Gi"),
+            make_pod("b", "node-1", cpu="1", memory="512Mi"),
+            make_pod("c", "node-2"),
+            make_pod("done", "node-2", phase="Succeeded"),
+            make_pod("failed", "node-2", phase="Failed"),
+            make_pod("pending", None, phase="Pending"),
+        ])
+        self.assertEqual(set(requests.usage), {"node-1", "node-2"})
+        self.assertEqual(requests.usage["node-1"].pods, 2)
+        self.assertEqual(requests.usage["node-1"].cpu_millis, 1500)
+        self.assertEqual(requests.usage["node-1"].memory_bytes, 1536 * 2 ** 20)
+        self.assertEqual(requests.usage["node-2"].pods, 1)
+
+    def test_columns(self):
+        """Test the columns against allocatable, and for nodes without pods."""
+        requests = NodeRequests()
+        requests.add_pods([make_pod("a", "node-1", cpu="1250m", memory="1536Mi")])
+        requests.loaded = True
+        manager = ProviderManager(base_fields=["NAME", "PODS", "CPU-REQ", "MEM-REQ"],
+                                  columns=requests.columns())
+
+        headers, rows = manager.collect_rows([[_node("node-1"), _node("node-2", pods="")]])
+        self.assertEqual(headers, ["NAME", "PODS", "CPU-REQ", "MEM-REQ"])
+        self.assertEqual(rows, [["node-1", "1/110", "1250m (31%)", "1536Mi (9%)"],
+                                ["node-2", "0", "0 (0%)", "0Mi (0%)"]])
+
+        # The request columns make the projection keep allocatable
+        self.assertIn("status.allocatable", manager.projection().paths)
+
+    def test_failure_degrades_to_na(self):
+        """Test pods that cannot be listed leave the columns at N/A."""
+        with patch('kubectl_node.pods.kubectl_stream_projected',
+                   side_effect=KubectlCommandError("pods is forbidden")):
+            requests = NodeRequests().refresh()
+        self.assertIsInstance(requests.error, KubectlCommandError)
+        self.assertEqual(requests.columns()["PODS"](NodeRecord.from_node(_node("node-1"))), "N/A")
+
+    def test_unexpected_error_is_recorded(self):
+        """Test any failure of a background fetch ends up in the source's error."""
+        with patch('kubectl_node.pods.kubectl_stream_projected',
+                   side_effect=KeyError("spec")):
+            requests = NodeRequests().start()
+            self.assertFalse(requests.wait())
+        self.assertIn("Unexpected error", str(requests.error))
+        self.assertEqual(wait_for_sources([requests]),
+                         [f"Pod requests unavailable: {requests.error}"])
+
+
+class TestPodListing(unittest.TestCase):
+    """Test listing pods page by page from the API server."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+
+    def test_pods_are_listed_in_pages(self):
+        """Test pods are paged with a field selector and counted per node."""
+        pods = [make_pod(f"pod-{i}", f"node-{i % 3}", cpu="10m", memory="1Mi")
+                for i in range(1200)]
+        with StubAPIServer(nodes=[_node(f"node-{i}") for i in range(3)], pods=pods) as server:
+            with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}):
+                requests = NodeRequests(page_size=500).refresh(transport="native")
+
+        pod_queries = [query for path, query, headers in server.requests if path == "/api/v1/pods"]
+        self.assertEqual(len(pod_queries), 3)
+        self.assertEqual({query["limit"] for query in pod_queries}, {"500"})
+        self.assertIn("status.phase!=Succeeded", pod_queries[0]["fieldSelector"])
+        self.assertEqual(len(requests.usage), 3)
+        self.assertEqual(requests.usage["node-0"].pods, 400)
+        self.assertEqual(requests.usage["node-0"].cpu_millis, 4000)
+
+    def test_requests_option(self):
+        """Test --requests adds the columns to the table."""
+        pods = [make_pod("a", "node-1", cpu="2", memory="4Gi")]
+        with StubAPIServer(nodes=[_node("node-1")], pods=pods) as server:
+            argv = ["--requests", "--transport", "native", "--no-cache"]
+            with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}), \
+                 patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                display_nodes(options=parse_args(argv))
+
+        lines = stdout.getvalue().splitlines()
+        self.assertIn("PODS", lines[2])
+        self.assertIn("MEM-REQ", lines[2])
+        self.assertIn("1/110", lines[3])
+        self.assertIn("2 (50%)", lines[3])
+        self.assertIn("4096Mi (25%)", lines[3])
+
+
+class TestKubectlPodListing(unittest.TestCase):
+    """Test pods listed through the kubectl subprocess."""
+
+    PODS = [make_pod("a", "node-1", cpu="500m", memory="1Gi"),
+            make_pod("b", "node-1", cpu="250m", memory="1Gi"),
+            make_pod("c", "node-2")]
+
+    def _stream(self, output):
+        process = MagicMock()
+        process.stdout = io.StringIO(output)
+        process.stderr = io.StringIO("")
+        process.wait.return_value = 0
+        process.poll.return_value = 0
+        return process
+
+    def _process(self, output):
+        process = MagicMock()
+        process.communicate.return_value = (output, "")
+        process.returncode = 0
+        context = MagicMock()
+        context.__enter__.return_value = process
+        return context
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_only_counted_fields_are_printed(self, mock_popen):
+        """Test kubectl prints the counted pod fields, read one line at a time."""
+        lines = [
+            '[[["500m","1Gi"],null],null,"node-1",null,"Running"]\n',
+            '[[["250m","1Gi"],null],null,"node-1",null,"Running"]\n',
+            '[[["100m","128Mi"],null],null,"node-2",null,"Running"]\n',
+        ]
+        process = self._stream("")
+        read = []
+
+        def stdout():
+            for line in lines:
+                read.append(line)
+                yield line
+        process.stdout = MagicMock()
+        process.stdout.__iter__.side_effect = stdout
+        mock_popen.return_value = process
+
+        folded = []
+        with patch('kubectl_node.pods.fold_pods',
+                   side_effect=lambda usage, pods: folded.append(len(read))):
+            NodeRequests(page_size=2).refresh(context="dev")
+        # Each pod is counted before the next line is read
+        self.assertEqual(folded, [1, 2, 3])
+
+        requests = NodeRequests(page_size=2)
+        mock_popen.return_value = self._stream("".join(lines))
+        requests.refresh(context="dev")
+        command = mock_popen.call_args[0][0]
+        self.assertEqual(command[:4], ["kubectl", "get", "pods", "-o"])
+        self.assertEqual(command[4], "go-template=" + POD_PROJECTION.go_template())
+        self.assertIn("--all-namespaces", command)
+        self.assertIn("--chunk-size=2", command)
+        self.assertIn("--field-selector=spec.nodeName!=,status.phase!=Succeeded,"
+                      "status.phase!=Failed", command)
+        self.assertIsNone(requests.error)
+        self.assertEqual(requests.usage["node-1"].cpu_millis, 750)
+        self.assertEqual(requests.usage["node-1"].memory_bytes, 2 * 2 ** 30)
+        self.assertEqual(requests.usage["node-2"].pods, 1)
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_unparseable_output_lists_whole_pods(self, mock_popen):
+        """Test output the template could not quote falls back to raw pages."""
+        mock_popen.side_effect = [
+            self._stream('[null,null,"node-1",null,"Running"]\n["\\x00"]\n'),
+            self._process(json.dumps({"items": self.PODS, "metadata": {}})),
+        ]
+
+        requests = NodeRequests().refresh()
+
+        self.assertEqual(mock_popen.call_args[0][0][:3], ["kubectl", "get", "--raw"])
+        self.assertEqual(requests.usage["node-1"].pods, 2)
+        self.assertEqual(requests.usage["node-2"].pods, 1)
+
+    def test_timeout_kills_kubectl(self):
+        """Test a kubectl run that outlives the timeout is killed and reported."""
+        hang = [sys.executable, "-c", "import time; time.sleep(30)"]
+        started = time.monotonic()
+        with patch('kubectl_node.utils._kubectl_command', return_value=hang):
+            with self.assertRaises(KubectlTimeoutError):
+                list(kubectl_stream_projected("pods", POD_PROJECTION, timeout=0.2))
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_prune_matches_template_fields(self):
+        """Test projected pods are counted like whole pods."""
+        pod = make_pod("a", "node-1", cpu="500m", memory="1Gi")
+        pod["spec"]["initContainers"] = [dict(pod["spec"]["containers"][0], restartPolicy="Always")]
+        pruned = POD_PROJECTION.prune(pod)
+        self.assertNotIn("name", pruned["spec"]["containers"][0])
+        self.assertEqual(pod_requests(pruned["spec"]), pod_requests(pod["spec"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
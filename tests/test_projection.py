@@ -0,0 +1,255 @@
+"""Tests for node field projections."""
+
+import json
+import os
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+from kubectl_node import client
+from kubectl_node.columns import reads
+from kubectl_node.projection import FIELD_KINDS, MAP
+from kubectl_node.providers.generic import GenericProvider
+from kubectl_node.providers.manager import ProviderManager
+from kubectl_node.utils import kubectl_get_nodes
+from kubectl_node.watch import NodeWatcher
+
+from tests.stub_apiserver import StubAPIServer
+
+
+def make_full_node(index, provider="aws"):
+    """Build a node as big as real ones: hundreds of images and annotations."""
+    labels = {
+        "kubernetes.io/hostname": f"node-{index}",
+        "node.kubernetes.io/instance-type": "m5.large",
+        "topology.kubernetes.io/zone": "us-west-2a",
+    }
+    if provider == "aws":
+        labels["k8s.io/cloud-provider-aws"] = "true"
+    return {
+        "metadata": {
+            "name": f"node-{index:05d}",
+            "uid": f"uid-{index}",
+            "resourceVersion": str(1000 + index),
+            "creationTimestamp": "2023-01-01T12:00:00Z",
+            "labels": labels,
+            "annotations": {f"example.com/annotation-{i}": "x" * 40 for i in range(10)},
+            "managedFields": [{"manager": "kubelet", "fieldsV1": {"f:status": {}}}] * 5,
+        },
+        "spec": {
+            "providerID": f"aws:///us-west-2a/i-{index:017x}",
+            "podCIDR": "10.244.0.0/24",
+            "taints": [{"key": "dedicated", "value": "batch", "effect": "NoSchedule"}],
+        },
+        "status": {
+            "conditions": [
+                {"type": kind, "status": "False" if kind != "Ready" else "True",
+                 "reason": "KubeletReady", "message": "kubelet is posting ready status",
+                 "lastHeartbeatTime": "2024-01-01T00:00:00Z"}
+                for kind in ("MemoryPressure", "DiskPressure", "PIDPressure", "Ready")
+            ],
+            "addresses": [
+                {"type": "InternalIP", "address": f"10.0.{index // 256}.{index % 256}"},
+                {"type": "Hostname", "address": f"node-{index}"},
+            ],
+            "capacity": {"cpu": "2", "memory": "8Gi", "pods": "110"},
+            "allocatable": {"cpu": "1930m", "memory": "7Gi", "pods": "110"},
+            "nodeInfo": {
+                "kubeletVersion": "v1.28.0", "osImage": "Amazon Linux 2",
+                "kernelVersion": "5.10.0", "containerRuntimeVersion": "containerd://1.6.6",
+                "machineID": "f" * 32, "bootID": "b" * 36,
+            },
+            "images": [
+                {"names": [f"registry.example.com/team/image-{i}@sha256:{'0' * 64}",
+                           f"registry.example.com/team/image-{i}:v1.2.3"],
+                 "sizeBytes": 123456789}
+                for i in range(300)
+            ],
+        },
+    }
+
+
+def template_output(projection, nodes):
+    """Produce what kubectl prints for ``projection.go_template()``."""
+    lines = []
+    for node in nodes:
+        values = []
+        for path in projection.paths:
+            value = node
+            for key in path.split("."):
+                value = value.get(key) if isinstance(value, dict) else None
+            kind = FIELD_KINDS[path]
+            if not value:
+                values.append(None)
+            elif kind == MAP:
+                values.append([item for pair in sorted(value.items()) for item in pair] + [None])
+            elif isinstance(kind, tuple):
+                values.append([[element.get(key) or None for key in kind] for element in value] + [None])
+            else:
+                values.append(value)
+        lines.append(json.dumps(values))
+    return "\n".join(lines) + "\n"
+
+
+class TestProjection(unittest.TestCase):
+    """Test deriving, pruning and decoding projections."""
+
+    def setUp(self):
+        self.manager = ProviderManager()
+        self.projection = self.manager.projection()
+        self.nodes = [make_full_node(i) for i in range(3)]
+
+    def test_derived_from_columns(self):
+        """Test the projection holds what columns and detection read, nothing more."""
+        paths = set(self.projection.paths)
+        self.assertIn("status.nodeInfo.kubeletVersion", paths)
+        self.assertIn("spec.taints", paths)  # AWS-ASG
+        self.assertIn("metadata.labels", paths)  # provider detection
+        self.assertNotIn("status.images", paths)
+        self.assertNotIn("metadata.annotations", paths)
+        self.assertTrue(self.projection.supports_template())
+
+    def test_new_column_extends_projection(self):
+        """Test a provider column that declares its fields extends the projection."""
+        class PodCIDRProvider(GenericProvider):
+            def get_field_extractors(self):
+                return {"POD-CIDR": reads("spec.podCIDR")(lambda node: node["spec"]["podCIDR"])}
+
+            def get_additional_headers(self):
+                return ["POD-CIDR"]
+
+        self.manager.providers.insert(0, PodCIDRProvider())
+        self.assertIn("spec.podCIDR", self.manager.projection().paths)
+
+    def test_undeclared_column_disables_projection(self):
+        """Test columns without declared fields make whole objects be fetched."""
+        class OpaqueProvider(GenericProvider):
+            def get_field_extractors(self):
+                return {"OPAQUE": lambda node: "x"}
+
+            def get_additional_headers(self):
+                return ["OPAQUE"]
+
+        self.manager.providers.insert(0, OpaqueProvider())
+        self.assertIsNone(self.manager.projection())
+
+    def test_pruned_rows_match_full_rows(self):
+        """Test projected nodes render exactly like whole nodes."""
+        pruned = [self.projection.prune(node) for node in self.nodes]
+        self.assertEqual(ProviderManager().collect_rows([pruned]),
+                         ProviderManager().collect_rows([self.nodes]))
+        self.assertNotIn("images", pruned[0]["status"])
+
+    def test_template_output_round_trip(self):
+        """Test decoding template output yields the pruned nodes."""
+        decoded = self.projection.parse_template_output(template_output(self.projection, self.nodes))
+        self.assertEqual(decoded, [self.projection.prune(node) for node in self.nodes])
+
+    def test_template_guards_missing_fields(self):
+        """Test every path is reached through nested withs."""
+        template = self.projection.go_template()
+        self.assertTrue(template.startswith("{{range .items}}["))
+        self.assertIn("{{with .status}}{{with .nodeInfo}}{{with .kubeletVersion}}", template)
+        self.assertEqual(template.count("{{with"), template.count("{{else}}null{{end}}"))
+
+
+class TestProjectionPayload(unittest.TestCase):
+    """Compare bytes transferred and parse time against whole node objects."""
+
+    NODES = 200
+
+    def setUp(self):
+        self.projection = ProviderManager().projection()
+        self.nodes = [make_full_node(i) for i in range(self.NODES)]
+        self.full = json.dumps({"kind": "NodeList", "items": self.nodes})
+        self.projected = template_output(self.projection, self.nodes)
+
+    def _best_time(self, func, arg, repeat=3):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(arg)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def test_template_bytes_and_parse_time(self):
+        """Test kubectl's projected output is far smaller and faster to parse."""
+        self.assertLess(len(self.projected) * 10, len(self.full))
+        self.assertLess(self._best_time(self.projection.parse_template_output, self.projected),
+                        self._best_time(json.loads, self.full))
+
+    def test_native_transfer_is_compressed(self):
+        """Test the native transport transfers the list gzip-compressed."""
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+        with StubAPIServer(nodes=self.nodes) as server:
+            with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}):
+                result = kubectl_get_nodes(transport="native", projection=self.projection)
+            transferred = server.bytes_sent
+
+        self.assertLess(transferred * 10, len(self.full))
+        self.assertEqual(result["items"][0], self.projection.prune(self.nodes[0]))
+
+
+class TestKubectlProjection(unittest.TestCase):
+    """Test projected fetches through the kubectl subprocess."""
+
+    def setUp(self):
+        self.projection = ProviderManager().projection()
+        self.nodes = [make_full_node(i) for i in range(2)]
+
+    def _process(self, output):
+        process = MagicMock()
+        process.communicate.return_value = (output, "")
+        process.returncode = 0
+        return process
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_go_template_fetch(self, mock_popen):
+        """Test kubectl is asked for the generated go-template."""
+        mock_popen.return_value.__enter__.return_value = self._process(
+            template_output(self.projection, self.nodes))
+
+        result = kubectl_get_nodes(projection=self.projection)
+
+        command = mock_popen.call_args[0][0]
+        self.assertEqual(command[:4], ["kubectl", "get", "nodes", "-o"])
+        self.assertEqual(command[4], "go-template=" + self.projection.go_template())
+        self.assertEqual(result["items"], [self.projection.prune(node) for node in self.nodes])
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_unparseable_output_refetches(self, mock_popen):
+        """Test output the template could not quote falls back to whole objects."""
+        mock_popen.return_value.__enter__.side_effect = [
+            self._process('["\\x00"]\n'),
+            self._process(json.dumps({"items": self.nodes})),
+        ]
+
+        result = kubectl_get_nodes(projection=self.projection)
+
+        self.assertEqual(mock_popen.call_count, 2)
+        self.assertEqual(mock_popen.call_args[0][0][:5], ["kubectl", "get", "nodes", "-o", "json"])
+        self.assertEqual(result["items"], [self.projection.prune(node) for node in self.nodes])
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_relist_is_projected(self, mock_popen):
+        """Test watch and cache relists use the template and keep a resourceVersion."""
+        head = {"metadata": {"resourceVersion": "4711", "continue": "x"}, "items": self.nodes[:1]}
+        mock_popen.return_value.__enter__.side_effect = [
+            self._process(json.dumps(head)),
+            self._process(template_output(self.projection, self.nodes)),
+        ]
+
+        watcher = NodeWatcher(projection=self.projection)
+        watcher.relist()
+
+        commands = [call[0][0] for call in mock_popen.call_args_list]
+        self.assertEqual(commands[0], ["kubectl", "get", "--raw", "/api/v1/nodes?limit=1"])
+        self.assertEqual(commands[1][4], "go-template=" + self.projection.go_template())
+        self.assertEqual(watcher.resource_version, "4711")
+        self.assertEqual(watcher.snapshot(), [self.projection.prune(node) for node in self.nodes])
+
+
+if __name__ == '__main__':
+    unittest.main()
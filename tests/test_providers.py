@@ -1,11 +1,16 @@
 """Tests for cloud provider implementations."""
 
 import unittest
+from unittest.mock import patch
+from kubectl_node.config import PROVIDER_FIELDS
 from kubectl_node.providers.aws import AWSProvider
 from kubectl_node.providers.azure import AzureProvider
 from kubectl_node.providers.gcp import GCPProvider
 from kubectl_node.providers.generic import GenericProvider
-from kubectl_node.providers.manager import ProviderManager
+from kubectl_node.record import as_record
+from kubectl_node.providers.detection import DetectionRules, DetectionTable
+from kubectl_node.providers.manager import ProviderManager, ProviderSpec
+from kubectl_node.providers.provider_id import ProviderID, parse_provider_id
 
 
 class TestProviders(unittest.TestCase):
@@ -87,6 +92,7 @@ class TestProviders(unittest.TestCase):
         fields = self.aws_provider.get_provider_fields(aws_node)
         expected = {
             "AWS-INSTANCE-ID": "i-1234567890abcdef0",
+            "AWS-REGION": "us-west-2",
             "AWS-ZONE": "us-west-2a",
             "AWS-ASG": "custom-taint"
         }
@@ -106,6 +112,7 @@ class TestProviders(unittest.TestCase):
         
         fields = self.azure_provider.get_provider_fields(azure_node)
         expected = {
+            "AZURE-INSTANCE-ID": "N/A",
             "AZURE-INSTANCE-TYPE": "Standard_D2s_v3",
             "AZURE-RESOURCE-GROUP": "test-rg",
             "AZURE-ZONE": "eastus-1"
@@ -130,6 +137,8 @@ class TestProviders(unittest.TestCase):
         fields = self.gcp_provider.get_provider_fields(gcp_node)
         expected = {
             "GCP-INSTANCE-ID": "gke-cluster-default-pool-12345678-abcd",
+            "GCP-PROJECT": "test-project",
+            "GCP-REGION": "us-central1",
             "GCP-ZONE": "us-central1-a",
             "GCP-NODE-POOL": "default-pool",
             "GCP-PREEMPTIBLE": "true"
@@ -198,6 +207,205 @@ class TestProviders(unittest.TestCase):
         self.assertIn("AWS-INSTANCE-ID", headers)
         self.assertIn("GCP-INSTANCE-ID", headers)
         self.assertNotIn("AZURE-INSTANCE-TYPE", headers)
+    
+    def test_provider_manager_classify_memoized(self):
+        """Test classification is memoized by UID and resourceVersion."""
+        node = {
+            "metadata": {
+                "uid": "uid-1",
+                "resourceVersion": "10",
+                "labels": {"k8s.io/cloud-provider-aws": "true"}
+            }
+        }
+        
+        with patch.object(self.manager, 'detect_provider',
+                          wraps=self.manager.detect_provider) as detect:
+            self.assertEqual(self.manager.classify(node).name, "aws")
+            self.assertEqual(self.manager.classify(node).name, "aws")
+            self.assertEqual(detect.call_count, 1)
+            
+            # A new resourceVersion means the node changed and is re-detected
+            node["metadata"]["resourceVersion"] = "11"
+            node["metadata"]["labels"] = {"cloud.google.com/gke-nodepool": "pool"}
+            self.assertEqual(self.manager.classify(node).name, "gcp")
+            self.assertEqual(detect.call_count, 2)
+    
+    def test_provider_manager_collect_rows_prunes_memo(self):
+        """Test a refresh forgets classifications of nodes no longer listed."""
+        def node(uid):
+            return {
+                "metadata": {
+                    "name": uid,
+                    "uid": uid,
+                    "resourceVersion": "1",
+                    "creationTimestamp": "2023-01-01T12:00:00Z",
+                    "labels": {}
+                },
+                "spec": {},
+                "status": {}
+            }
+        
+        self.manager.collect_rows([[node("a"), node("b")]])
+        with patch.object(self.manager, 'detect_provider',
+                          wraps=self.manager.detect_provider) as detect:
+            self.manager.collect_rows([[node("b")]])
+            detect.assert_not_called()
+        self.assertEqual(list(self.manager._classified), [("b", "1")])
+    
+    def test_provider_manager_collect_rows(self):
+        """Test rows collected page by page match per-node extraction."""
+        def node(name, labels):
+            return {
+                "metadata": {
+                    "name": name,
+                    "creationTimestamp": "2023-01-01T12:00:00Z",
+                    "labels": labels
+                },
+                "spec": {"providerID": f"aws:///us-west-2a/i-{name}"},
+                "status": {"conditions": [{"type": "Ready", "status": "True"}]}
+            }
+        
+        page_one = [node("a", {"k8s.io/cloud-provider-aws": "true"})]
+        page_two = [node("b", {}), node("c", {"cloud.google.com/gke-nodepool": "pool"})]
+        
+        headers, rows = self.manager.collect_rows(iter([page_one, page_two]))
+        all_nodes = page_one + page_two
+        
+        self.assertEqual(headers, self.manager.get_all_headers(all_nodes))
+        self.assertEqual(rows, [self.manager.get_node_info(n, headers) for n in all_nodes])
+    
+    def test_provider_specs_declare_column_fields(self):
+        """Test each spec declares every field its provider's columns read."""
+        for spec in self.manager.specs:
+            provider = spec.load()
+            plan = self.manager.compile_plan(provider.get_additional_headers())
+            self.assertLessEqual(plan.fields(provider), set(spec.fields), spec.name)
+            self.assertTrue(spec.rules, spec.name)
+    
+    def test_provider_fields_config(self):
+        """Test config.PROVIDER_FIELDS lists each provider's columns."""
+        for provider in (self.aws_provider, self.azure_provider, self.gcp_provider,
+                         self.generic_provider):
+            self.assertEqual(PROVIDER_FIELDS[provider.name], provider.get_additional_headers())
+
+
+def _node(labels=None, annotations=None, provider_id=None):
+    node = {"metadata": {"labels": labels or {}, "annotations": annotations or {}}}
+    if provider_id:
+        node["spec"] = {"providerID": provider_id}
+    return node
+
+
+def _spec(name, **rules):
+    return ProviderSpec(name, ".generic", "GenericProvider", detection=DetectionRules(**rules))
+
+
+class TestDetectionTable(unittest.TestCase):
+    """Test detection compiled from declarative rules."""
+    
+    def test_rule_kinds(self):
+        """Test labels, annotations, providerID schemes and plain prefixes."""
+        table = DetectionTable([
+            DetectionRules(labels=["example.com/a"]),
+            DetectionRules(annotations=["example.com/b"]),
+            DetectionRules(provider_ids=["openstack://"]),
+            DetectionRules(provider_ids=["k3s://edge-"]),
+        ])
+        self.assertEqual(table.lookup(as_record(_node({"example.com/a": ""}))), 0)
+        self.assertEqual(table.lookup(as_record(_node(annotations={"example.com/b": ""}))), 1)
+        self.assertEqual(table.lookup(as_record(_node(provider_id="openstack:///id"))), 2)
+        self.assertEqual(table.lookup(as_record(_node(provider_id="k3s://edge-1"))), 3)
+        self.assertIsNone(table.lookup(as_record(_node(provider_id="k3s://core-1"))))
+        self.assertEqual(table.fields,
+                         ("metadata.annotations", "metadata.labels", "spec.providerID"))
+    
+    def test_first_provider_wins(self):
+        """Test a node matching several providers gets the earliest one."""
+        table = DetectionTable([DetectionRules(labels=["example.com/a"]),
+                                DetectionRules(labels=["example.com/b"], provider_ids=["x://"])])
+        for labels in ({"example.com/b": "", "example.com/a": ""},
+                       {"example.com/b": "", "example.com/a": "",
+                        **{f"extra-{i}": "" for i in range(5)}}):
+            self.assertEqual(table.lookup(as_record(_node(labels, provider_id="x://1"))), 0)
+        self.assertEqual(table.lookup(as_record(_node({"example.com/b": ""}))), 1)
+    
+    def test_many_providers(self):
+        """Test 25 providers are told apart, and loaded only when matched."""
+        specs = [_spec(f"cloud-{i}", labels=[f"cloud-{i}.example.com/node"],
+                       provider_ids=[f"cloud{i}://"]) for i in range(25)]
+        manager = ProviderManager(specs=specs)
+        with patch.object(ProviderSpec, "load", side_effect=GenericProvider) as load:
+            self.assertIs(manager.detect_provider(_node({"cloud-17.example.com/node": ""})),
+                          manager._loaded["cloud-17"])
+            manager.detect_provider(_node(provider_id="cloud3://id"))
+            self.assertIs(manager.detect_provider(_node({"other": ""})), manager.generic)
+        self.assertEqual(load.call_count, 2)
+        self.assertEqual(sorted(manager._loaded), ["cloud-17", "cloud-3"])
+        self.assertIs(manager._loaded["cloud-3"].detection, specs[3].rules)
+    
+    def test_projection_reads_rule_fields(self):
+        """Test fetches keep the fields the detection rules read."""
+        manager = ProviderManager(specs=[_spec("edge", annotations=["example.com/edge"])])
+        self.assertIn("metadata.annotations", manager.projection().paths)
+
+
+class TestProviderID(unittest.TestCase):
+    """Test providerID parsing and the providers detected from it."""
+    
+    def test_parse(self):
+        """Test each scheme's structured fields."""
+        cases = {
+            "aws:///us-west-2a/i-0abc": ProviderID("aws", "i-0abc", "us-west-2", "us-west-2a"),
+            "aws:///us-west-2-lax-1a/i-0abc":
+                ProviderID("aws", "i-0abc", "us-west-2", "us-west-2-lax-1a"),
+            "azure:///subscriptions/0000/resourceGroups/mc_prod/providers/Microsoft.Compute/"
+            "virtualMachineScaleSets/aks-pool-123-vmss/virtualMachines/3":
+                ProviderID("azure", "aks-pool-123-vmss_3", project="mc_prod"),
+            "azure:///subscriptions/0000/resourcegroups/rg/providers/Microsoft.Compute/"
+            "virtualMachines/vm-1": ProviderID("azure", "vm-1", project="rg"),
+            "gce://proj/europe-west4-b/gke-node-1":
+                ProviderID("gce", "gke-node-1", "europe-west4", "europe-west4-b", "proj"),
+            "openstack:///4f0e-9a1c": ProviderID("openstack", "4f0e-9a1c"),
+            "openstack://RegionOne/4f0e-9a1c": ProviderID("openstack", "4f0e-9a1c", "RegionOne"),
+            "hcloud://1234567": ProviderID("hcloud", "1234567"),
+            "k3s://edge-1": ProviderID("k3s", "edge-1"),
+            "kind://docker/kind/kind-worker": ProviderID("kind", "kind-worker"),
+            "bare-metal-7": ProviderID("", "bare-metal-7"),
+            None: ProviderID(""),
+        }
+        for provider_id, expected in cases.items():
+            self.assertEqual(parse_provider_id(provider_id), expected, provider_id)
+    
+    def test_parsed_once(self):
+        """Test detection and columns share one parse per providerID."""
+        parse_provider_id.cache_clear()
+        manager = ProviderManager()
+        node = {"metadata": {"name": "n", "creationTimestamp": "2023-01-01T12:00:00Z"},
+                "spec": {"providerID": "gce://proj/us-east1-c/n"}}
+        fields = manager.get_node_fields(node)
+        self.assertEqual((fields["GCP-PROJECT"], fields["GCP-REGION"], fields["GCP-ZONE"]),
+                         ("proj", "us-east1", "us-east1-c"))
+        self.assertEqual(parse_provider_id.cache_info().misses, 1)
+    
+    def test_detected_by_scheme(self):
+        """Test nodes without marker labels are detected by their providerID."""
+        manager = ProviderManager()
+        expected = {
+            "aws:///eu-west-1b/i-0abc": ("aws", "AWS-REGION", "eu-west-1"),
+            "openstack://RegionOne/4f0e": ("openstack", "OPENSTACK-REGION", "RegionOne"),
+            "hcloud://42": ("hetzner", "HETZNER-SERVER-ID", "42"),
+            "k3s://edge-1": ("k3s", "K3S-ZONE", "fsn1"),
+        }
+        for provider_id, (name, header, value) in expected.items():
+            node = {"metadata": {"name": "n", "creationTimestamp": "2023-01-01T12:00:00Z",
+                                 "labels": {"topology.kubernetes.io/zone": "fsn1"}},
+                    "spec": {"providerID": provider_id}}
+            provider = manager.detect_provider(node)
+            self.assertEqual(provider.name, name)
+            self.assertEqual(manager.get_node_fields(node, provider)[header], value)
+            self.assertEqual(provider.get_provider_fields(node)[header], value)
+        self.assertIs(manager.detect_provider(_node(provider_id="kind://docker/kind/n")),
+                      manager.generic)
 
 
 if __name__ == '__main__':
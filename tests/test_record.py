@@ -0,0 +1,143 @@
+"""Tests for compact node records."""
+
+import json
+import unittest
+
+from kubectl_node.columns import ExtractionPlan, reads
+from kubectl_node.projection import Projection
+from kubectl_node.providers import ProviderManager
+from kubectl_node.providers.base import BaseProvider
+from kubectl_node.record import NodeRecord, as_record, records
+from kubectl_node.watch import NodeWatcher
+
+from tests.stub_apiserver import make_node
+
+
+def _node(name, zone="us-east-1a"):
+    node = make_node(name, {"topology.kubernetes.io/zone": zone,
+                            "node-role.kubernetes.io/worker": ""})
+    node["spec"] = {"providerID": f"aws:///{zone}/i-{name}", "unschedulable": True,
+                    "taints": [{"key": "dedicated", "value": "db", "effect": "NoSchedule"}]}
+    node["status"]["conditions"] = [{"type": "Ready", "status": "True", "reason": "KubeletReady",
+                                     "message": "kubelet is posting ready status",
+                                     "lastHeartbeatTime": "2024-01-01T00:00:00Z"}]
+    node["status"]["nodeInfo"] = {"osImage": "Ubuntu 22.04", "kubeletVersion": "v1.28.0",
+                                  "machineID": f"machine-{name}"}
+    node["status"]["allocatable"] = {"cpu": "4", "memory": "16Gi"}
+    node["status"]["images"] = [{"names": ["nginx:1.25"], "sizeBytes": 1000}]
+    # Decoded separately, as two watch events are
+    return json.loads(json.dumps(node))
+
+
+class TestNodeRecord(unittest.TestCase):
+    """Test building records and reading them."""
+
+    def test_fields(self):
+        """Test the record carries the fields columns read, and no others."""
+        record = NodeRecord.from_node(_node("a"))
+        self.assertEqual((record.name, record.uid, record.created),
+                         ("a", "uid-a", "2023-01-01T12:00:00Z"))
+        self.assertEqual(record.conditions, (("Ready", "True", "KubeletReady"),))
+        self.assertEqual(record.addresses, (("InternalIP", "10.0.0.1"),))
+        self.assertEqual(record.taints, (("dedicated", "db", "NoSchedule"),))
+        self.assertTrue(record.unschedulable)
+        self.assertIsNone(record.source)
+        self.assertNotIn("images", record["status"])
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_repeated_values_are_shared(self):
+        """Test repeated values of separately decoded nodes become one string."""
+        first, second = NodeRecord.from_node(_node("a")), NodeRecord.from_node(_node("b"))
+        self.assertIs(first.node_info["osImage"], second.node_info["osImage"])
+        self.assertIs(first.labels["topology.kubernetes.io/zone"],
+                      second.labels["topology.kubernetes.io/zone"])
+        self.assertIs(first.conditions[0][2], second.conditions[0][2])
+        self.assertIs(first.allocatable["memory"], second.allocatable["memory"])
+
+    def test_reads_like_a_node_object(self):
+        """Test providers written against node objects can read records."""
+        record = NodeRecord.from_node(_node("a"))
+        self.assertEqual(record["metadata"]["name"], "a")
+        self.assertEqual(record.get("spec", {}).get("taints"),
+                         [{"key": "dedicated", "value": "db", "effect": "NoSchedule"}])
+        self.assertEqual(record["status"]["conditions"],
+                         [{"type": "Ready", "status": "True", "reason": "KubeletReady"}])
+        pruned = Projection(["metadata.labels"]).prune(record.to_dict())
+        self.assertEqual(pruned["metadata"]["labels"], record.labels)
+
+    def test_as_record_keeps_the_object(self):
+        """Test nodes handed in directly keep their object for full lookups."""
+        node = _node("a")
+        record = as_record(node)
+        self.assertIs(record.source, node)
+        self.assertIs(as_record(record), record)
+        self.assertIn("images", record["status"])
+
+    def test_release_replaces_nodes_in_place(self):
+        """Test only a released page has its node objects replaced."""
+        page = [_node("a"), _node("b")]
+        copied = next(records([page]))
+        self.assertIsInstance(page[0], dict)
+        self.assertEqual([record.name for record in copied], ["a", "b"])
+
+        released = next(records([page], release=True))
+        self.assertIs(released, page)
+        self.assertTrue(all(isinstance(node, NodeRecord) for node in page))
+
+
+class ImageCountProvider(BaseProvider):
+    """A provider whose column reads a field records do not carry."""
+
+    def __init__(self):
+        super().__init__("images")
+
+    def detect(self, node):
+        return True
+
+    def get_field_extractors(self):
+        return {"IMAGES": lambda node: str(len(node["status"].get("images", [])))}
+
+    def get_additional_headers(self):
+        return ["IMAGES"]
+
+
+class TestRecordsInTheTool(unittest.TestCase):
+    """Test records flowing through extraction and watching."""
+
+    def test_rows_match_node_objects(self):
+        """Test rows extracted from records equal rows from node objects."""
+        manager = ProviderManager()
+        nodes = [_node("a"), _node("b", zone="us-east-1b")]
+        headers = manager.get_all_headers(nodes)
+        expected = [manager.get_node_info(node, headers) for node in nodes]
+        self.assertEqual(manager.collect_rows(manager.node_records([nodes], release=True)),
+                         (headers, expected))
+        self.assertEqual(expected[0][headers.index("STATUS")], "Ready,SchedulingDisabled")
+        self.assertEqual(expected[0][headers.index("ROLES")], "worker")
+
+    def test_undeclared_fields_keep_objects(self):
+        """Test records keep their node while a column reads undeclared fields."""
+        manager = ProviderManager(specs=[])
+        manager.providers.append(ImageCountProvider())
+        self.assertIsNone(manager.projection())
+        headers, rows = manager.collect_rows([[_node("a")]])
+        self.assertEqual(rows[0][headers.index("IMAGES")], "1")
+
+    def test_declared_custom_column(self):
+        """Test custom columns are handed records."""
+        cpu = reads("status.allocatable")(lambda node: node.allocatable["cpu"])
+        plan = ExtractionPlan(["NAME", "CPU"], {"CPU": cpu})
+        self.assertEqual(plan.extract(_node("a"), ProviderManager().generic), ["a", "4"])
+
+    def test_watcher_keeps_records(self):
+        """Test the watch-mode node map holds records, ordered by name."""
+        watcher = NodeWatcher(projection=ProviderManager().projection(), records=True)
+        for name in ("b", "a"):
+            watcher.apply_event({"type": "ADDED", "object": _node(name)})
+        watcher.apply_event({"type": "DELETED", "object": _node("b")})
+        self.assertEqual([(type(node), node.name) for node in watcher.snapshot()],
+                         [(NodeRecord, "a")])
+
+
+if __name__ == '__main__':
+    unittest.main()
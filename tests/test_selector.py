@@ -0,0 +1,143 @@
+"""Tests for server-side node selection with -l, --field-selector and --nodepool."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from kubectl_node import client
+from kubectl_node.cache import NodeCache, cached_get_nodes
+from kubectl_node.exceptions import SelectorError
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.selector import NodeSelector
+from kubectl_node.utils import kubectl_get_nodes
+from kubectl_node.watch import NodeWatcher
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+GKE_NODES = [
+    make_node("gke-default-1", {"cloud.google.com/gke-nodepool": "default", "tier": "web"}),
+    make_node("gke-default-2", {"cloud.google.com/gke-nodepool": "default", "tier": "db"}),
+    make_node("gke-highmem-1", {"cloud.google.com/gke-nodepool": "highmem", "tier": "db"}),
+]
+
+
+def _names(node_list):
+    return [node["metadata"]["name"] for node in node_list["items"]]
+
+
+class TestNodeSelector(unittest.TestCase):
+    """Test how a selection is sent to the API server and to kubectl."""
+
+    def test_params_and_kubectl_args(self):
+        """Test only the given selectors are sent."""
+        selector = NodeSelector("tier=web", "spec.unschedulable=false")
+        self.assertEqual(selector.params(), {"labelSelector": "tier=web",
+                                             "fieldSelector": "spec.unschedulable=false"})
+        self.assertEqual(selector.kubectl_args(), ["-l", "tier=web",
+                                                   "--field-selector", "spec.unschedulable=false"])
+        self.assertEqual(NodeSelector(fields="metadata.name=a").params(),
+                         {"fieldSelector": "metadata.name=a"})
+        self.assertFalse(NodeSelector("", None))
+
+    def test_kubectl_transport(self):
+        """Test kubectl is asked for the selected nodes only."""
+        with patch('kubectl_node.utils._run_kubectl_json', return_value={"items": []}) as run:
+            kubectl_get_nodes(selector=NodeSelector("tier=web"))
+        self.assertEqual(run.call_args[0][0], ["get", "nodes", "-o", "json", "-l", "tier=web"])
+
+    def test_parse_args(self):
+        """Test the flags, and that node pool names must be label values."""
+        options = parse_args(["-l", "tier=web", "--field-selector", "metadata.name=a",
+                              "--nodepool", "highmem"])
+        self.assertEqual((options.selector, options.field_selector, options.nodepool),
+                         ("tier=web", "metadata.name=a", "highmem"))
+        with patch('sys.stderr', new_callable=io.StringIO):
+            with self.assertRaises(SystemExit):
+                parse_args(["--nodepool", "a,b=c"])
+
+
+class TestServerSideSelection(unittest.TestCase):
+    """Test selection against a stub API server."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+        self.server = StubAPIServer(nodes=GKE_NODES).start()
+        self.addCleanup(self.server.stop)
+        env = patch.dict(os.environ, {"KUBECONFIG": self.server.write_kubeconfig()})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def node_queries(self):
+        return [query for path, query, headers in self.server.requests if path == "/api/v1/nodes"]
+
+    def test_label_selector_is_sent(self):
+        """Test the server filters the nodes."""
+        nodes = kubectl_get_nodes(transport="native", selector=NodeSelector("tier=db"))
+        self.assertEqual(_names(nodes), ["gke-default-2", "gke-highmem-1"])
+        self.assertEqual(self.node_queries()[0]["labelSelector"], "tier=db")
+
+    def test_nodepool_maps_to_provider_label(self):
+        """Test --nodepool probes one node for the provider's label, once per context."""
+        selector = NodeSelector(labels="tier=db", nodepool="default")
+        resolved = selector.resolve("stub", "native")
+        self.assertIs(selector.resolve("stub", "native"), resolved)
+        self.assertEqual(resolved.labels, "tier=db,cloud.google.com/gke-nodepool=default")
+
+        nodes = kubectl_get_nodes(context="stub", transport="native", selector=resolved)
+        self.assertEqual(_names(nodes), ["gke-default-2"])
+        probe, listing = self.node_queries()
+        self.assertEqual(probe, {"limit": "1"})
+        self.assertEqual(listing["labelSelector"], resolved.labels)
+
+    def test_nodepool_without_known_label(self):
+        """Test providers without a node pool label ask for -l instead."""
+        self.server.nodes = [make_node("plain-1")]
+        with self.assertRaises(SelectorError):
+            NodeSelector(nodepool="default").resolve("stub", "native")
+
+    def test_watch_is_selected(self):
+        """Test the watcher's list and watch both carry the selectors."""
+        watcher = NodeWatcher(context="stub", transport="native",
+                              selector=NodeSelector("tier=web", "metadata.name=gke-default-1"))
+        watcher.sync()
+        self.assertEqual([node["metadata"]["name"] for node in watcher.snapshot()],
+                         ["gke-default-1"])
+        for query in self.node_queries():
+            self.assertEqual(query["labelSelector"], "tier=web")
+            self.assertEqual(query["fieldSelector"], "metadata.name=gke-default-1")
+        self.assertEqual(len(self.server.watch_requests()), 1)
+
+    def test_selections_are_cached_apart(self):
+        """Test differently selected lists do not overwrite each other."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cache = NodeCache(tmp_dir)
+
+        everything = cached_get_nodes(transport="native", cache=cache)
+        web = cached_get_nodes(transport="native", cache=cache, selector=NodeSelector("tier=web"))
+        self.assertEqual(len(everything["items"]), 3)
+        self.assertEqual(_names(web), ["gke-default-1"])
+        self.assertEqual(len(os.listdir(tmp_dir)), 2)
+
+        # Both are fresh, so neither asks the server again
+        requests = len(self.server.requests)
+        self.assertEqual(len(cached_get_nodes(transport="native", cache=cache)["items"]), 3)
+        self.assertEqual(len(self.server.requests), requests)
+
+    def test_display_nodepool(self):
+        """Test --nodepool end to end."""
+        argv = ["--nodepool", "highmem", "--transport", "native", "--no-cache", "--no-daemon"]
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            display_nodes(options=parse_args(argv))
+
+        output = stdout.getvalue()
+        self.assertIn("gke-highmem-1", output)
+        self.assertNotIn("gke-default-1", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
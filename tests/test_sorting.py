@@ -0,0 +1,182 @@
+"""Tests for --sort-by and --limit."""
+
+import io
+import os
+import random
+import unittest
+from unittest.mock import patch
+
+from kubectl_node import client
+from kubectl_node.exceptions import SortError
+from kubectl_node.fanout import ContextResult, merge_results
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.providers import ProviderManager
+from kubectl_node.sorting import RowOrder, column_key
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+
+def _node(name, created="2023-01-01T12:00:00Z", version="v1.28.0", ip="10.0.0.1", labels=None):
+    node = make_node(name, labels=labels)
+    node["metadata"]["creationTimestamp"] = created
+    node["status"]["nodeInfo"]["kubeletVersion"] = version
+    node["status"]["addresses"] = [{"type": "InternalIP", "address": ip}]
+    return node
+
+
+def _sorted_values(header, values, reverse=False):
+    order = RowOrder(header, reverse=reverse)
+    keyed = [(order.key({}, (header,), [value]), value) for value in values]
+    return [value for key, value in order.select(keyed)]
+
+
+class TestColumnKeys(unittest.TestCase):
+    """Test the type-aware keys of the columns."""
+
+    def test_versions(self):
+        """Test versions sort by their numeric parts."""
+        versions = ["v1.28.0", "v1.9.3", "v1.28.0+k3s2", "v1.28.0+k3s1", "N/A", "v1.10.0-eks-1"]
+        self.assertEqual(_sorted_values("VERSION", versions),
+                         ["v1.9.3", "v1.10.0-eks-1", "v1.28.0", "v1.28.0+k3s1",
+                          "v1.28.0+k3s2", "N/A"])
+
+    def test_ips(self):
+        """Test addresses sort numerically, IPv4 first and N/A last."""
+        ips = ["10.0.0.10", "N/A", "fd00::1", "10.0.0.9", "9.255.0.1"]
+        self.assertEqual(_sorted_values("INTERNAL-IP", ips),
+                         ["9.255.0.1", "10.0.0.9", "10.0.0.10", "fd00::1", "N/A"])
+
+    def test_natural_and_quantities(self):
+        """Test names with numbers and request cells."""
+        self.assertEqual(_sorted_values("NAME", ["node-10", "node-2", "node-1"]),
+                         ["node-1", "node-2", "node-10"])
+        self.assertEqual(_sorted_values("CPU-REQ", ["2 (50%)", "1250m (31%)", "N/A", "500m (12%)"]),
+                         ["500m (12%)", "1250m (31%)", "2 (50%)", "N/A"])
+
+    def test_reverse_keeps_missing_last(self):
+        """Test descending order still puts missing values last."""
+        self.assertEqual(_sorted_values("INTERNAL-IP", ["N/A", "10.0.0.1", "10.0.0.2"], reverse=True),
+                         ["10.0.0.2", "10.0.0.1", "N/A"])
+
+    def test_age_uses_creation_time(self):
+        """Test AGE sorts by timestamp, youngest first, not by the rendered age."""
+        key = column_key("AGE")
+        older = key(_node("a", created="2023-01-01T12:00:00Z"), "1y")
+        newer = key(_node("b", created="2023-01-01T12:00:01Z"), "1y")
+        self.assertLess(newer, older)
+
+
+class TestSelection(unittest.TestCase):
+    """Test ordering and top-N selection of extracted rows."""
+
+    def test_top_n_matches_full_sort(self):
+        """Test the bounded heap picks what a full sort would, ties in list order."""
+        rng = random.Random(7)
+        nodes = [_node(f"node-{i}", version=f"v1.{rng.randint(20, 30)}.{rng.randint(0, 9)}")
+                 for i in range(500)]
+        manager = ProviderManager()
+        headers, everything = manager.collect_rows([nodes], RowOrder("VERSION"))
+        for reverse in (False, True):
+            full = manager.collect_rows([nodes], RowOrder("VERSION", reverse=reverse))[1]
+            keys = []
+            headers, top = manager.collect_rows([nodes], RowOrder("VERSION", reverse=reverse, limit=20),
+                                                keys)
+            self.assertEqual(top, full[:20])
+            self.assertEqual(len(keys), 20)
+        self.assertEqual(len(everything), 500)
+
+    def test_limit_without_sort_stops_early(self):
+        """Test a plain --limit stops pulling pages once it has enough rows."""
+        pulled = []
+
+        def pages():
+            for index in range(10):
+                pulled.append(index)
+                yield [_node(f"node-{index}-{i}") for i in range(5)]
+
+        headers, rows = ProviderManager().collect_rows(pages(), RowOrder(limit=7))
+        self.assertEqual([row[0] for row in rows][-1], "node-1-1")
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(pulled, [0, 1])
+
+    def test_headers_follow_selected_rows(self):
+        """Test provider columns of rows that were cut do not show up."""
+        nodes = [_node("aws-1", created="2020-01-01T00:00:00Z",
+                       labels={"k8s.io/cloud-provider-aws": "true"}),
+                 _node("plain-1", created="2024-01-01T00:00:00Z")]
+        headers, rows = ProviderManager().collect_rows([nodes], RowOrder("AGE", limit=1))
+        self.assertEqual([row[0] for row in rows], ["plain-1"])
+        self.assertNotIn("AWS-ZONE", headers)
+
+    def test_unknown_column(self):
+        """Test sorting by a column the table does not have is an error."""
+        with self.assertRaises(SortError):
+            RowOrder("NOPE").check(["NAME", "AGE"])
+
+    def test_merge_contexts(self):
+        """Test ordered per-context rows merge into one order, up to the limit."""
+        order = RowOrder("INTERNAL-IP", limit=3)
+        results = []
+        for context, ips in (("a", ["10.0.0.1", "10.0.0.5"]), ("b", ["10.0.0.2", "10.0.0.3"])):
+            keys = []
+            nodes = [_node(f"{context}-{ip}", ip=ip) for ip in ips]
+            headers, rows = ProviderManager().collect_rows([nodes], order, keys)
+            results.append(ContextResult(context, headers, rows, keys=keys))
+        results.append(ContextResult("broken", error=RuntimeError("down")))
+
+        headers, rows = merge_results(results, order=order)
+        self.assertEqual([row[0] for row in rows], ["a", "b", "b", "broken"])
+        self.assertEqual([row[headers.index("INTERNAL-IP")] for row in rows[:3]],
+                         ["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+
+
+class TestSortOptions(unittest.TestCase):
+    """Test --sort-by and --limit end to end."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+
+    def test_parse_args(self):
+        """Test columns are case-insensitive and bad combinations rejected."""
+        self.assertEqual(parse_args(["--sort-by", "age", "--limit", "5"]).sort_by, "AGE")
+        for argv in (["--limit", "0"], ["--reverse"]):
+            with patch('sys.stderr', new_callable=io.StringIO):
+                with self.assertRaises(SystemExit):
+                    parse_args(argv)
+
+    def run_display(self, *argv):
+        nodes = [_node("node-old", created="2021-01-01T00:00:00Z"),
+                 _node("node-new", created="2024-01-01T00:00:00Z"),
+                 _node("node-mid", created="2022-06-01T00:00:00Z")]
+        with StubAPIServer(nodes=nodes) as server:
+            argv = ["--transport", "native", "--no-cache", "--no-daemon"] + list(argv)
+            with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}), \
+                 patch('sys.stdout', new_callable=io.StringIO) as stdout, \
+                 patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                try:
+                    display_nodes(options=parse_args(argv))
+                except SystemExit:
+                    pass
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_newest_nodes(self):
+        """Test --sort-by AGE --limit N shows the N newest nodes."""
+        output, errors = self.run_display("--sort-by", "AGE", "--limit", "2")
+        names = [line.split()[0] for line in output.splitlines()[3:]]
+        self.assertEqual(names, ["node-new", "node-mid"])
+
+    def test_oldest_as_records(self):
+        """Test --reverse and record output."""
+        output, errors = self.run_display("--sort-by", "AGE", "--reverse", "-o", "csv")
+        self.assertEqual([line.split(",")[0] for line in output.splitlines()[1:]],
+                         ["node-old", "node-mid", "node-new"])
+
+    def test_unknown_column(self):
+        """Test an unknown column is reported."""
+        output, errors = self.run_display("--sort-by", "bogus")
+        self.assertIn("Cannot sort by 'BOGUS'", errors)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Cold-start checks for the kubectl-node entry point."""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed for the kubectl_node package, in
+# microseconds, when only parsing arguments. Eager imports took ~180ms.
+IMPORT_BUDGET_US = 60000
+
+# Modules --help and --version must not pull in
+DEFERRED_MODULES = [
+    "tabulate",
+    "yaml",
+    "subprocess",
+    "concurrent.futures",
+    "http.client",
+    "kubectl_node.utils",
+    "kubectl_node.providers",
+    "kubectl_node.columns",
+    "kubectl_node.terminal",
+    "kubectl_node.client",
+    "kubectl_node.watch",
+    "kubectl_node.cache",
+    "kubectl_node.fanout",
+]
+
+
+def run_python(code, *options):
+    """Run code in a fresh interpreter from the repository root."""
+    return subprocess.run(
+        [sys.executable] + list(options) + ["-c", code],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+
+def import_times(argv):
+    """Run the entry point under -X importtime and return {module: cumulative us}."""
+    code = (
+        "import sys\n"
+        f"sys.argv = {['kubectl-node'] + argv!r}\n"
+        "from kubectl_node.main import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+    )
+    result = run_python(code, "-X", "importtime")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.split("|")
+        try:
+            cumulative = int(fields[1])
+        except ValueError:
+            continue  # the header line
+        times[fields[2].strip()] = cumulative
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    """Test what the entry point imports before it has work to do."""
+
+    def test_version_and_help_defer_imports(self):
+        """Test --version and --help skip the fetching and rendering stack."""
+        for argv in (["--version"], ["--help"]):
+            times = import_times(argv)
+            self.assertIn("kubectl_node.main", times)
+            for module in DEFERRED_MODULES:
+                imported = [name for name in times
+                            if name == module or name.startswith(module + ".")]
+                self.assertEqual(imported, [], f"{module} imported for {argv}")
+
+    def test_import_time_budget(self):
+        """Test importing the package stays within the startup budget."""
+        # Best of three to ride out a busy machine
+        best = min(import_times(["--version"])["kubectl_node"] for _ in range(3))
+        self.assertLess(best, IMPORT_BUDGET_US)
+
+    def test_providers_imported_on_match(self):
+        """Test provider modules are only imported for nodes that match them."""
+        code = (
+            "import json, sys\n"
+            "from kubectl_node.providers import ProviderManager\n"
+            "def node(labels):\n"
+            "    return {'metadata': {'name': 'n', 'labels': labels}, 'spec': {}, 'status': {}}\n"
+            "def loaded():\n"
+            "    return sorted(m for m in sys.modules if m.startswith('kubectl_node.providers.')\n"
+            "                  and m.rsplit('.', 1)[1] in ('aws', 'azure', 'gcp'))\n"
+            "manager = ProviderManager()\n"
+            "manager.detect_provider(node({'kubernetes.io/os': 'linux'}))\n"
+            "steps = [loaded()]\n"
+            "manager.detect_provider(node({'cloud.google.com/gke-nodepool': 'pool'}))\n"
+            "steps.append(loaded())\n"
+            "print(json.dumps(steps))\n"
+        )
+        result = run_python(code)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout),
+                         [[], ["kubectl_node.providers.gcp"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Tests for --summary and --group-by."""
+
+import calendar
+import io
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from kubectl_node import client
+from kubectl_node.exceptions import NodeInfoError
+from kubectl_node.main import display_nodes, parse_args
+from kubectl_node.summary import FleetSummary, parse_groups
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+NOW = calendar.timegm((2024, 1, 1, 0, 0, 0))
+
+
+def _node(name, zone, instance_type, created="2023-12-31T23:30:00Z", labels=None):
+    node = make_node(name, labels={"topology.kubernetes.io/zone": zone,
+                                   "node.kubernetes.io/instance-type": instance_type,
+                                   **(labels or {})})
+    node["metadata"]["creationTimestamp"] = created
+    return node
+
+
+NODES = [
+    _node("aws-1", "us-east-1a", "m5.large", labels={"k8s.io/cloud-provider-aws": "true"}),
+    _node("aws-2", "us-east-1a", "m5.xlarge", created="2023-12-20T00:00:00Z",
+          labels={"k8s.io/cloud-provider-aws": "true"}),
+    _node("aws-3", "us-east-1b", "m5.large", created="2022-06-01T00:00:00Z",
+          labels={"k8s.io/cloud-provider-aws": "true"}),
+    _node("plain-1", "us-east-1a", "m5.large", created="2023-12-31T12:00:00Z"),
+]
+
+
+class TestFleetSummary(unittest.TestCase):
+    """Test counting nodes into groups."""
+
+    def test_parse_groups(self):
+        """Test commas separate groups and + combines columns."""
+        self.assertEqual(parse_groups("zone, instance-type+version"),
+                         [("ZONE",), ("INSTANCE-TYPE", "VERSION")])
+        self.assertEqual(parse_groups(None)[0], ("PROVIDER",))
+
+    def test_counts(self):
+        """Test single and combined groups, largest first."""
+        groups = parse_groups("zone,zone+instance-type")
+        summary = FleetSummary(groups, now=NOW).add([NODES[:2], NODES[2:]])
+        self.assertEqual(summary.nodes, 4)
+        self.assertEqual(summary.group_rows(0), [("us-east-1a", 3), ("us-east-1b", 1)])
+        self.assertEqual(summary.group_rows(1), [("us-east-1a/m5.large", 2),
+                                                 ("us-east-1a/m5.xlarge", 1),
+                                                 ("us-east-1b/m5.large", 1)])
+
+    def test_zone_agrees_with_provider_columns(self):
+        """Test ZONE falls back to the beta label and the providerID."""
+        beta = make_node("gcp-1", labels={"failure-domain.beta.kubernetes.io/zone": "us-east-1b"})
+        gce = make_node("gcp-2")
+        gce["spec"]["providerID"] = "gce://project/us-east-1b/gcp-2"
+        summary = FleetSummary(parse_groups("zone"), now=NOW).add([NODES, [beta, gce]])
+        self.assertEqual(summary.group_rows(0), [("us-east-1a", 3), ("us-east-1b", 3)])
+
+    def test_age_buckets(self):
+        """Test nodes fall in the bucket of their age, and the extremes are kept."""
+        summary = FleetSummary(parse_groups("zone"), now=NOW).add([NODES])
+        self.assertEqual(dict(summary.age_rows()),
+                         {"<1h": 1, "<1d": 1, "<7d": 0, "<30d": 1, "<90d": 0, "<1y": 0, ">=1y": 1})
+        self.assertEqual(summary.oldest, "2022-06-01T00:00:00Z")
+        self.assertEqual(summary.newest, "2023-12-31T23:30:00Z")
+
+    def test_unknown_column(self):
+        """Test grouping by a column no node has is an error."""
+        with self.assertRaises(NodeInfoError):
+            FleetSummary(parse_groups("bogus")).add([NODES]).check()
+
+    def test_json_and_csv(self):
+        """Test the machine-readable outputs."""
+        summary = FleetSummary(parse_groups("provider"), now=NOW).add([NODES])
+        stream = io.StringIO()
+        summary.write("json", stream=stream)
+        document = json.loads(stream.getvalue())
+        self.assertEqual(document["nodes"], 4)
+        self.assertEqual(document["groups"]["PROVIDER"], {"aws": 3, "generic": 1})
+
+        stream = io.StringIO()
+        summary.write("csv", stream=stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[0], "GROUP,VALUE,NODES")
+        self.assertIn("PROVIDER,aws,3", lines)
+        self.assertIn("AGE,>=1y,1", lines)
+
+
+class TestSummaryOptions(unittest.TestCase):
+    """Test --summary end to end."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+
+    def test_display_summary(self):
+        """Test counts are printed instead of node rows."""
+        argv = ["--summary", "--group-by", "zone", "--transport", "native",
+                "--no-cache", "--no-daemon"]
+        with StubAPIServer(nodes=NODES) as server:
+            with patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()}), \
+                 patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                display_nodes(options=parse_args(argv))
+
+        output = stdout.getvalue()
+        self.assertIn("Nodes: 4", output)
+        self.assertIn("us-east-1a", output)
+        self.assertNotIn("aws-1", output)
+
+    def test_parse_args(self):
+        """Test --summary rejects options that need node rows."""
+        self.assertTrue(parse_args(["--summary"]).summary)
+        for argv in (["--summary", "--watch"], ["--group-by", "zone", "--sort-by", "age"],
+                     ["--summary", "--all-contexts"]):
+            with patch('sys.stderr', new_callable=io.StringIO):
+                with self.assertRaises(SystemExit):
+                    parse_args(argv)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests for the plain table renderer."""
+
+import json
+import os
+import random
+import time
+import unittest
+from io import StringIO
+
+from tabulate import tabulate
+
+from kubectl_node import table
+from kubectl_node.table import plain_lines, format_table, write_table
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# Cells chosen to hit every type tabulate infers: text, numbers it
+# right-aligns, booleans, empties, and strings that only look numeric
+CELLS = [
+    "", "a", "node-1", "True", "False", "0", "17", "110", "-3", "+4", "007", "1_000",
+    "1,000", "1,000.5", "1.5", "1e5", "nan", "inf", "+inf", "Infinity", "1e999",
+    "N/A", "<none>", "v1.28.0", "10.0.0.1", "us-west-2a", "a b", "0x10", ".",
+    " padded", "padded ", "été", "東京", "\x1b[31mred\x1b[0m", "two\nlines",
+]
+
+
+def tabulate_plain(headers, rows):
+    return tabulate(rows, headers=headers, tablefmt="plain")
+
+
+class TestPlainTable(unittest.TestCase):
+    """Test the built-in renderer lays tables out exactly like tabulate."""
+
+    def test_golden_node_table(self):
+        """Test a node table renders byte for byte like the recorded output."""
+        with open(os.path.join(GOLDEN_DIR, "plain_table.json")) as handle:
+            data = json.load(handle)
+        with open(os.path.join(GOLDEN_DIR, "plain_table.txt")) as handle:
+            expected = handle.read()
+
+        self.assertIsNotNone(plain_lines(data["headers"], data["rows"]))
+        stream = StringIO()
+        write_table(data["headers"], data["rows"], stream=stream)
+        self.assertEqual(stream.getvalue(), expected)
+        self.assertEqual(stream.getvalue(), tabulate_plain(data["headers"], data["rows"]) + "\n")
+
+    def test_matches_tabulate(self):
+        """Test random tables render like tabulate, whichever path draws them."""
+        rng = random.Random(12)
+        fast = 0
+        for _ in range(3000):
+            columns = rng.randint(1, 5)
+            pools = [rng.sample(CELLS, 4) for _ in range(columns)]
+            headers = [rng.choice(["NAME", "X", "PODS", "AWS-ZONE", "A B"]) for _ in range(columns)]
+            rows = [[rng.choice(pool) for pool in pools] for _ in range(rng.randint(0, 6))]
+            if plain_lines(headers, rows) is not None:
+                fast += 1
+            self.assertEqual(format_table(headers, rows), tabulate_plain(headers, rows),
+                             msg=repr((headers, rows)))
+        self.assertGreater(fast, 1000)
+
+    def test_numeric_columns_align_right(self):
+        """Test integer columns are right-aligned, headers included."""
+        self.assertEqual(plain_lines(["NAME", "PODS"], [["a", "1"], ["ccc", "110"]]),
+                         ["NAME      PODS", "a            1", "ccc        110"])
+
+    def test_unusual_tables_use_tabulate(self):
+        """Test tables the fast path cannot lay out exactly are left to tabulate."""
+        self.assertIsNone(plain_lines(["NAME"], [["東京"]]))
+        self.assertIsNone(plain_lines(["NAME"], [["\x1b[31mred\x1b[0m"]]))
+        self.assertIsNone(plain_lines(["NAME"], [[None]]))
+        self.assertIsNone(plain_lines(["NAME", "CPU"], [["a", "1.5"]]))
+        self.assertIsNone(plain_lines(["NAME", "CPU"], [["a"]]))
+
+    def test_empty_table(self):
+        """Test a table without rows is just its header."""
+        self.assertEqual(format_table(["NAME", "X"], []), tabulate_plain(["NAME", "X"], []))
+
+    def test_other_formats(self):
+        """Test other table formats are drawn by tabulate."""
+        rows = [["a", "1"]]
+        self.assertEqual(format_table(["NAME", "X"], rows, "github"),
+                         tabulate(rows, headers=["NAME", "X"], tablefmt="github"))
+
+    def test_written_in_chunks(self):
+        """Test large tables reach the stream in a few large writes."""
+        rows = [[f"node-{i:05d}", "Ready", "aws"] for i in range(5000)]
+        stream = StringIO()
+        writes = []
+        stream.write = lambda text: writes.append(text)
+
+        write_table(["NAME", "STATUS", "PROVIDER"], rows, stream=stream)
+
+        self.assertLess(len(writes), 10)
+        self.assertTrue(all(len(text) >= table.WRITE_CHUNK_SIZE for text in writes[:-1]))
+        self.assertEqual("".join(writes), tabulate_plain(["NAME", "STATUS", "PROVIDER"], rows) + "\n")
+
+    def test_faster_than_tabulate(self):
+        """Test the fast path beats tabulate on a large node table."""
+        headers = ["NAME", "STATUS", "ROLES", "AGE", "VERSION", "INTERNAL-IP", "PROVIDER"]
+        rows = [[f"node-{i:05d}", "Ready", "<none>", f"{i % 90}d", "v1.28.0",
+                 f"10.0.{i // 256}.{i % 256}", "aws"] for i in range(5000)]
+
+        def best(func):
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                func(headers, rows)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        self.assertLess(best(plain_lines) * 5, best(tabulate_plain))
+
+
+if __name__ == '__main__':
+    unittest.main()
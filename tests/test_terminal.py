@@ -0,0 +1,131 @@
+"""Tests for incremental terminal rendering."""
+
+import io
+import os
+import unittest
+
+from kubectl_node.terminal import IncrementalRenderer, CLEAR_SCREEN
+
+
+class FakeTerminal(io.StringIO):
+    """A StringIO that claims to be a terminal."""
+
+    def isatty(self):
+        return True
+
+    def take(self):
+        value = self.getvalue()
+        self.seek(0)
+        self.truncate()
+        return value
+
+
+class TestIncrementalRenderer(unittest.TestCase):
+    """Test frame diffing and repaint decisions."""
+
+    def setUp(self):
+        self.terminal = FakeTerminal()
+        self.size = os.terminal_size((120, 40))
+        self.renderer = IncrementalRenderer(stream=self.terminal, get_size=lambda: self.size)
+        self.body = ["NAME    STATUS", "node-1  Ready ", "node-2  Ready "]
+
+    def test_first_frame_is_full_repaint(self):
+        """Test the first frame clears the screen and writes everything."""
+        written = self.renderer.render(self.body, layout_key=self.body[0])
+        output = self.terminal.take()
+
+        self.assertTrue(output.startswith(CLEAR_SCREEN))
+        self.assertIn("node-2  Ready", output)
+        self.assertEqual(written, len(output.encode("utf-8")))
+        self.assertEqual(self.renderer.full_repaints, 1)
+
+    def test_unchanged_frame_writes_almost_nothing(self):
+        """Test an identical frame only parks the cursor."""
+        self.renderer.render(self.body, layout_key=self.body[0])
+        self.terminal.take()
+
+        written = self.renderer.render(self.body, layout_key=self.body[0])
+        self.assertEqual(self.terminal.take(), "\033[4;1H")
+        self.assertEqual(written, 6)
+
+    def test_changed_cell_is_cursor_addressed(self):
+        """Test only the changed span of a changed row is rewritten."""
+        self.renderer.render(self.body, layout_key=self.body[0])
+        self.terminal.take()
+
+        changed = list(self.body)
+        changed[2] = "node-2  Gone  "
+        self.renderer.render(changed, layout_key=changed[0])
+        output = self.terminal.take()
+
+        self.assertNotIn(CLEAR_SCREEN, output)
+        self.assertIn("\033[3;9HGone", output)
+        self.assertNotIn("node-1", output)
+        self.assertEqual(self.renderer.full_repaints, 1)
+
+    def test_removed_rows_are_cleared(self):
+        """Test shrinking frames clear the leftover lines."""
+        self.renderer.render(self.body, layout_key=self.body[0])
+        self.terminal.take()
+
+        self.renderer.render(self.body[:2], layout_key=self.body[0])
+        self.assertIn("\033[3;1H\033[J", self.terminal.take())
+
+    def test_layout_change_forces_repaint(self):
+        """Test a changed header (column widths) forces a full repaint."""
+        self.renderer.render(self.body, layout_key=self.body[0])
+        wider = ["NAME          STATUS", "node-1-longer Ready "]
+        self.renderer.render(wider, layout_key=wider[0])
+        self.assertEqual(self.renderer.full_repaints, 2)
+
+    def test_resize_forces_repaint(self):
+        """Test a terminal resize forces a full repaint."""
+        self.renderer.render(self.body, layout_key=self.body[0])
+        self.size = os.terminal_size((100, 40))
+        self.renderer.render(self.body, layout_key=self.body[0])
+        self.assertEqual(self.renderer.full_repaints, 2)
+
+    def test_tall_frame_is_clipped(self):
+        """Test frames taller than the terminal keep the footer visible."""
+        self.size = os.terminal_size((120, 5))
+        body = [f"node-{i}" for i in range(10)]
+        self.renderer.render(body, footer=["Last updated: now"])
+        self.assertEqual(self.renderer.previous,
+                         ["node-0", "node-1", "... 8 more rows not shown", "Last updated: now"])
+        # The repaint's trailing newline leaves the cursor on the last row,
+        # so nothing scrolls
+        self.assertEqual(self.terminal.take().count("\n"), 4)
+
+        body[1] = "node-X"
+        self.renderer.render(body, footer=["Last updated: later"])
+        output = self.terminal.take()
+        self.assertIn("\033[2;6HX", output)
+        self.assertIn("\033[4;15Hlater", output)
+        self.assertTrue(output.endswith("\033[5;1H"))
+
+    def test_wide_lines_are_cut(self):
+        """Test lines wider than the terminal are cut so they cannot wrap."""
+        self.size = os.terminal_size((10, 40))
+        self.renderer.render(self.body, footer=["Last updated: now"], layout_key=self.body[0])
+        self.assertEqual(self.renderer.previous,
+                         ["NAME    ST", "node-1  Re", "node-2  Re", "Last updat"])
+        self.terminal.take()
+
+        changed = [self.body[0], self.body[1], "node-22 Gone  "]
+        self.renderer.render(changed, footer=["Last updated: now"], layout_key=changed[0])
+        output = self.terminal.take()
+        self.assertIn("\033[3;7H2 Go", output)
+        self.assertNotIn("Gone", output)
+
+    def test_not_a_terminal(self):
+        """Test non-terminal output always gets whole frames."""
+        stream = io.StringIO()
+        renderer = IncrementalRenderer(stream=stream)
+        renderer.render(self.body)
+        renderer.render(self.body)
+        self.assertEqual(stream.getvalue().count(CLEAR_SCREEN), 2)
+        self.assertEqual(renderer.full_repaints, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
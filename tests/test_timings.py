@@ -0,0 +1,132 @@
+"""Tests for --timings and --trace instrumentation."""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from kubectl_node import timings
+from kubectl_node.main import main, render_table
+from kubectl_node.terminal import IncrementalRenderer
+from kubectl_node.timings import phase, start_recording, stop_recording
+
+from tests.stub_apiserver import make_node
+
+
+class TestRecorder(unittest.TestCase):
+    """Test recording phases."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.addCleanup(stop_recording)
+        self.trace = os.path.join(self.tmp_dir, "trace.json")
+
+    def test_inactive_phase_records_nothing(self):
+        """Test phases are no-ops without an active recorder."""
+        with phase("json_decode", bytes=10) as span:
+            span.set(nodes=1)
+        self.assertIs(span, timings._NULL_SPAN)
+
+    def test_totals_and_summary(self):
+        """Test phases with the same name add up, with their counts."""
+        recorder = start_recording()
+        for _ in range(2):
+            with phase("json_decode", bytes=100) as span:
+                span.set(nodes=3)
+
+        self.assertEqual(recorder.totals["json_decode"]["calls"], 2)
+        self.assertEqual(recorder.totals["json_decode"]["bytes"], 200)
+        self.assertEqual(recorder.totals["json_decode"]["nodes"], 6)
+        summary = recorder.summary()
+        self.assertTrue(summary[1].startswith("json_decode"))
+        self.assertTrue(summary[-1].startswith("total"))
+
+    def test_trace_events_are_written_as_they_end(self):
+        """Test the trace is readable before the recorder is closed."""
+        start_recording(self.trace)
+        with phase("tick"):
+            with phase("render", bytes=42):
+                pass
+
+        with open(self.trace) as handle:
+            events = json.loads(handle.read() + "\n]")  # the closing ] is optional
+        complete = [event for event in events if event["ph"] == "X"]
+        self.assertEqual([event["name"] for event in complete], ["render", "tick"])
+        self.assertEqual(complete[0]["args"], {"bytes": 42})
+        self.assertGreaterEqual(complete[1]["dur"], complete[0]["dur"])
+        self.assertEqual(events[0]["ph"], "M")
+
+        stop_recording()
+        with open(self.trace) as handle:
+            self.assertEqual(len(json.load(handle)), len(events))
+
+    def test_allocations(self):
+        """Test heap growth is recorded per phase and as a counter."""
+        recorder = start_recording(self.trace, allocations=True)
+        with phase("json_decode"):
+            data = [str(i) for i in range(10000)]
+        stop_recording()
+        self.assertIn("HEAP GROWTH", recorder.summary()[0])
+
+        with open(self.trace) as handle:
+            events = json.load(handle)
+        decode = [event for event in events if event["name"] == "json_decode"][0]
+        self.assertGreater(decode["args"]["allocated"], 0)
+        self.assertTrue(any(event["ph"] == "C" for event in events))
+        self.assertEqual(len(data), 10000)
+
+    def test_watch_frames_report_bytes(self):
+        """Test watch-mode renders record the bytes of each frame."""
+        recorder = start_recording()
+        renderer = IncrementalRenderer(stream=io.StringIO())
+        for _ in range(2):
+            render_table(["NAME"], [["node-1"]], "dev", clear_screen=True, renderer=renderer)
+
+        self.assertEqual(recorder.totals["render"]["calls"], 2)
+        self.assertEqual(recorder.totals["render"]["bytes"], renderer.total_bytes)
+
+
+class TestTimingsOption(unittest.TestCase):
+    """Test --timings end to end."""
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_breakdown_on_stderr(self, mock_popen):
+        """Test every phase of a run is reported on stderr, not stdout."""
+        process = MagicMock()
+        process.communicate.return_value = (json.dumps({"items": [make_node("node-1")]}), "")
+        process.returncode = 0
+        mock_popen.return_value.__enter__.return_value = process
+
+        argv = ['kubectl-node', '--timings', '--no-cache', '--full-objects', '--context', 'dev']
+        with patch('sys.argv', argv), \
+             patch('sys.stdout', new_callable=io.StringIO) as stdout, \
+             patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            main()
+
+        phases = [line.split()[0] for line in stderr.getvalue().splitlines()[2:]]
+        for name in ("kubectl", "json_decode", "detect", "get_node_info", "render", "total"):
+            self.assertIn(name, phases)
+        self.assertIn("node-1", stdout.getvalue())
+        self.assertNotIn("PHASE", stdout.getvalue())
+        self.assertIsNone(timings._ACTIVE)
+
+    def test_unwritable_trace(self):
+        """Test an unwritable --trace path is an error message, not a traceback."""
+        argv = ['kubectl-node', '--trace', '/nonexistent/dir/trace.json']
+        with patch('sys.argv', argv), \
+             patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            with self.assertRaises(SystemExit) as caught:
+                main()
+
+        self.assertEqual(caught.exception.code, 1)
+        self.assertIn("Error: cannot write trace file '/nonexistent/dir/trace.json'",
+                      stderr.getvalue())
+        self.assertIsNone(timings._ACTIVE)
+
+
+if __name__ == '__main__':
+    unittest.main()
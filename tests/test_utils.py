@@ -3,12 +3,15 @@
 import unittest
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
+import io
 import json
 
 from kubectl_node.utils import (
     format_timedelta,
     calculate_node_age,
     kubectl_get_nodes,
+    kubectl_get_node_pages,
+    iter_json_list_items,
     get_current_context,
     list_contexts,
     get_node_status,
@@ -21,6 +24,13 @@ from kubectl_node.exceptions import KubectlCommandError, JSONParseError
 class TestUtils(unittest.TestCase):
     """Test utility functions."""
     
+    def setUp(self):
+        # Keep the in-process kubeconfig reader away from any real
+        # kubeconfig, so context lookups fall back to the mocked kubectl
+        patcher = patch.dict('os.environ', {'KUBECONFIG': '/nonexistent/kubeconfig'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
     def test_format_timedelta(self):
         """Test timedelta formatting."""
         # Test days
@@ -116,6 +126,43 @@ class TestUtils(unittest.TestCase):
         with self.assertRaises(JSONParseError):
             kubectl_get_nodes()
     
+    def test_iter_json_list_items(self):
+        """Test decoding list items one at a time across small reads."""
+        items = [{"metadata": {"name": f"node-{i}", "labels": {"a": "[b]"}}} for i in range(4)]
+        document = json.dumps({"apiVersion": "v1", "items": items, "kind": "List"}, indent=4)
+        
+        result = list(iter_json_list_items(io.StringIO(document), chunk_size=7))
+        self.assertEqual(result, items)
+    
+    def test_iter_json_list_items_empty(self):
+        """Test decoding an empty items list."""
+        document = '{"apiVersion": "v1", "items": [], "kind": "List"}'
+        self.assertEqual(list(iter_json_list_items(io.StringIO(document))), [])
+    
+    def test_iter_json_list_items_truncated(self):
+        """Test truncated output raises JSONParseError."""
+        document = '{"apiVersion": "v1", "items": [{"metadata": {"name": "n'
+        with self.assertRaises(JSONParseError):
+            list(iter_json_list_items(io.StringIO(document)))
+    
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_kubectl_get_node_pages(self, mock_popen):
+        """Test kubectl paging uses --chunk-size and yields bounded pages."""
+        items = [{"metadata": {"name": f"node-{i}"}} for i in range(5)]
+        mock_process = MagicMock()
+        mock_process.stdout = io.StringIO(json.dumps({"apiVersion": "v1", "items": items}))
+        mock_process.stderr = io.StringIO('')
+        mock_process.wait.return_value = 0
+        mock_process.poll.return_value = 0
+        mock_popen.return_value = mock_process
+        
+        pages = list(kubectl_get_node_pages(context="prod", page_size=2))
+        
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        command = mock_popen.call_args[0][0]
+        self.assertIn("--chunk-size=2", command)
+        self.assertEqual(command[-2:], ["--context", "prod"])
+    
     @patch('kubectl_node.utils.subprocess.Popen')
     def test_get_current_context_success(self, mock_popen):
         """Test getting current context successfully."""
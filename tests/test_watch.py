@@ -0,0 +1,166 @@
+"""Tests for incremental node watching."""
+
+import io
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+from kubectl_node import client
+from kubectl_node.watch import NodeWatcher, ResourceVersionExpired
+
+from tests.stub_apiserver import StubAPIServer, make_node
+
+
+def _event(event_type, node):
+    return {"type": event_type, "object": node}
+
+
+class TestApplyEvent(unittest.TestCase):
+    """Test applying watch events to the local node map."""
+
+    def setUp(self):
+        self.watcher = NodeWatcher()
+
+    def test_added_modified_deleted(self):
+        """Test node lifecycle events keyed by UID."""
+        node = make_node("node-1", resource_version="101")
+        self.watcher.apply_event(_event("ADDED", node))
+        self.assertEqual(list(self.watcher.nodes), ["uid-node-1"])
+
+        modified = make_node("node-1", labels={"new": "label"}, resource_version="102")
+        self.watcher.apply_event(_event("MODIFIED", modified))
+        self.assertEqual(self.watcher.nodes["uid-node-1"]["metadata"]["labels"], {"new": "label"})
+
+        self.watcher.apply_event(_event("DELETED", make_node("node-1", resource_version="103")))
+        self.assertEqual(self.watcher.nodes, {})
+        self.assertEqual(self.watcher.resource_version, "103")
+
+    def test_bookmark_advances_resource_version(self):
+        """Test BOOKMARK events only move the resourceVersion."""
+        version = self.watcher.version
+        self.watcher.apply_event({"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "500"}}})
+        self.assertEqual(self.watcher.resource_version, "500")
+        self.assertEqual(self.watcher.nodes, {})
+        self.assertEqual(self.watcher.version, version)
+
+    def test_gone_error_event(self):
+        """Test an in-stream 410 error raises ResourceVersionExpired."""
+        with self.assertRaises(ResourceVersionExpired):
+            self.watcher.apply_event({"type": "ERROR", "object": {"kind": "Status", "code": 410}})
+
+    def test_unexpected_error_is_kept_and_retried(self):
+        """Test errors other than API errors are shown and retried, not fatal."""
+        errors = []
+
+        def sync():
+            errors.append(self.watcher.error)
+            if len(errors) == 1:
+                self.watcher.apply_event(_event("ADDED", {"metadata": {}}))  # no uid
+            self.watcher.stop()
+
+        with patch.object(self.watcher, "sync", side_effect=sync), \
+             patch('kubectl_node.watch.RETRY_DELAYS', [0]):
+            self.watcher.run()
+
+        self.assertEqual(len(errors), 2)
+        self.assertIsInstance(errors[1], KeyError)
+        self.assertEqual(self.watcher.reconnects, 1)
+
+    def test_snapshot_sorted_by_name(self):
+        """Test snapshots are ordered by node name."""
+        for name in ["node-b", "node-a"]:
+            self.watcher.apply_event(_event("ADDED", make_node(name)))
+        names = [node["metadata"]["name"] for node in self.watcher.snapshot()]
+        self.assertEqual(names, ["node-a", "node-b"])
+
+
+class TestNativeWatch(unittest.TestCase):
+    """Test list+watch against the stub API server."""
+
+    def setUp(self):
+        client._CLIENTS.clear()
+        self.addCleanup(client._CLIENTS.clear)
+
+    def _watch(self, server):
+        patcher = patch.dict(os.environ, {"KUBECONFIG": server.write_kubeconfig()})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return NodeWatcher(transport="native")
+
+    def _list_requests(self, server):
+        return [q for path, q, headers in server.requests if not q.get("watch")]
+
+    def test_list_then_resume_from_resource_version(self):
+        """Test one list, then watches resuming from the last version."""
+        watches = [
+            [_event("ADDED", make_node("node-2", resource_version="101")),
+             {"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "150"}}}],
+            [_event("DELETED", make_node("node-1", resource_version="151"))],
+        ]
+        with StubAPIServer(nodes=[make_node("node-1")], watches=watches) as server:
+            watcher = self._watch(server)
+            watcher.sync()
+            self.assertEqual(len(watcher.nodes), 2)
+            self.assertEqual(watcher.resource_version, "150")
+
+            # The stream ended (disconnect); resume without re-listing
+            watcher.sync()
+            self.assertEqual([n["metadata"]["name"] for n in watcher.snapshot()], ["node-2"])
+
+            watch_requests = server.watch_requests()
+            self.assertEqual(watch_requests[0]["resourceVersion"], "100")
+            self.assertEqual(watch_requests[0]["allowWatchBookmarks"], "true")
+            self.assertEqual(watch_requests[1]["resourceVersion"], "150")
+            self.assertEqual(len(self._list_requests(server)), 1)
+            self.assertEqual(watcher.relists, 1)
+
+    def test_relist_on_gone_event(self):
+        """Test an in-stream 410 triggers exactly one re-list."""
+        watches = [[{"type": "ERROR", "object": {"kind": "Status", "code": 410}}], []]
+        with StubAPIServer(nodes=[make_node("node-1")], watches=watches) as server:
+            watcher = self._watch(server)
+            watcher.sync()
+            self.assertIsNone(watcher.resource_version)
+            watcher.sync()
+            self.assertEqual(watcher.relists, 2)
+            self.assertEqual(len(self._list_requests(server)), 2)
+
+    def test_relist_on_gone_status(self):
+        """Test an HTTP 410 on watch start triggers a re-list."""
+        with StubAPIServer(nodes=[make_node("node-1")], watches=[410, []]) as server:
+            watcher = self._watch(server)
+            watcher.sync()
+            self.assertIsNone(watcher.resource_version)
+            watcher.sync()
+            self.assertEqual(watcher.relists, 2)
+
+
+class TestKubectlWatch(unittest.TestCase):
+    """Test the kubectl transport uses raw list and watch requests."""
+
+    @patch('kubectl_node.utils.subprocess.Popen')
+    def test_kubectl_raw_watch(self, mock_popen):
+        """Test watches go through kubectl get --raw with the resourceVersion."""
+        stream = MagicMock()
+        stream.stdout = io.StringIO('{"type": "ADDED", "object": {"metadata": '
+                                    '{"uid": "u1", "name": "n1", "resourceVersion": "7"}}}\n')
+        stream.stderr = io.StringIO('')
+        stream.wait.return_value = 0
+        stream.poll.return_value = 0
+        mock_popen.return_value = stream
+
+        watcher = NodeWatcher(context="prod")
+        watcher.resource_version = "5"
+        watcher.watch_once()
+
+        command = mock_popen.call_args[0][0]
+        self.assertEqual(command[:3], ["kubectl", "get", "--raw"])
+        self.assertIn("watch=1", command[3])
+        self.assertIn("resourceVersion=5", command[3])
+        self.assertEqual(command[-2:], ["--context", "prod"])
+        self.assertEqual(watcher.resource_version, "7")
+        self.assertIn("u1", watcher.nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()